@@ -0,0 +1,154 @@
+# ai_store.py - Aprendizaje de la IA guardado entre sesiones, por perfil y jugador (ASCII)
+#
+# Un solo .npz sin comprimir. Las claves ("p<perfil>-<jugador>") van en "keys" y cada
+# campo del estado (weak, skill, covers) se guarda concatenado para todas las claves:
+#   <campo>__data   valores de todas las claves, aplanados uno tras otro
+#   <campo>__shape  forma de cada clave
+#   <campo>__off    donde empieza cada clave en data
+# Asi el archivo tiene unos pocos arreglos aunque haya cientos de jugadores y se lee
+# entero al iniciar en milisegundos. Se reescribe en un hilo aparte despues de cada
+# punto: archivo temporal + fsync + os.replace, asi un corte de luz deja el archivo
+# anterior o el nuevo, nunca uno a medias.
+
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+_SEP = "__"
+
+
+def _pack(entries):
+    """{clave: {campo: arreglo}} -> arreglos planos para np.savez."""
+    keys = sorted(entries)
+    out = {"keys": np.array(keys, dtype=str)}
+    fields = sorted({f for e in entries.values() for f in e})
+    for f in fields:
+        vals = [np.asarray(entries[k].get(f, np.zeros(0))) for k in keys]
+        ndim = max(v.ndim for v in vals)
+        shape = np.zeros((len(keys), ndim), dtype=np.int64)
+        for i, v in enumerate(vals):
+            shape[i, ndim - v.ndim:] = v.shape
+        sizes = [v.size for v in vals]
+        out[f + _SEP + "data"] = np.concatenate([v.ravel() for v in vals]) if keys else np.zeros(0)
+        out[f + _SEP + "shape"] = shape
+        out[f + _SEP + "off"] = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+    return out
+
+
+def _unpack(data):
+    keys = [str(k) for k in data["keys"]]
+    entries = {k: {} for k in keys}
+    for name in data.files:
+        f, _, part = name.rpartition(_SEP)
+        if part != "data":
+            continue
+        flat, shape, off = data[name], data[f + _SEP + "shape"], data[f + _SEP + "off"]
+        for i, k in enumerate(keys):
+            if off[i + 1] > off[i] or shape.shape[1] == 0:
+                entries[k][f] = flat[off[i]:off[i + 1]].reshape(tuple(shape[i]))
+    return entries
+
+
+def _safe(name):
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", str(name)).strip("-") or "publico"
+
+
+def store_key(profile, player=""):
+    """Clave de AIStore para un perfil de pelota y un jugador ("" = publico general)."""
+    return f"p{int(profile)}-{_safe(player or 'publico')}"
+
+
+class AIStore:
+    """
+    Estado aprendido por clave, persistido en path:
+      - load(key) devuelve el dict guardado (o None) sin tocar disco: todo se lee en __init__.
+      - put(key, state) copia el estado y despierta al escritor; no bloquea el bucle.
+      - close() escribe lo pendiente y detiene el hilo.
+    Un archivo ilegible se aparta como path.bad y se empieza de cero.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._running = True
+        self.load_ms = 0.0
+        self.write_ms = 0.0
+        self.writes = 0
+        self.errors = 0
+        self._read()
+        self._thread = threading.Thread(target=self._loop, name="ai-store", daemon=True)
+        self._thread.start()
+
+    # -------- lectura --------
+    def _read(self):
+        t0 = time.perf_counter()
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                self._entries = _unpack(data)
+        except Exception as e:
+            print("AIStore: archivo ilegible, se empieza de cero:", e)
+            self._entries = {}
+            try:
+                os.replace(self.path, self.path + ".bad")
+            except OSError:
+                pass
+        self.load_ms = (time.perf_counter() - t0) * 1000.0
+
+    def load(self, key):
+        with self._cond:
+            entry = self._entries.get(key)
+            return dict(entry) if entry is not None else None
+
+    def keys(self):
+        with self._cond:
+            return sorted(self._entries)
+
+    # -------- escritura --------
+    def put(self, key, state):
+        state = {k: np.array(v) for k, v in state.items()}
+        with self._cond:
+            self._entries[key] = state
+            self._dirty = True
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running and not self._dirty:
+                    self._cond.wait()
+                if not self._dirty:
+                    return
+                snapshot = dict(self._entries)  # los estados se reemplazan enteros, no se mutan
+                self._dirty = False
+            self._write(_pack(snapshot))
+
+    def _write(self, arrays):
+        t0 = time.perf_counter()
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self.writes += 1
+        except OSError as e:
+            self.errors += 1
+            print("AIStore: no se pudo guardar:", e)
+        self.write_ms = (time.perf_counter() - t0) * 1000.0
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+
+    def stats(self):
+        return {"keys": len(self._entries), "load_ms": round(self.load_ms, 2),
+                "writes": self.writes, "write_ms": round(self.write_ms, 2), "errors": self.errors}
@@ -1,53 +1,43 @@
 # ai_strategy.py - IA con prediccion, aprendizaje y suavizado anti-tiriteo (ASCII)
 
-import math
 import random
-import time
+
+import numpy as np
+
 import settings
+from trajectory import Trajectory
+from weak_zones import WeakZoneMap, RecentRing
 
 def clamp(v, a, b):
     return max(a, min(b, v))
 
-def reflect_y_at_walls(y, h, r):
-    top = r
-    bot = h - r
-    if bot <= top:
-        return clamp(int(y), 0, h - 1)
-    span = bot - top
-    rel = (y - top) % (2 * span)
-    if rel > span:
-        rel = 2 * span - rel
-    return int(top + rel)
-
-def predict_ball_y_at_x(x_target, x0, y0, vx, vy, w, h, r):
-    if vx == 0:
-        return None
-    t = (x_target - x0) / vx
-    if t <= 0:
-        return None
-    return reflect_y_at_walls(y0 + vy * t, h, r)
-
 class OpponentAI:
     """
     IA educativa suave:
       - Predice cruce cuando vx<0 y aplica filtros EMA para evitar saltos.
       - "Torpeza" controlada por skill: sesgo al centro + ruido estable (no por frame).
       - Aprende con exactitud reciente y sube la skill de a poco.
+      - Zonas debiles en WeakZoneMap (Y x angulo de llegada) y exactitud en un RecentRing:
+        nada se recorre por frame.
+      - Con AI_TARGET_CANDIDATES > 0 evalua muchos objetivos a la vez (score_targets).
     Panel: pred_y, target_y, error_pct, acc_recent, skill.
     """
-    def __init__(self, x_ai):
+    def __init__(self, x_ai, rng=None):
         self.x_ai = x_ai
+        self.rng = rng if rng is not None else random.Random()
         self.pred_y = None
         self.target_y = None
         self.error_pct = 0.0
+        self.traj = Trajectory()  # tramo actual de la pelota, se rehace solo en rebotes/saques
 
-        # aprendizaje por bandas
-        self.bins = int(getattr(settings, "AI_LEARN_BINS", 6))
-        self.weak_counts = [0 for _ in range(self.bins)]
+        # aprendizaje por bandas (Y y, si AI_LEARN_ANGLE_BINS > 1, angulo de llegada)
+        self.weak = WeakZoneMap()
+        self.bins = self.weak.bins_y
         self.learn_rate = float(getattr(settings, "AI_LEARN_RATE", 0.15))
         self.hist_window = int(getattr(settings, "AI_HISTORY", 12))
-        self._recent_covers = []  # 1 cubre, 0 falla
+        self._recent_covers = RecentRing(self.hist_window)  # 1 cubre, 0 falla
         self.acc_recent = 0.0
+        self.candidates = int(getattr(settings, "AI_TARGET_CANDIDATES", 0))
 
         # habilidad
         self.skill = float(getattr(settings, "AI_SKILL_START", 0.35))
@@ -56,39 +46,39 @@ class OpponentAI:
         self.pred_ema = None
         self.target_ema = None
         self._noise = 0.0
-        self._noise_t = 0.0
+        self._noise_t = -1.0e9
         self.noise_period = 0.25  # s
-
-    def _bin_index(self, y, h):
-        y = clamp(int(y), 0, h - 1)
-        band_h = h / float(self.bins)
-        idx = int(y // band_h)
-        return clamp(idx, 0, self.bins - 1)
+        self._clock = 0.0  # reloj de simulacion (suma de dt), no de pared
 
     def _update_noise(self, h):
-        now = time.time()
+        now = self._clock
         if (now - self._noise_t) >= self.noise_period:
             bias = (1.0 - self.skill)  # 0..1 mas bajo => mas ruido
             amp = bias * (h * 0.08)
-            self._noise = random.uniform(-amp, amp)
+            self._noise = self.rng.uniform(-amp, amp)
             self._noise_t = now
 
     def decide(self, ball, ai_center_y, dt):
-        w = settings.SCREEN_WIDTH
         h = settings.SCREEN_HEIGHT
         r = settings.BALL_RADIUS
         vx = float(getattr(ball, "vx", 0.0))
-        vy = float(getattr(ball, "vy", 0.0))
 
         # actualizar ruido estable
+        self._clock += dt
         self._update_noise(h)
 
         if vx < 0:
-            # prediccion bruta
+            # prediccion bruta (forma cerrada, cacheada hasta el proximo rebote)
             x_target = self.x_ai + settings.PADDLE_WIDTH
-            pred_raw = predict_ball_y_at_x(x_target, ball.x, ball.y, vx, vy, w, h, r)
-            if pred_raw is None:
+            traj = self.traj.sync(ball)
+            t_hit = traj.time_to_x(x_target, float(ball.x))
+            angle = None
+            if t_hit is None:
                 pred_raw = h * 0.5
+            else:
+                pred_raw = int(traj.y_at_x(x_target))
+                if self.weak.bins_angle > 1:
+                    angle = traj.angle_at_x(x_target)
 
             # EMA en prediccion segun skill (mas skill => responde mas rapido)
             alpha_pred = 0.25 + 0.5 * self.skill  # 0.25..0.75
@@ -98,13 +88,14 @@ class OpponentAI:
                 self.pred_ema = (1.0 - alpha_pred) * self.pred_ema + alpha_pred * float(pred_raw)
             self.pred_y = self.pred_ema
 
-            # sesgo leve a la zona debil
+            # sesgo leve a la zona debil (argmax mantenido al aprender, O(1) aqui)
             base_target = float(self.pred_y)
-            if sum(self.weak_counts) > 0:
-                worst_idx = max(range(self.bins), key=lambda i: self.weak_counts[i])
-                band_h = h / float(self.bins)
-                weak_center = (worst_idx + 0.5) * band_h
-                base_target = (1.0 - self.learn_rate) * base_target + self.learn_rate * weak_center
+            if self.candidates > 0:
+                base_target = self.best_target(base_target, ai_center_y, t_hit, angle)
+            else:
+                weak_center = self.weak.weak_y(angle)
+                if weak_center is not None:
+                    base_target = (1.0 - self.learn_rate) * base_target + self.learn_rate * weak_center
 
             # "torpeza": mezcla al centro + ruido estable (no cambia por frame)
             center = h * 0.5
@@ -139,30 +130,75 @@ class OpponentAI:
 
         return self.target_y
 
-    def learn_on_point_end(self, player_scored: bool, ball_final_y: float):
-        """Actualiza aprendizaje, exactitud y skill al terminar cada punto."""
-        h = settings.SCREEN_HEIGHT
+    def score_targets(self, ys, pred_y, ai_center_y, time_left=None, angle=None):
+        """
+        Puntaje de muchos objetivos Y a la vez (arreglo): cubrir la prediccion con la
+        paleta, tirar hacia la zona debil y no pedir un viaje imposible en time_left.
+        """
+        ys = np.asarray(ys, dtype=np.float64)
+        half = settings.PADDLE_HEIGHT * 0.5
+        cover = np.clip(1.0 - np.abs(ys - pred_y) / half, 0.0, 1.0)
+        score = cover + self.learn_rate * self.weak.weakness(ys, angle)
+        score -= 0.25 * np.abs(ys - ai_center_y) / float(settings.SCREEN_HEIGHT)
+        if time_left is not None:
+            reach = settings.PADDLE_MAX_SPEED * time_left + half
+            score[np.abs(ys - ai_center_y) > reach] = -np.inf
+        return score
+
+    def best_target(self, pred_y, ai_center_y, time_left=None, angle=None):
+        """Mejor de self.candidates objetivos repartidos sobre el alto de la paleta alrededor de pred_y."""
+        r = settings.BALL_RADIUS
+        half = settings.PADDLE_HEIGHT * 0.5
+        ys = np.clip(np.linspace(pred_y - half, pred_y + half, self.candidates), r, settings.SCREEN_HEIGHT - r)
+        score = self.score_targets(ys, pred_y, ai_center_y, time_left, angle)
+        if not np.isfinite(score).any():
+            return float(pred_y)  # ninguno alcanzable: ir a la prediccion
+        return float(ys[int(np.argmax(score))])
+
+    def learn_on_point_end(self, player_scored: bool, ball_final_y: float, ball_angle=None):
+        """Actualiza aprendizaje, exactitud y skill al terminar cada punto (ball_angle en grados, opcional)."""
         if ball_final_y is None:
             return
 
         came_to_ai = bool(player_scored)  # si anoto el jugador, fue al lado IA
 
         if came_to_ai:
-            self._recent_covers.append(0)
-            idx = self._bin_index(ball_final_y, h)
-            self.weak_counts[idx] += 1
+            self._recent_covers.push(0)
+            self.weak.add(ball_final_y, ball_angle)
         else:
-            self._recent_covers.append(1)
-
-        if len(self._recent_covers) > self.hist_window:
-            self._recent_covers.pop(0)
+            self._recent_covers.push(1)
 
-        # exactitud reciente
-        if self._recent_covers:
-            self.acc_recent = sum(self._recent_covers) / float(len(self._recent_covers)) * 100.0
-        else:
-            self.acc_recent = 0.0
+        # exactitud reciente (suma corriente del anillo)
+        self.acc_recent = self._recent_covers.mean() * 100.0
 
         # skill sube con la exactitud (limites 0.25..0.95), suave
         tgt_skill = 0.25 + 0.70 * (self.acc_recent / 100.0)
-        self.skill = clamp(0.90 * self.skill + 0.10 * tgt_skill, 0.25, 0.95)
\ No newline at end of file
+        self.skill = clamp(0.90 * self.skill + 0.10 * tgt_skill, 0.25, 0.95)
+
+    # -------- persistencia (AIStore) --------
+    def get_state(self):
+        """Lo aprendido, como arreglos chicos (copias) para guardar con AIStore."""
+        return {
+            "weak": self.weak.counts.copy(),
+            "skill": np.array(self.skill),
+            "covers": np.array(self._recent_covers.values(), dtype=np.int8),
+        }
+
+    def set_state(self, state):
+        """Restaura get_state(); los conteos con otra cantidad de bandas se descartan."""
+        if state is None:
+            return
+        if "weak" in state:
+            self.weak.load_counts(state["weak"])
+        if "skill" in state:
+            self.skill = clamp(float(state["skill"]), 0.25, 0.95)
+        if "covers" in state:
+            self._recent_covers.load(int(v) for v in np.asarray(state["covers"]).ravel())
+            self.acc_recent = self._recent_covers.mean() * 100.0
+
+    def reset_learning(self):
+        """Vuelve a la IA sin experiencia (perfil o jugador sin datos guardados)."""
+        self.weak = WeakZoneMap()
+        self._recent_covers = RecentRing(self.hist_window)
+        self.acc_recent = 0.0
+        self.skill = float(getattr(settings, "AI_SKILL_START", 0.35))
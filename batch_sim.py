@@ -0,0 +1,426 @@
+# batch_sim.py - Miles de partidas en paralelo con NumPy (estado en arreglos) para ajustar perfiles e IA (ASCII)
+#
+# Uso:
+#   python batch_sim.py --matches 4096 --seconds 120 --profile 2 --err 40
+#
+# Replica la fisica de game_objects.py y la IA de ai_strategy.py sobre arreglos:
+# cada indice es una partida independiente y todas avanzan en el mismo paso fijo.
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+import settings
+from trajectory import BatchTrajectory, fold_y_array
+from weak_zones import angle_bins
+from collision import sweep_circle_rect_array, separate_circle_rect_array
+from game_objects import MAX_EVENTS_PER_STEP
+
+
+class BatchSim:
+    """
+    Estado struct-of-arrays de n partidas: pelota (bx, by, bvx, bvy), paletas (ai_y, pl_y),
+    estado de la IA (skill, EMAs, ruido, zonas debiles, exactitud reciente) y marcadores.
+    Las partidas terminadas se reinician solas (la IA conserva lo aprendido, como en GameApp).
+    """
+    def __init__(self, n, seed=None, profile=None, hz=None, skill_start=None):
+        self.n = int(n)
+        self.hz = float(hz if hz is not None else getattr(settings, "PHYSICS_HZ", 120))
+        self.dt = 1.0 / self.hz
+        self.rng = np.random.default_rng(seed)
+
+        self.W = float(settings.SCREEN_WIDTH)
+        self.H = float(settings.SCREEN_HEIGHT)
+        self.R = float(settings.BALL_RADIUS)
+        self.PW = float(settings.PADDLE_WIDTH)
+        self.PH = float(settings.PADDLE_HEIGHT)
+        margin = 40
+        self.ai_x = float(margin)
+        self.pl_x = float(self.W - settings.PADDLE_WIDTH - margin)
+
+        # perfil de pelota (por partida, para barrer varios a la vez)
+        perfil = settings.BALL_PROFILES[profile if profile is not None else settings.BALL_PROFILE]
+        self.spd_start = np.full(n, float(perfil["start"]))
+        self.spd_max = np.full(n, float(perfil["max"]))
+        self.spd_step = np.full(n, float(perfil["step"]))
+
+        # pelota y paletas (y = borde superior, como PaddleBase)
+        self.bx = np.zeros(n)
+        self.by = np.zeros(n)
+        self.bvx = np.zeros(n)
+        self.bvy = np.zeros(n)
+        self.ai_y = np.zeros(n)
+        self.pl_y = np.zeros(n)
+
+        # IA (mismos parametros que OpponentAI)
+        self.bins = int(getattr(settings, "AI_LEARN_BINS", 6))
+        self.learn_rate = float(getattr(settings, "AI_LEARN_RATE", 0.15))
+        self.hist = int(getattr(settings, "AI_HISTORY", 12))
+        s0 = float(getattr(settings, "AI_SKILL_START", 0.35) if skill_start is None else skill_start)
+        self.skill = np.full(n, s0)
+        # EMAs arrancan en el centro (OpponentAI arranca en la primera medicion)
+        self.pred_ema = np.full(n, self.H * 0.5)
+        self.target_ema = np.full(n, self.H * 0.5)
+        self.noise = np.zeros(n)
+        self.noise_period = 0.25
+        self._noise_t = -1.0e9
+        self.clock = 0.0
+        # zonas debiles como WeakZoneMap: conteos por fila con argmax mantenido al aprender
+        self.abins = int(max(1, getattr(settings, "AI_LEARN_ANGLE_BINS", 1)))
+        self.max_angle = float(settings.BALL_MAX_BOUNCE_DEG)
+        self.weak = np.zeros((n, self.bins), dtype=np.int32)   # marginal en Y
+        self.weak_max = np.zeros(n, dtype=np.int32)
+        self.weak_arg = np.zeros(n, dtype=np.int64)
+        if self.abins > 1:
+            self.weak2 = np.zeros((n, self.bins, self.abins), dtype=np.int32)
+            self.col_max = np.zeros((n, self.abins), dtype=np.int32)
+            self.col_arg = np.zeros((n, self.abins), dtype=np.int64)
+        self.weak_center = np.zeros(n)
+        self.weak_w = np.zeros(n)   # 0 sin datos, learn_rate con datos
+        self.covers = np.zeros((n, self.hist), dtype=np.int8)
+        self.cover_len = np.zeros(n, dtype=np.int32)
+        self.cover_pos = np.zeros(n, dtype=np.int32)
+        self.acc_recent = np.zeros(n)
+        self.a_pred = np.zeros(n)
+        self.a_tgt = np.zeros(n)
+        self.k_base = np.zeros(n)
+        self.k_center = np.zeros(n)
+        self.noise_amp = np.zeros(n)
+        self.ai_speed = np.zeros(n)
+        self._skill_changed()
+        self.traj = BatchTrajectory(n, self.ai_x + self.PW, self.H, self.R, angles=self.abins > 1)
+
+        # marcador y estadisticas
+        self.score_p = np.zeros(n, dtype=np.int32)
+        self.score_ai = np.zeros(n, dtype=np.int32)
+        self.matches = 0
+        self.player_wins = 0
+        self.points = 0
+        self.rally_hits = np.zeros(n, dtype=np.int32)
+        self.rally_hist = np.zeros(64, dtype=np.int64)
+        self.max_speed = np.zeros(n)
+        self.tick = 0
+
+        # goles del ultimo paso (para politicas de jugador)
+        self.ev_point = np.zeros(n, dtype=bool)
+
+        self._reset_balls(np.ones(n, dtype=bool), np.ones(n))
+
+    # -------- pelota --------
+    def _reset_balls(self, mask, direction):
+        k = int(mask.sum())
+        if k == 0:
+            return
+        ang = np.radians(self.rng.uniform(-25.0, 25.0, size=k))
+        spd = self.spd_start[mask]
+        self.bx[mask] = float(settings.SCREEN_WIDTH // 2)
+        self.by[mask] = float(settings.SCREEN_HEIGHT // 2)
+        self.bvx[mask] = direction[mask] * spd * np.cos(ang)
+        vy = spd * np.sin(ang)
+        self.bvy[mask] = np.where(np.abs(vy) < settings.BALL_MIN_VY,
+                                  np.where(vy >= 0, settings.BALL_MIN_VY, -settings.BALL_MIN_VY), vy)
+
+    def _bounce(self, mask, paddle_top, sign):
+        # mismo calculo que Ball._bounce_angle + aceleracion por rebote
+        center = paddle_top[mask] + self.PH * 0.5
+        rel = np.clip((self.by[mask] - center) / (self.PH * 0.5), -1.0, 1.0)
+        ang = rel * np.radians(settings.BALL_MAX_BOUNCE_DEG)
+        spd = np.hypot(self.bvx[mask], self.bvy[mask])
+        spd = np.minimum(spd + self.spd_step[mask], self.spd_max[mask])
+        self.max_speed[mask] = np.maximum(self.max_speed[mask], spd)
+        self.bvx[mask] = sign * np.abs(spd * np.cos(ang))
+        vy = spd * np.sin(ang)
+        self.bvy[mask] = np.where(np.abs(vy) < settings.BALL_MIN_VY,
+                                  np.where(vy >= 0, settings.BALL_MIN_VY, -settings.BALL_MIN_VY), vy)
+
+    def _ball_step(self, ai_vy, pl_vy):
+        # Ball.update vectorizado: contactos en orden temporal (paredes y paletas con
+        # colision continua); cada pasada solo sigue con las partidas que tuvieron evento
+        dt, r = self.dt, self.R
+        top, bot = r, self.H - r
+        remain = np.full(self.n, dt)
+
+        # partidas lejos de ambas paletas (la gran mayoria): solo paredes, en forma cerrada
+        reach = self.PW * 0.5 + r + np.abs(self.bvx) * dt
+        near = ((np.abs(self.bx - (self.ai_x + self.PW * 0.5)) <= reach)
+                | (np.abs(self.bx - (self.pl_x + self.PW * 0.5)) <= reach))
+        far = ~near
+        span = bot - top
+        y_lin = self.by[far] + self.bvy[far] * dt
+        flips = np.floor((y_lin - top) / span) % 2 == 1
+        self.bx[far] += self.bvx[far] * dt
+        self.by[far] = fold_y_array(y_lin, top, bot)
+        vy_far = self.bvy[far]
+        vy_far[flips] *= -1.0
+        self.bvy[far] = vy_far
+
+        idx = np.nonzero(near)[0]
+        # paleta que aprieta la pelota contra la pared: se ignora el resto del paso
+        pinned = {2: np.zeros(self.n, dtype=bool), 3: np.zeros(self.n, dtype=bool)}
+        paddles = ((2, self.ai_x, self.ai_y, ai_vy), (3, self.pl_x, self.pl_y, pl_vy))
+        for _ in range(MAX_EVENTS_PER_STEP):
+            if idx.size == 0:
+                break
+            x, y, vx, vy, rem = self.bx[idx], self.by[idx], self.bvx[idx], self.bvy[idx], remain[idx]
+            k_rows = x.size
+            best = np.ones(k_rows)
+            kind = np.zeros(k_rows, dtype=np.int8)  # 0 nada, 1 pared, 2 paleta IA, 3 jugador
+            nx = np.zeros(k_rows)
+            ny = np.zeros(k_rows)
+
+            y_end = y + vy * rem
+            with np.errstate(divide="ignore", invalid="ignore"):
+                s_wall = np.clip(np.where(vy < 0, top - y, bot - y) / (vy * rem), 0.0, 1.0)
+            m = ((vy < 0) & (y_end < top)) | ((vy > 0) & (y_end > bot))
+            best[m] = s_wall[m]
+            kind[m] = 1
+
+            # fase amplia: solo las partidas cuya pelota puede alcanzar la franja de alguna
+            # paleta; las dos paletas van juntas en una sola llamada vectorizada
+            reach = self.PW * 0.5 + r + np.abs(vx) * rem
+            near_ai = np.nonzero((np.abs(x - (self.ai_x + self.PW * 0.5)) <= reach) & ~pinned[2][idx])[0]
+            near_pl = np.nonzero((np.abs(x - (self.pl_x + self.PW * 0.5)) <= reach) & ~pinned[3][idx])[0]
+            near = np.concatenate((near_ai, near_pl))
+            if near.size:
+                sub = idx[near]
+                which = np.concatenate((np.full(near_ai.size, 2, np.int8), np.full(near_pl.size, 3, np.int8)))
+                is_ai = which == 2
+                rx0 = np.where(is_ai, self.ai_x, self.pl_x)
+                pvy = np.where(is_ai, ai_vy[sub], pl_vy[sub])
+                rs = rem[near]
+                ry0 = np.where(is_ai, self.ai_y[sub], self.pl_y[sub]) - pvy * rs
+                hit, s_hit, hx, hy = sweep_circle_rect_array(x[near], y[near], vx[near] * rs, (vy[near] - pvy) * rs, r,
+                                                             rx0, ry0, rx0 + self.PW, ry0 + self.PH)
+                hit &= s_hit < best[near]
+                # si una fila choca con las dos, gana el contacto mas temprano (se asigna al final)
+                order = np.nonzero(hit)[0]
+                order = order[np.argsort(-s_hit[order])]
+                rows = near[order]
+                best[rows] = s_hit[order]
+                kind[rows] = which[order]
+                nx[rows] = hx[order]
+                ny[rows] = hy[order]
+
+            step = rem * best
+            self.bx[idx] = x + vx * step
+            self.by[idx] = y + vy * step
+            remain[idx] = rem - step
+
+            self.bvy[idx[kind == 1]] *= -1.0
+            for k, px, p_end, p_vy in paddles:
+                m = kind == k
+                if not m.any():
+                    continue
+                ci = idx[m]
+                top_c = p_end[ci] - p_vy[ci] * remain[ci]
+                self.bx[ci], self.by[ci] = separate_circle_rect_array(self.bx[ci], self.by[ci], r, px, top_c,
+                                                                      px + self.PW, top_c + self.PH, nx[m], ny[m])
+                out = (self.by[ci] < top) | (self.by[ci] > bot)
+                pinned[k][ci[out]] = True
+                self.by[ci] = np.clip(self.by[ci], top, bot)
+                face = m & (np.abs(nx) >= 0.7)
+                if face.any():
+                    fi = idx[face]
+                    top_now = p_end - p_vy * remain  # paleta en el instante del contacto
+                    self._bounce(fi, top_now, np.sign(nx[face]))
+                    self.rally_hits[fi] += 1
+                end = m & ~face
+                if end.any():
+                    ei = idx[end]
+                    pvy = p_vy[ei]
+                    rvx, rvy = self.bvx[ei], self.bvy[ei] - pvy
+                    dot = np.minimum(rvx * nx[end] + rvy * ny[end], 0.0)
+                    self.bvx[ei] = rvx - 2.0 * dot * nx[end]
+                    self.bvy[ei] = rvy - 2.0 * dot * ny[end] + pvy
+            idx = idx[(kind != 0) & (remain[idx] > 1e-9)]
+        np.clip(self.by, top, bot, out=self.by)
+
+    # -------- paletas --------
+    def _paddle_step(self, y, target, max_speed):
+        # PaddleBase.update: zona muerta, control proporcional y truncado a enteros
+        dt = self.dt
+        target_top = np.trunc(target - self.PH * 0.5)
+        dy = target_top - y
+        desired = np.trunc(8.0 * dy * dt * max_speed / 300.0)
+        max_step = np.trunc(max_speed * dt)
+        step = np.clip(desired, -max_step, max_step)
+        moved = np.clip(y + step, 0.0, self.H - self.PH)
+        return np.where(np.abs(dy) > 5, moved, y)
+
+    # -------- IA --------
+    def _skill_changed(self, idx=None):
+        # coeficientes que solo dependen de skill: se recalculan al terminar cada punto, no por paso
+        sk = self.skill if idx is None else self.skill[idx]
+        sl = slice(None) if idx is None else idx
+        self.a_pred[sl] = 0.25 + 0.5 * sk
+        self.a_tgt[sl] = 0.30 + 0.50 * sk
+        bias = 1.0 - sk
+        self.k_base[sl] = 1.0 - 0.5 * bias
+        self.k_center[sl] = self.H * 0.5 * (0.5 * bias)
+        self.noise_amp[sl] = bias * (self.H * 0.08)
+        self.ai_speed[sl] = np.trunc(settings.PADDLE_MAX_SPEED * (0.6 + 0.4 * sk))
+
+    def _ai_decide(self):
+        h, r = self.H, self.R
+        self.clock += self.dt
+        if self.clock - self._noise_t >= self.noise_period:
+            self.noise = self.rng.uniform(-1.0, 1.0, size=self.n) * self.noise_amp
+            self._noise_t = self.clock
+
+        center = h * 0.5
+        coming = self.bvx < 0
+
+        # prediccion plegada contra techo/suelo, rehecha solo en las filas que rebotaron
+        self.traj.sync(self.bx, self.by, self.bvx, self.bvy)
+        pred_raw = np.where(self.traj.time_to_plane(self.bx) > 0, self.traj.y_plane, center)
+
+        pred = self.pred_ema + self.a_pred * (pred_raw - self.pred_ema)
+        np.copyto(self.pred_ema, pred, where=coming)
+
+        # sesgo a la zona debil (centro precalculado en _learn) + torpeza + ruido estable
+        weak_center = self.weak_center
+        if self.abins > 1:
+            # banda mas fallada para el angulo de llegada de cada fila (si ese angulo tiene datos)
+            rows = np.arange(self.n)
+            ab = angle_bins(self.traj.angle_plane, self.abins, self.max_angle)
+            bh = self.H / float(self.bins)
+            weak_center = np.where(self.col_max[rows, ab] > 0, (self.col_arg[rows, ab] + 0.5) * bh, weak_center)
+        base = self.pred_ema + self.weak_w * (weak_center - self.pred_ema)
+        mixed = base * self.k_base + self.k_center + self.noise
+        toward = self.target_ema + self.a_tgt * (mixed - self.target_ema)
+        away = 0.8 * self.target_ema + 0.2 * center
+        self.target_ema = np.where(coming, toward, away)
+        return np.where(coming, np.clip(self.target_ema, r, h - r), self.target_ema)
+
+    def _learn(self, mask, player_scored):
+        # OpponentAI.learn_on_point_end para las partidas en mask
+        idx = np.nonzero(mask)[0]
+        if idx.size == 0:
+            return
+        if player_scored:
+            bh = self.H / float(self.bins)
+            band = np.clip((np.clip(self.by[idx], 0, self.H - 1) // bh).astype(np.int64), 0, self.bins - 1)
+            # cada fila aparece una vez: suma directa y argmax incremental (empate -> banda menor)
+            self.weak[idx, band] += 1
+            c = self.weak[idx, band]
+            up = (c > self.weak_max[idx]) | ((c == self.weak_max[idx]) & (band < self.weak_arg[idx]))
+            self.weak_max[idx[up]] = c[up]
+            self.weak_arg[idx[up]] = band[up]
+            self.weak_center[idx] = (self.weak_arg[idx] + 0.5) * bh
+            self.weak_w[idx] = self.learn_rate
+            if self.abins > 1:
+                ang = np.degrees(np.arctan2(self.bvy[idx], np.maximum(np.abs(self.bvx[idx]), 1e-6)))
+                ab = angle_bins(ang, self.abins, self.max_angle)
+                self.weak2[idx, band, ab] += 1
+                c = self.weak2[idx, band, ab]
+                cm, ca = self.col_max[idx, ab], self.col_arg[idx, ab]
+                up = (c > cm) | ((c == cm) & (band < ca))
+                self.col_max[idx[up], ab[up]] = c[up]
+                self.col_arg[idx[up], ab[up]] = band[up]
+        self.covers[idx, self.cover_pos[idx]] = 0 if player_scored else 1
+        self.cover_pos[idx] = (self.cover_pos[idx] + 1) % self.hist
+        self.cover_len[idx] = np.minimum(self.cover_len[idx] + 1, self.hist)
+        self.acc_recent[idx] = self.covers[idx].sum(axis=1) / self.cover_len[idx] * 100.0
+        tgt = 0.25 + 0.70 * (self.acc_recent[idx] / 100.0)
+        self.skill[idx] = np.clip(0.90 * self.skill[idx] + 0.10 * tgt, 0.25, 0.95)
+        self._skill_changed(idx)
+
+    # -------- paso --------
+    def step(self, player_targets):
+        """Avanza todas las partidas un paso fijo; player_targets es un arreglo de Y (px) por partida."""
+        self.tick += 1
+
+        margin = settings.PADDLE_HEIGHT // 2 + 6
+        pl_t = np.clip(np.trunc(player_targets), margin, self.H - margin)
+        pl_prev, ai_prev = self.pl_y, self.ai_y
+        self.pl_y = self._paddle_step(self.pl_y, pl_t, settings.PADDLE_MAX_SPEED)
+        self.ai_y = self._paddle_step(self.ai_y, np.trunc(self._ai_decide()), self.ai_speed)
+
+        self._ball_step((self.ai_y - ai_prev) / self.dt, (self.pl_y - pl_prev) / self.dt)
+
+        # goles
+        p_sc = self.bx < 0
+        a_sc = self.bx > self.W
+        self.ev_point = p_sc | a_sc
+        if self.ev_point.any():
+            self.score_p += p_sc
+            self.score_ai += a_sc
+            self._learn(p_sc, True)
+            self._learn(a_sc, False)
+            hits = np.minimum(self.rally_hits[self.ev_point], self.rally_hist.size - 1)
+            self.rally_hist += np.bincount(hits, minlength=self.rally_hist.size)
+            self.rally_hits[self.ev_point] = 0
+            self.points += int(self.ev_point.sum())
+            self._reset_balls(self.ev_point, np.where(p_sc, -1.0, 1.0))
+
+            over = np.maximum(self.score_p, self.score_ai) >= settings.WINNING_SCORE
+            if over.any():
+                self.matches += int(over.sum())
+                self.player_wins += int((over & (self.score_p > self.score_ai)).sum())
+                self.score_p[over] = 0
+                self.score_ai[over] = 0
+
+    def run(self, seconds, player=None):
+        player = player if player is not None else NoisyTracker(self.n, 0.0, seed=0)
+        for _ in range(int(seconds * self.hz)):
+            self.step(player(self))
+        return self.summary()
+
+    def summary(self):
+        total = max(1, int(self.rally_hist.sum()))
+        mean_hits = float((np.arange(self.rally_hist.size) * self.rally_hist).sum()) / total
+        return {
+            "matches": int(self.n),
+            "sim_seconds": self.tick * self.dt,
+            "points": self.points,
+            "games_finished": self.matches,
+            "player_win_rate": self.player_wins / max(1, self.matches),
+            "mean_rally_hits": round(mean_hits, 3),
+            "ai_skill_mean": round(float(self.skill.mean()), 4),
+            "ai_skill_p90": round(float(np.percentile(self.skill, 90)), 4),
+            "max_speed_mean": round(float(self.max_speed.mean()), 1),
+        }
+
+
+class NoisyTracker:
+    """Jugador sintetico vectorizado: sigue la Y de la pelota con un error gaussiano nuevo por punto."""
+    def __init__(self, n, err_px=40.0, seed=None):
+        self.err_px = float(err_px)
+        self.rng = np.random.default_rng(seed)
+        self.err = self.rng.normal(0.0, self.err_px, size=n) if self.err_px > 0 else np.zeros(n)
+
+    def __call__(self, sim):
+        if self.err_px > 0 and sim.ev_point.any():
+            k = int(sim.ev_point.sum())
+            self.err[sim.ev_point] = self.rng.normal(0.0, self.err_px, size=k)
+        return sim.by + self.err
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulacion masiva de partidas (sin ventana)")
+    ap.add_argument("--matches", type=int, default=4096)
+    ap.add_argument("--seconds", type=float, default=60.0, help="tiempo simulado por partida")
+    ap.add_argument("--profile", type=int, default=settings.BALL_PROFILE, choices=sorted(settings.BALL_PROFILES))
+    ap.add_argument("--err", type=float, default=40.0, help="error del jugador sintetico (px)")
+    ap.add_argument("--hz", type=float, default=None, help="pasos de fisica por segundo (defecto PHYSICS_HZ)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="salida en JSON")
+    args = ap.parse_args()
+
+    sim = BatchSim(args.matches, seed=args.seed, profile=args.profile, hz=args.hz)
+    t0 = time.perf_counter()
+    res = sim.run(args.seconds, NoisyTracker(args.matches, args.err, seed=args.seed + 1))
+    wall = time.perf_counter() - t0
+    res["wall_seconds"] = round(wall, 3)
+    res["points_per_second"] = round(res["points"] / max(1e-9, wall), 1)
+    if args.json:
+        print(json.dumps(res))
+    else:
+        for k, v in res.items():
+            print(f"{k:18s} {v}")
+
+
+if __name__ == "__main__":
+    main()
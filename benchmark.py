@@ -0,0 +1,239 @@
+# benchmark.py - Mide el costo de cada etapa del frame de GameApp.run por separado y de punta a punta (ASCII)
+#
+# Uso:
+#   python benchmark.py                           # frames sinteticos, 300 iteraciones
+#   python benchmark.py --video sesion.mp4        # frames grabados
+#   python benchmark.py --session sesiones/feria  # frames de una sesion grabada (RECORD_SESSION)
+#   python benchmark.py --json out.json           # resultado legible por maquina
+#   python benchmark.py --baseline base.json      # compara y falla (exit 1) si algo empeora
+#
+# Por etapa reporta p50/p95/p99/media en ms y el pico de memoria asignada por frame (KB),
+# medido con tracemalloc (NumPy y OpenCV registran sus buffers ahi).
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+import settings
+import main as game
+from ai_strategy import OpponentAI
+from frame_source import SyntheticSource
+
+
+def synthetic_frames(n, w, h, seed=0):
+    """Frames de camara falsos: fondo con ruido y una mancha clara que se mueve como una mano."""
+    src = SyntheticSource(w, h, seed=seed, realtime=False)
+    return [src.read()[1] for _ in range(n)]
+
+
+def recorded_frames(path, n):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ok, f = cap.read()
+        if not ok:
+            break
+        frames.append(f)
+    cap.release()
+    if not frames:
+        sys.exit(f"No se pudieron leer frames de {path}")
+    return frames
+
+
+def session_frames(path, n):
+    from session_record import SessionReplay
+    rep = SessionReplay(path, realtime=False)
+    if not rep.has_frames:
+        sys.exit(f"La sesion {path} no tiene frames (grabada en modo landmarks)")
+    return [rep.frames[i] for i in range(min(n, len(rep.frames)))]
+
+
+def fake_landmarks():
+    """Landmarks de una mano abierta para medir draw_skeleton sin depender de la deteccion."""
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except Exception:
+        return None
+    lm = landmark_pb2.NormalizedLandmarkList()
+    for i in range(21):
+        p = lm.landmark.add()
+        p.x = 0.30 + 0.01 * (i % 5)
+        p.y = 0.40 + 0.015 * i
+        p.z = 0.0
+    return lm
+
+
+def percentiles(samples_ms):
+    a = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "p50": round(float(np.percentile(a, 50)), 4),
+        "p95": round(float(np.percentile(a, 95)), 4),
+        "p99": round(float(np.percentile(a, 99)), 4),
+        "mean": round(float(a.mean()), 4),
+    }
+
+
+def time_stage(fn, frames, iters, warmup=10):
+    """Corre fn(frame) iters veces rotando frames; devuelve tiempos y pico de asignacion por llamada."""
+    for i in range(warmup):
+        fn(frames[i % len(frames)])
+    times = []
+    peaks = []
+    for i in range(iters):
+        f = frames[i % len(frames)]
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        fn(f)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    res = percentiles(times)
+    res["alloc_kb"] = round(float(np.median(peaks)) / 1024.0, 1)
+    return res
+
+
+def build_stages(app, cam_frames, landmarks):
+    w, h = app.w, app.h
+    display = [game.to_display(f, w, h, np.empty((h, w, 3), np.uint8)) for f in cam_frames[:8]]
+    scratch = display[0].copy()
+
+    def on_scratch(draw):
+        # las etapas de dibujo pintan sobre una copia fija para no acumular trazos
+        def run(_f):
+            np.copyto(scratch, display[0])
+            draw(scratch)
+        return run
+
+    ai = OpponentAI(app.ai.x)
+    stages = {
+        "capture_standin": lambda f: f.copy(),
+        "flip": lambda f: cv2.flip(f, 1),
+        "fit_fill": lambda f: game.fit_fill(f, w, h),
+        "fit_fill_nearest": lambda f: game.fit_fill(f, w, h, interp=cv2.INTER_NEAREST),
+        "display_pooled": lambda f: game.to_display(f, w, h, app.pool.get("display", (h, w, 3))),
+        "hand_process": (lambda f: app.detector.process(f)) if app.detector.enabled else None,
+        "draw_skeleton": on_scratch(lambda fr: app.detector.draw_skeleton(fr, landmarks)) if landmarks is not None else None,
+        "draw_skel_simple": (on_scratch(lambda fr: app.detector.draw_skeleton(fr, landmarks, simple=True))
+                             if landmarks is not None else None),
+        "draw_banner": on_scratch(lambda fr: app._draw_banner(fr, "Entrada alterna: MOUSE o FLECHAS")),
+        "draw_edu_panel": on_scratch(app._draw_edu_panel),
+        "draw_text": on_scratch(lambda fr: (app._draw_score(fr), app._draw_footer(fr), app._draw_center_line(fr))),
+        "draw_menu": on_scratch(app._draw_menu),
+        "physics_step": lambda f: app.sim.step(app.ball.y),
+        "ai_decide": lambda f: ai.decide(app.ball, app.ai.center_y(), app.sim.dt),
+    }
+    return {k: v for k, v in stages.items() if v is not None}
+
+
+def end_to_end(app, landmarks):
+    """Un frame de GameApp.run en estado PLAYING, sin imshow ni waitKey (frame en el buffer del pool)."""
+    def frame_fn(raw):
+        frame = game.to_display(raw, app.w, app.h, app.pool.get("display", (app.h, app.w, 3)))
+        y_norm, lm, valid = (None, None, False)
+        if app.detector.enabled:
+            y_norm, lm, valid = app.detector.process(frame)
+        lm = lm if lm is not None else landmarks
+        if app.show_skeleton and lm is not None:
+            app.detector.draw_skeleton(frame, lm)
+        if not valid:
+            app._draw_banner(frame, "Entrada alterna: MOUSE o FLECHAS")
+        app._update_game(y_norm if valid else 0.5, 1.0 / 60.0)
+        if app.state != "PLAYING":
+            app.fsm.go("PLAYING")  # un gol no debe sacar al benchmark del juego
+        app._draw_gameplay(frame)
+        app._draw_center_line(frame)
+        app._draw_score(frame)
+        app._draw_footer(frame)
+        if app.show_panel:
+            app._draw_edu_panel(frame)
+        return frame
+    return frame_fn
+
+
+def compare(result, baseline, tolerance):
+    """Lista de etapas cuyo p95 empeoro mas que tolerance (fraccion) respecto al baseline."""
+    worse = []
+    for name, cur in result["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if old and old["p95"] > 0 and cur["p95"] > old["p95"] * (1.0 + tolerance):
+            worse.append((name, old["p95"], cur["p95"]))
+    return worse
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark por etapa del frame de Hand Pong")
+    ap.add_argument("--video", help="video grabado a usar en vez de frames sinteticos")
+    ap.add_argument("--session", help="sesion grabada (ruta base) a usar en vez de frames sinteticos")
+    ap.add_argument("--iters", type=int, default=300)
+    ap.add_argument("--only", help="etapas separadas por coma (por defecto todas)")
+    ap.add_argument("--panel", action="store_true", help="incluir panel educativo en punta a punta")
+    ap.add_argument("--json", help="escribir resultado JSON en este archivo ('-' = stdout)")
+    ap.add_argument("--baseline", help="JSON previo para comparar p95")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="empeoramiento permitido (0.15 = 15%%)")
+    args = ap.parse_args()
+
+    cw, ch = settings.CAMERA_CAPTURE_W, settings.CAMERA_CAPTURE_H
+    if args.session:
+        cam_frames = session_frames(args.session, 120)
+    elif args.video:
+        cam_frames = recorded_frames(args.video, 120)
+    else:
+        cam_frames = synthetic_frames(60, cw, ch)
+
+    app = game.GameApp(headless=True)
+    app.fsm.go("PLAYING")
+    app.show_panel = bool(args.panel)
+    landmarks = fake_landmarks() if app.detector.enabled else None
+
+    tracemalloc.start()
+    stages = build_stages(app, cam_frames, landmarks)
+    only = set(args.only.split(",")) if args.only else None
+    result = {
+        "meta": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "source": args.session or args.video or "synthetic",
+            "frame": [cw, ch],
+            "display": [app.w, app.h],
+            "iters": args.iters,
+        },
+        "stages": {},
+    }
+    for name, fn in stages.items():
+        if only and name not in only:
+            continue
+        result["stages"][name] = time_stage(fn, cam_frames, args.iters)
+    if not only or "end_to_end" in only:
+        result["stages"]["end_to_end"] = time_stage(end_to_end(app, landmarks), cam_frames, args.iters)
+    tracemalloc.stop()
+
+    if args.json == "-":
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{'etapa':16s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'media':>8s} {'KB/frame':>9s}")
+        for name, r in result["stages"].items():
+            print(f"{name:16s} {r['p50']:8.3f} {r['p95']:8.3f} {r['p99']:8.3f} {r['mean']:8.3f} {r['alloc_kb']:9.1f}")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            worse = compare(result, json.load(f), args.tolerance)
+        for name, old, cur in worse:
+            print(f"REGRESION {name}: p95 {old:.3f} -> {cur:.3f} ms", file=sys.stderr)
+        if worse:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# camera_capture.py - Captura de camara en hilo propio con anillo de buffers (ASCII)
+
+import threading
+import time
+
+
+class CameraCapture:
+    """
+    Captura en segundo plano para que el bucle del juego nunca espere a la camara:
+      - Un hilo dedicado llama cap.read() sobre un anillo pequeno de buffers preasignados.
+      - Entrega "el ultimo frame gana": read() devuelve siempre el frame mas reciente.
+      - Contadores: frames perdidos, latencia captura->pantalla y FPS de captura.
+      - set_rate(fps) limita las lecturas (modo kiosco); set_rate(0) vuelve al ritmo de la
+        camara sin esperar a que termine la pausa en curso.
+    """
+    def __init__(self, cap, ring_size=3):
+        self.cap = cap
+        # minimo 3: uno publicado, uno en manos del juego y uno para escribir
+        self.ring_size = max(3, int(ring_size))
+        self._ring = [None] * self.ring_size
+        self._stamp = [0.0] * self.ring_size
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self._period = 0.0
+        self._wake = threading.Event()
+        self.ok = bool(cap is not None and cap.isOpened())
+
+        # indices del anillo (-1 = ninguno)
+        self._latest = -1    # ultimo publicado por el hilo
+        self._held = -1      # el que esta usando el juego
+        self._seq = 0        # frames publicados
+        self._seq_read = 0   # ultimo seq entregado al juego
+
+        # contadores
+        self.captured = 0
+        self.dropped = 0
+        self.capture_fps = 0.0
+        self.latency_ms = 0.0
+        self._t_last_cap = None
+
+    # -------- ciclo de vida --------
+    def start(self):
+        if not self.ok or self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="camera-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def release(self):
+        self.stop()
+        if self.cap is not None:
+            self.cap.release()
+
+    # -------- hilo de captura --------
+    def _next_slot(self):
+        # cualquier buffer que no este publicado ni en uso por el juego
+        with self._lock:
+            for i in range(self.ring_size):
+                if i != self._latest and i != self._held:
+                    return i
+        return 0
+
+    def _loop(self):
+        while self._running:
+            i = self._next_slot()
+            buf = self._ring[i]
+            ok, img = self.cap.read(buf) if buf is not None else self.cap.read()
+            # fuentes de otro proceso traen el instante real de captura
+            t = getattr(self.cap, "t_frame", 0.0) or time.perf_counter()
+            if not ok or img is None:
+                self.ok = False
+                self._running = False
+                break
+            # si la camara cambia de tamano, el anillo se reasigna al vuelo
+            if img is not buf:
+                self._ring[i] = img
+
+            with self._lock:
+                if self._seq > self._seq_read and self._latest >= 0:
+                    # el publicado anterior nunca llego al juego
+                    self.dropped += 1
+                self._latest = i
+                self._stamp[i] = t
+                self._seq += 1
+            self.captured += 1
+
+            if self._t_last_cap is not None:
+                inst = 1.0 / max(1e-6, t - self._t_last_cap)
+                self.capture_fps = inst if self.capture_fps == 0.0 else 0.9 * self.capture_fps + 0.1 * inst
+            self._t_last_cap = t
+
+            if self._period > 0.0:
+                self._wake.wait(max(0.0, self._period - (time.perf_counter() - t)))
+                self._wake.clear()
+
+    def set_rate(self, fps):
+        """Maximo de lecturas por segundo; 0 = todas las que de la camara."""
+        self._period = 1.0 / fps if fps > 0 else 0.0
+        self._wake.set()
+
+    # -------- lado del juego --------
+    def read(self):
+        """
+        No bloquea. Devuelve (frame, t_captura, nuevo) con el frame mas reciente;
+        frame es None si aun no llega ninguno. El buffer es valido hasta el proximo read().
+        """
+        with self._lock:
+            if self._latest < 0:
+                return None, 0.0, False
+            nuevo = self._seq != self._seq_read
+            self._held = self._latest
+            self._seq_read = self._seq
+            return self._ring[self._held], self._stamp[self._held], nuevo
+
+    def mark_displayed(self, t_capture):
+        """Registra la latencia captura->pantalla del frame recien mostrado."""
+        if t_capture <= 0.0:
+            return
+        lat = (time.perf_counter() - t_capture) * 1000.0
+        self.latency_ms = lat if self.latency_ms == 0.0 else 0.9 * self.latency_ms + 0.1 * lat
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "capture_fps": round(self.capture_fps, 1),
+            "latency_ms": round(self.latency_ms, 1),
+        }
+
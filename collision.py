@@ -0,0 +1,168 @@
+# collision.py - Colision continua circulo barrido vs rectangulo en movimiento (escalar y vectorizada) (ASCII)
+#
+# En el marco de la paleta (que solo se mueve en Y) la pelota recorre una recta con la
+# velocidad relativa; chocar con el rectangulo equivale a que el centro entre en el
+# rectangulo "inflado" en r con esquinas redondeadas (suma de Minkowski). Se prueban
+# las caras del rectangulo inflado y, si la entrada cae en una esquina, el circulo de
+# radio r en esa esquina. Devuelve la fraccion del paso (0..1) y la normal de contacto.
+
+import math
+
+import numpy as np
+
+
+def _closest_on_rect(px, py, x0, y0, x1, y1):
+    return min(max(px, x0), x1), min(max(py, y0), y1)
+
+
+def _deep_normal(px, py, x0, y0, x1, y1):
+    """Centro dentro del rectangulo: normal de la cara mas cercana (minima penetracion)."""
+    pen = ((px - x0, -1.0, 0.0), (x1 - px, 1.0, 0.0), (py - y0, 0.0, -1.0), (y1 - py, 0.0, 1.0))
+    _, nx, ny = min(pen)
+    return nx, ny
+
+
+def _deep_normal_array(px, py, x0, y0, x1, y1):
+    pen = np.stack(np.broadcast_arrays(px - x0, x1 - px, py - y0, y1 - py))
+    k = np.argmin(pen, axis=0)
+    return np.choose(k, (-1.0, 1.0, 0.0, 0.0)), np.choose(k, (0.0, 0.0, -1.0, 1.0))
+
+
+def separate_circle_rect(px, py, r, x0, y0, x1, y1, nx, ny):
+    """
+    Si el circulo quedo solapado con el rectangulo (p.ej. la paleta se movio encima de la
+    pelota), lo saca a distancia r de la superficie en la direccion de la normal.
+    """
+    cx, cy = _closest_on_rect(px, py, x0, y0, x1, y1)
+    ox, oy = px - cx, py - cy
+    if ox * ox + oy * oy >= r * r:
+        return px, py
+    if ox == 0.0 and oy == 0.0:
+        # centro dentro: punto de la cara indicada por la normal
+        cx = x0 if nx < 0 else (x1 if nx > 0 else px)
+        cy = y0 if ny < 0 else (y1 if ny > 0 else py)
+    return cx + nx * r, cy + ny * r
+
+
+def separate_circle_rect_array(px, py, r, x0, y0, x1, y1, nx, ny):
+    """separate_circle_rect por filas; devuelve (px, py) corregidos."""
+    cx = np.clip(px, x0, x1)
+    cy = np.clip(py, y0, y1)
+    over = np.hypot(px - cx, py - cy) < r
+    deep = (px == cx) & (py == cy)
+    cx = np.where(deep, np.where(nx < 0, x0, np.where(nx > 0, x1, px)), cx)
+    cy = np.where(deep, np.where(ny < 0, y0, np.where(ny > 0, y1, py)), cy)
+    return np.where(over, cx + nx * r, px), np.where(over, cy + ny * r, py)
+
+
+def sweep_circle_rect(px, py, dx, dy, r, x0, y0, x1, y1):
+    """
+    Circulo de radio r que va de (px, py) a (px+dx, py+dy) contra el rectangulo fijo
+    [x0, x1] x [y0, y1]. Devuelve (s, nx, ny) con s en [0, 1] la fraccion del recorrido
+    al primer contacto y (nx, ny) la normal hacia afuera; None si no hay contacto o si
+    ya se esta separando.
+    """
+    # ya en contacto al inicio: solo cuenta si se mueve hacia adentro
+    cx, cy = _closest_on_rect(px, py, x0, y0, x1, y1)
+    ox, oy = px - cx, py - cy
+    d2 = ox * ox + oy * oy
+    if d2 <= r * r:
+        if d2 > 1e-12:
+            d = math.sqrt(d2)
+            nx, ny = ox / d, oy / d
+        else:
+            nx, ny = _deep_normal(px, py, x0, y0, x1, y1)
+        if dx * nx + dy * ny < 0.0:
+            return 0.0, nx, ny
+        return None
+
+    # entrada al rectangulo inflado en r (prueba de franjas)
+    ex0, ey0, ex1, ey1 = x0 - r, y0 - r, x1 + r, y1 + r
+    t_in, t_out = 0.0, 1.0
+    axis = 0
+    for p, d, lo, hi, ax in ((px, dx, ex0, ex1, 1), (py, dy, ey0, ey1, 2)):
+        if abs(d) < 1e-12:
+            if p < lo or p > hi:
+                return None
+            continue
+        ta, tb = (lo - p) / d, (hi - p) / d
+        if ta > tb:
+            ta, tb = tb, ta
+        if ta > t_in:
+            t_in, axis = ta, ax
+        t_out = min(t_out, tb)
+        if t_in > t_out:
+            return None
+
+    hx, hy = px + dx * t_in, py + dy * t_in
+    if axis == 1 and y0 <= hy <= y1:
+        return t_in, (-1.0 if dx > 0 else 1.0), 0.0
+    if axis == 2 and x0 <= hx <= x1:
+        return t_in, 0.0, (-1.0 if dy > 0 else 1.0)
+
+    # zona de esquina: circulo de radio r centrado en la esquina mas cercana
+    kx = x0 if hx < x0 else x1
+    ky = y0 if hy < y0 else y1
+    fx, fy = px - kx, py - ky
+    a = dx * dx + dy * dy
+    b = 2.0 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - r * r
+    disc = b * b - 4.0 * a * c
+    if a < 1e-12 or disc < 0.0:
+        return None
+    s = (-b - math.sqrt(disc)) / (2.0 * a)
+    if s < 0.0 or s > 1.0:
+        return None
+    nx, ny = (fx + dx * s) / r, (fy + dy * s) / r
+    return s, nx, ny
+
+
+def sweep_circle_rect_array(px, py, dx, dy, r, x0, y0, x1, y1):
+    """
+    Version vectorizada para BatchSim (una pelota y un rectangulo por fila; los limites
+    del rectangulo pueden ser escalares o arreglos). Devuelve (hit, s, nx, ny).
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # contacto al inicio, moviendose hacia adentro
+        ox = px - np.clip(px, x0, x1)
+        oy = py - np.clip(py, y0, y1)
+        d = np.hypot(ox, oy)
+        inside = d <= r
+        deep = d <= 1e-9
+        dnx, dny = _deep_normal_array(px, py, x0, y0, x1, y1)
+        n0x = np.where(deep, dnx, ox / d)
+        n0y = np.where(deep, dny, oy / d)
+        start = inside & (dx * n0x + dy * n0y < 0.0)
+
+        # franjas del rectangulo inflado (desplazamiento nulo -> casi nulo: da +-inf)
+        dxs = np.where(dx == 0.0, 1e-12, dx)
+        dys = np.where(dy == 0.0, 1e-12, dy)
+        ta, tb = (x0 - r - px) / dxs, (x1 + r - px) / dxs
+        tx0 = np.minimum(ta, tb)
+        t_out = np.maximum(ta, tb)
+        ta, tb = (y0 - r - py) / dys, (y1 + r - py) / dys
+        ty0 = np.minimum(ta, tb)
+        np.minimum(t_out, np.maximum(ta, tb), out=t_out)
+        by_x = tx0 >= ty0
+        t_in = np.maximum(np.where(by_x, tx0, ty0), 0.0)
+        enter = ~inside & (t_in <= np.minimum(t_out, 1.0))
+        hx, hy = px + dx * t_in, py + dy * t_in
+        face_x = enter & by_x & (hy >= y0) & (hy <= y1)
+        face_y = enter & ~by_x & (hx >= x0) & (hx <= x1)
+
+        # esquinas: circulo de radio r en la esquina mas cercana al punto de entrada
+        fx = px - np.where(hx < x0, x0, x1)
+        fy = py - np.where(hy < y0, y0, y1)
+        a = dx * dx + dy * dy
+        b = fx * dx + fy * dy
+        disc = b * b - a * (fx * fx + fy * fy - r * r)
+        sc = (-b - np.sqrt(disc)) / a
+        corner = enter & ~face_x & ~face_y & (disc >= 0.0) & (sc >= 0.0) & (sc <= 1.0)
+
+        hit = start | face_x | face_y | corner
+        s = np.where(start, 0.0, np.where(corner, sc, t_in))
+        nx = np.where(start, n0x, np.where(face_x, np.where(dx > 0, -1.0, 1.0),
+                                           np.where(corner, (fx + dx * sc) / r, 0.0)))
+        ny = np.where(start, n0y, np.where(face_y, np.where(dy > 0, -1.0, 1.0),
+                                           np.where(corner, (fy + dy * sc) / r, 0.0)))
+    return hit, s, nx, ny
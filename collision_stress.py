@@ -0,0 +1,125 @@
+# collision_stress.py - Estres de la colision pelota/paleta a velocidades extremas y pocos Hz (ASCII)
+#
+# Uso:
+#   python collision_stress.py                        # 30/60/120 Hz, 500..3000 px/s
+#   python collision_stress.py --hz 30 --speeds 1500 3000 --cases 20000
+#
+# Cada caso es un solo paso de Ball.update contra una paleta que se mueve, lejos de
+# techo y suelo. La verdad se obtiene muestreando el paso muy fino (pelota y paleta en
+# linea recta). Se compara con el chequeo anterior (centro contra el plano de la cara,
+# paleta quieta en su posicion final):
+#   tunel   = hubo contacto real y el metodo no lo vio
+#   fantasma = el metodo reporta contacto que no ocurrio
+
+import argparse
+import math
+import random
+import time
+
+import settings
+from game_objects import Ball, PlayerPaddle
+
+TRUTH_SAMPLES = 2000
+
+
+def legacy_plane_hit(last_x, last_y, x, y, paddle):
+    """check_collisions anterior (paleta derecha): centro + r contra el plano x = paleta.x."""
+    r = settings.BALL_RADIUS
+    plane = paddle.x
+    if not (last_x + r <= plane <= x + r):
+        return False
+    denom = x - last_x
+    t = 0.0 if denom == 0 else min(1.0, max(0.0, (plane - (last_x + r)) / denom))
+    impact_y = last_y + (y - last_y) * t
+    return paddle.y <= impact_y <= paddle.y + paddle.height
+
+
+def truth_hit(x, y, vx, vy, paddle, dt):
+    """Hay contacto si en algun instante del paso el circulo toca el rectangulo."""
+    r2 = settings.BALL_RADIUS ** 2
+    x0, x1 = paddle.x, paddle.x + paddle.width
+    for i in range(TRUTH_SAMPLES + 1):
+        t = dt * i / TRUTH_SAMPLES
+        bx, by = x + vx * t, y + vy * t
+        py = paddle.y - paddle.vy * (dt - t)
+        cx = min(max(bx, x0), x1)
+        cy = min(max(by, py), py + paddle.height)
+        if (bx - cx) ** 2 + (by - cy) ** 2 <= r2:
+            return True
+    return False
+
+
+def make_case(rng, speed, dt, paddle):
+    """Pelota que en este paso llega (o casi) a la cara, extremo o esquina de una paleta en movimiento."""
+    r = settings.BALL_RADIUS
+    h = settings.SCREEN_HEIGHT
+    while True:
+        paddle.y = int(rng.uniform(h * 0.3, h * 0.7 - paddle.height))
+        paddle.vy = rng.uniform(-settings.PADDLE_MAX_SPEED, settings.PADDLE_MAX_SPEED)
+        ang = math.radians(rng.uniform(-60.0, 60.0))
+        vx, vy = speed * math.cos(ang), speed * math.sin(ang)
+        # punto objetivo cerca de la paleta (incluye extremos y esquinas) y retroceso hasta el inicio
+        u = rng.uniform(-0.2, 1.2)
+        tx = paddle.x - r + rng.uniform(-r, paddle.width + r)
+        ty = paddle.y + rng.uniform(-2.0 * r, paddle.height + 2.0 * r)
+        x, y = tx - vx * dt * u, ty - vy * dt * u
+        # descartar los que ya empiezan solapados (no es un contacto de este paso)
+        py = paddle.y - paddle.vy * dt
+        cx = min(max(x, paddle.x), paddle.x + paddle.width)
+        cy = min(max(y, py), py + paddle.height)
+        if (x - cx) ** 2 + (y - cy) ** 2 > r * r:
+            return x, y, vx, vy
+
+
+def run(hz, speed, cases, seed):
+    rng = random.Random(seed)
+    dt = 1.0 / hz
+    paddle = PlayerPaddle(settings.SCREEN_WIDTH - 60, (255, 255, 255))
+    ball = Ball(rng=random.Random(seed))
+    ball.spd_max = speed  # sin aceleracion: la devolucion conserva la rapidez
+    ball.spd_step = 0.0
+    n_true = new_tunnel = new_phantom = old_tunnel = old_phantom = 0
+    t_update = 0.0
+    for _ in range(cases):
+        x, y, vx, vy = make_case(rng, speed, dt, paddle)
+        truth = truth_hit(x, y, vx, vy, paddle, dt)
+        ball.x, ball.y, ball.vx, ball.vy = x, y, vx, vy
+        t0 = time.perf_counter()
+        ball.update(dt, (paddle,))
+        t_update += time.perf_counter() - t0
+        # sin paredes a la vista: cualquier cambio de velocidad es un contacto con la paleta
+        new_hit = (ball.vx, ball.vy) != (vx, vy)
+        old_hit = legacy_plane_hit(x, y, x + vx * dt, y + vy * dt, paddle)
+        n_true += truth
+        new_tunnel += truth and not new_hit
+        new_phantom += new_hit and not truth
+        old_tunnel += truth and not old_hit
+        old_phantom += old_hit and not truth
+    pct = 100.0 / max(1, n_true)
+    return {
+        "hz": hz, "speed": speed, "contacts": n_true,
+        "tunnel_pct": round(new_tunnel * pct, 2), "phantom_pct": round(new_phantom * pct, 2),
+        "legacy_tunnel_pct": round(old_tunnel * pct, 2), "legacy_phantom_pct": round(old_phantom * pct, 2),
+        "update_us": round(t_update / cases * 1e6, 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Estres de colision continua pelota/paleta")
+    ap.add_argument("--hz", type=float, nargs="+", default=[30.0, 60.0, 120.0])
+    ap.add_argument("--speeds", type=float, nargs="+", default=[500.0, 1500.0, 3000.0])
+    ap.add_argument("--cases", type=int, default=4000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    print(f"{'Hz':>5} {'px/s':>6} {'contactos':>9}  {'tunel%':>7} {'fantasma%':>9}  "
+          f"{'ant. tunel%':>11} {'ant. fantasma%':>14}  {'us/update':>9}")
+    for hz in args.hz:
+        for speed in args.speeds:
+            m = run(hz, speed, args.cases, args.seed)
+            print(f"{m['hz']:5.0f} {m['speed']:6.0f} {m['contacts']:9d}  {m['tunnel_pct']:7.2f} {m['phantom_pct']:9.2f}  "
+                  f"{m['legacy_tunnel_pct']:11.2f} {m['legacy_phantom_pct']:14.2f}  {m['update_us']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
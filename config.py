@@ -0,0 +1,90 @@
+# config.py - Configuracion de GameApp resuelta una sola vez desde settings.py, con tipos (ASCII)
+#
+# settings.py sigue siendo el archivo que se edita. AppConfig lee cada valor una vez al
+# iniciar (con su valor por defecto si falta) y lo convierte al tipo esperado, asi el
+# bucle del juego usa atributos simples en vez de getattr(settings, ...) por frame.
+# Lo que cambia en plena partida (perfil de pelota con 1/2/3) sigue en settings.
+
+import settings
+
+# (atributo, nombre en settings, tipo, valor por defecto)
+_FIELDS = (
+    # ventana
+    ("width", "SCREEN_WIDTH", int, 1280),
+    ("height", "SCREEN_HEIGHT", int, 720),
+    ("fullscreen", "FULLSCREEN", bool, False),
+    ("window_name", "WINDOW_NAME", str, "Hand Pong"),
+    ("idle_fps", "IDLE_FPS", float, 15.0),
+    # partida
+    ("serve_delay", "SERVE_DELAY", float, 0.9),
+    ("max_frame_dt", "MAX_FRAME_DT", float, 0.25),
+    ("physics_seed", "PHYSICS_SEED", None, None),
+    ("two_players", "TWO_PLAYERS", bool, False),
+    ("paddle_height", "PADDLE_HEIGHT", int, 140),
+    ("paddle_l_color", "PADDLE_L_COLOR", tuple, (255, 255, 255)),
+    ("paddle_r_color", "PADDLE_R_COLOR", tuple, (255, 255, 255)),
+    ("ball_radius", "BALL_RADIUS", int, 10),
+    ("ball_color", "BALL_COLOR", tuple, (255, 255, 255)),
+    # entrada y deteccion
+    ("detection_mode", "DETECTION_MODE", str, "inline"),
+    ("detection_max_age", "DETECTION_MAX_AGE", float, 0.5),
+    ("hand_handover_s", "HAND_HANDOVER_S", float, 0.6),
+    ("hand_drop_s", "HAND_DROP_S", float, 0.5),
+    ("gestures", "GESTURES", bool, True),
+    ("gesture_hold_s", "GESTURE_HOLD_S", float, 0.5),
+    ("gesture_cooldown_s", "GESTURE_COOLDOWN_S", float, 1.0),
+    ("hand_trace_file", "HAND_TRACE_FILE", str, ""),
+    ("camera_threaded", "CAMERA_THREADED", bool, True),
+    ("capture_ring_size", "CAPTURE_RING_SIZE", int, 3),
+    ("capture_process", "CAPTURE_PROCESS", bool, False),
+    ("startup_background", "STARTUP_BACKGROUND", bool, True),
+    # panel y prediccion
+    ("edu_panel_enabled", "EDU_PANEL_ENABLED", bool, False),
+    ("edu_panel_alpha", "EDU_PANEL_ALPHA", float, 0.35),
+    ("edu_panel_padding", "EDU_PANEL_PADDING", int, 14),
+    ("edu_panel_width_frac", "EDU_PANEL_WIDTH_FRAC", float, 0.28),
+    ("edu_text_scale", "EDU_TEXT_SCALE", float, 0.7),
+    ("edu_text_thick", "EDU_TEXT_THICK", int, 2),
+    ("show_prediction", "SHOW_PREDICTION", bool, True),
+    ("pred_line_color", "PRED_LINE_COLOR", tuple, (120, 255, 120)),
+    # rendimiento
+    ("profiler_overlay", "PROFILER_OVERLAY", bool, False),
+    ("profiler_log", "PROFILER_LOG", str, ""),
+    ("frame_alloc_check", "FRAME_ALLOC_CHECK", bool, False),
+    ("quality_governor", "QUALITY_GOVERNOR", bool, True),
+    ("quality_target_fps", "QUALITY_TARGET_FPS", float, 30.0),
+    ("quality_level", "QUALITY_LEVEL", int, 0),
+    ("quality_restore_s", "QUALITY_RESTORE_S", float, 3.0),
+    # kiosco
+    ("kiosk_idle_s", "KIOSK_IDLE_S", float, 45.0),
+    ("kiosk_capture_fps", "KIOSK_CAPTURE_FPS", float, 4.0),
+    ("presence_threshold", "PRESENCE_THRESHOLD", float, 18.0),
+    ("presence_min_area", "PRESENCE_MIN_AREA", float, 0.02),
+    # sesiones y aprendizaje
+    ("record_session", "RECORD_SESSION", str, ""),
+    ("record_mode", "RECORD_MODE", str, "frames"),
+    ("replay_session", "REPLAY_SESSION", str, ""),
+    ("replay_realtime", "REPLAY_REALTIME", bool, True),
+    ("ai_store_path", "AI_STORE_PATH", str, ""),
+    ("ai_store_player", "AI_STORE_PLAYER", str, ""),
+    # torneo
+    ("tournament_db", "TOURNAMENT_DB", str, ""),
+    ("tournament_season", "TOURNAMENT_SEASON", str, ""),
+    ("tournament_console", "TOURNAMENT_CONSOLE", bool, True),
+    ("leaderboard_size", "LEADERBOARD_SIZE", int, 5),
+)
+
+
+class AppConfig:
+    """Un atributo por entrada de _FIELDS, mas constantes derivadas (paddle_margin)."""
+    __slots__ = tuple(f[0] for f in _FIELDS) + ("paddle_margin",)
+
+    def __init__(self, source=settings):
+        for attr, name, kind, default in _FIELDS:
+            value = getattr(source, name, default)
+            setattr(self, attr, value if kind is None or value is None else kind(value))
+        # margen seguro para el centro de la paleta del jugador
+        self.paddle_margin = self.paddle_height // 2 + 6
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
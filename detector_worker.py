@@ -0,0 +1,140 @@
+# detector_worker.py - Deteccion de mano en hilo de fondo, desacoplada del dibujo (ASCII)
+
+import threading
+import time
+
+import numpy as np
+
+
+class AsyncHandDetector:
+    """
+    Ejecuta HandDetector.process_hands en un hilo propio:
+      - submit() deja el frame mas reciente (el ultimo gana, nunca hace cola).
+      - latest() devuelve al instante el ultimo resultado (y_norm, landmarks, valid) de la
+        primera mano; latest_hands() todas las manos [(x, y, landmarks), ...].
+        result_time guarda el instante de captura del frame que lo produjo.
+      - Reporta latencia de inferencia y edad del resultado en ms.
+    """
+    def __init__(self, detector, max_age=0.5):
+        self.detector = detector
+        self.max_age = float(max_age)
+
+        # doble buffer de entrada: el juego escribe en uno, el hilo lee el otro
+        self._bufs = [None, None]
+        self._pending = -1     # indice listo para procesar
+        self._in_use = -1      # indice que procesa el hilo
+        self._t_pending = 0.0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        # ultimo resultado publicado
+        self._result = []
+        self._t_result = 0.0   # instante de captura del frame que lo produjo
+        self.result_time = None
+
+        # metricas
+        self.inference_ms = 0.0
+        self.result_age_ms = 0.0
+        self.processed = 0
+        self.skipped = 0
+        self.errors = 0
+
+    # -------- ciclo de vida --------
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="hand-detector", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    # -------- lado del juego --------
+    def submit(self, frame_bgr, t_frame=None):
+        """Copia el frame al buffer libre y despierta al hilo. No bloquea."""
+        t_frame = time.perf_counter() if not t_frame else t_frame
+        with self._cond:
+            if self._pending >= 0:
+                # el anterior no alcanzo a procesarse: se reemplaza
+                self.skipped += 1
+                i = self._pending
+            else:
+                i = 1 if self._in_use == 0 else 0
+            buf = self._bufs[i]
+            if buf is None or buf.shape != frame_bgr.shape:
+                buf = self._bufs[i] = np.empty_like(frame_bgr)
+            np.copyto(buf, frame_bgr)
+            self._pending = i
+            self._t_pending = t_frame
+            self._cond.notify()
+
+    def latest_hands(self):
+        """Ultimas manos detectadas; lista vacia si el resultado es mas viejo que max_age."""
+        with self._cond:
+            hands = self._result
+            t_res = self._t_result
+        self.result_time = t_res if t_res > 0.0 else None
+        if t_res > 0.0:
+            age = time.perf_counter() - t_res
+            self.result_age_ms = age * 1000.0
+            if age > self.max_age:
+                return []
+        return hands
+
+    def latest(self):
+        """Ultimo resultado de una mano; se invalida si es mas viejo que max_age."""
+        hands = self.latest_hands()
+        if not hands:
+            return None, None, False
+        _, y_norm, landmarks = hands[0]
+        return float(y_norm), landmarks, True
+
+    def stats(self):
+        return {
+            "inference_ms": round(self.inference_ms, 1),
+            "result_age_ms": round(self.result_age_ms, 1),
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "errors": self.errors,
+        }
+
+    # -------- hilo de deteccion --------
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending < 0:
+                    self._cond.wait(0.1)
+                if not self._running:
+                    return
+                i = self._pending
+                t_frame = self._t_pending
+                self._pending = -1
+                self._in_use = i
+
+            t0 = time.perf_counter()
+            try:
+                res = self.detector.process_hands(self._bufs[i])
+            except Exception as e:
+                # un frame fallido no puede matar al hilo: la entrada quedaria congelada
+                self.errors += 1
+                if self.errors <= 3:
+                    print("Deteccion: error en el hilo, se sigue con el proximo frame:", repr(e))
+                with self._cond:
+                    self._in_use = -1
+                continue
+            dt_ms = (time.perf_counter() - t0) * 1000.0
+            self.inference_ms = dt_ms if self.inference_ms == 0.0 else 0.9 * self.inference_ms + 0.1 * dt_ms
+
+            with self._cond:
+                self._result = res
+                self._t_result = t_frame
+                self._in_use = -1
+            self.processed += 1
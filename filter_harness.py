@@ -0,0 +1,153 @@
+# filter_harness.py - Reproduce trazas de la mano y mide retraso y temblor de los filtros (ASCII)
+#
+# Uso:
+#   python filter_harness.py                      # traza sintetica
+#   python filter_harness.py traza.csv            # traza grabada (HAND_TRACE_FILE)
+#   python filter_harness.py traza.csv --latency 0.06 --fps 60
+#
+# La traza es un CSV con columnas t,y (segundos, y normalizada 0..1) y opcional truth.
+
+import argparse
+import bisect
+import csv
+import math
+import random
+
+import settings
+from hand_filter import HandKalman
+
+
+class LegacyDoubleEMA:
+    """Cadena anterior: EMA en el detector (por medicion) + EMA en el juego (por frame)."""
+    def __init__(self, alpha=0.28):
+        self.a = alpha
+        self.det = None
+        self.game = None
+
+    def update(self, y, t):
+        self.det = y if self.det is None else (1.0 - self.a) * self.det + self.a * y
+
+    def predict(self, t):
+        if self.det is None:
+            return None
+        self.game = self.det if self.game is None else (1.0 - self.a) * self.game + self.a * self.det
+        return self.game
+
+
+def load_trace(path):
+    ts, ys, truth = [], [], []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            ts.append(float(row["t"]))
+            ys.append(float(row["y"]) * settings.SCREEN_HEIGHT)
+            if row.get("truth"):
+                truth.append(float(row["truth"]) * settings.SCREEN_HEIGHT)
+    return ts, ys, (truth if len(truth) == len(ts) else None)
+
+
+def synthetic_trace(seconds=24.0, seed=1):
+    """Mano que alterna barrido lento, quieta y barrido rapido (4 s c/u), medida a ~30 Hz irregular con ruido."""
+    rng = random.Random(seed)
+    h = settings.SCREEN_HEIGHT
+    ts, ys, truth = [], [], []
+    t = 0.0
+    while t < seconds:
+        f = (0.5, 0.0, 1.25)[int(t / 4.0) % 3]
+        y_true = h * 0.5 + h * 0.3 * math.sin(2.0 * math.pi * f * (t % 4.0))
+        ts.append(t)
+        truth.append(y_true)
+        ys.append(y_true + rng.gauss(0.0, 4.0))
+        t += rng.uniform(1.0 / 36.0, 1.0 / 24.0)
+    return ts, ys, truth
+
+
+def _interp(ts, ys, t):
+    i = bisect.bisect_left(ts, t)
+    if i <= 0:
+        return ys[0]
+    if i >= len(ts):
+        return ys[-1]
+    t0, t1 = ts[i - 1], ts[i]
+    u = (t - t0) / max(1e-9, t1 - t0)
+    return ys[i - 1] + u * (ys[i] - ys[i - 1])
+
+
+def replay(filt, ts, ys, latency, fps):
+    """Simula el juego: cada medicion llega 'latency' s despues de capturada; se dibuja a fps."""
+    out_t, out_y = [], []
+    j = 0
+    t = ts[0]
+    step = 1.0 / fps
+    while t <= ts[-1] + latency:
+        while j < len(ts) and ts[j] + latency <= t:
+            filt.update(ys[j], ts[j])
+            j += 1
+        y = filt.predict(t)
+        if y is not None:
+            out_t.append(t)
+            out_y.append(y)
+        t += step
+    return out_t, out_y
+
+
+def measure(out_t, out_y, ref_t, ref_y):
+    """
+    Retraso (ms): desfase que minimiza el error contra la referencia (rmse a ese desfase:
+    la forma de la curva, sin contar el retraso).
+    rmse_rt (px): error contra la referencia en el mismo instante, sin desfase: lo que ve el
+    jugador (el retraso cuenta como error; es lo que la prediccion debe bajar).
+    Temblor (px): RMS del cambio por frame mientras la referencia esta quieta (< 20 px/s).
+    """
+    best_lag, best_err, rt_err = 0.0, float("inf"), float("nan")
+    for lag_ms in range(-100, 301, 2):
+        lag = lag_ms / 1000.0
+        err = 0.0
+        n = 0
+        for t, y in zip(out_t, out_y):
+            if ref_t[0] <= t - lag <= ref_t[-1]:
+                d = y - _interp(ref_t, ref_y, t - lag)
+                err += d * d
+                n += 1
+        if n and lag_ms == 0:
+            rt_err = err / n
+        if n and err / n < best_err:
+            best_err, best_lag = err / n, lag_ms
+    jit = []
+    for i in range(1, len(out_y)):
+        v_ref = (_interp(ref_t, ref_y, out_t[i]) - _interp(ref_t, ref_y, out_t[i] - 0.1)) / 0.1
+        if abs(v_ref) < 20.0:
+            jit.append(out_y[i] - out_y[i - 1])
+    jitter = math.sqrt(sum(d * d for d in jit) / max(1, len(jit)))
+    return {"lag_ms": best_lag, "rmse_px": round(math.sqrt(best_err), 2),
+            "rmse_rt_px": round(math.sqrt(rt_err), 2), "jitter_px": round(jitter, 2)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Retraso y temblor de los filtros de mano")
+    ap.add_argument("trace", nargs="?", help="CSV t,y[,truth]; sin argumento usa traza sintetica")
+    ap.add_argument("--latency", type=float, default=0.06, help="captura + inferencia (s)")
+    ap.add_argument("--fps", type=float, default=60.0, help="frecuencia de dibujo")
+    args = ap.parse_args()
+
+    if args.trace:
+        ts, ys, truth = load_trace(args.trace)
+    else:
+        ts, ys, truth = synthetic_trace()
+    ref = truth if truth is not None else ys
+    print(f"Traza: {len(ts)} mediciones, {ts[-1] - ts[0]:.1f} s, referencia={'truth' if truth else 'medicion'}")
+
+    filtros = {
+        "doble EMA (anterior)": LegacyDoubleEMA(),
+        "Kalman sin prediccion": HandKalman(max_horizon=0.0),
+        "Kalman + prediccion 20ms": HandKalman(max_horizon=0.02),
+        "Kalman (por defecto)": HandKalman(),
+    }
+    for nombre, filt in filtros.items():
+        out_t, out_y = replay(filt, ts, ys, args.latency, args.fps)
+        m = measure(out_t, out_y, ts, ref)
+        print(f"{nombre:24s} retraso={m['lag_ms']:4d} ms  rmse={m['rmse_px']:6.2f} px  "
+              f"rmse_rt={m['rmse_rt_px']:6.2f} px  temblor={m['jitter_px']:5.2f} px")
+
+
+if __name__ == "__main__":
+    main()
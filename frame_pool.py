@@ -0,0 +1,91 @@
+# frame_pool.py - Buffers de frame preasignados y medicion de asignaciones por frame (ASCII)
+
+import tracemalloc
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Buffers reutilizables por nombre para usarlos como dst= de OpenCV:
+      - get(nombre, forma) asigna la primera vez (o si cambia la forma) y despues
+        devuelve siempre el mismo arreglo.
+      - allocations cuenta las asignaciones: en regimen estable no debe crecer.
+    """
+    def __init__(self):
+        self._bufs = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        buf = self._bufs.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._bufs[name] = buf
+            self.allocations += 1
+        return buf
+
+    def peek(self, name):
+        """Buffer registrado con ese nombre (o None), sin comprobar forma."""
+        return self._bufs.get(name)
+
+    def adopt(self, name, arr):
+        """Registra un arreglo creado por otro (p.ej. cap.read sin buffer) como buffer del pool."""
+        if self._bufs.get(name) is not arr:
+            self._bufs[name] = arr
+            self.allocations += 1
+        return arr
+
+
+class AllocationMeter:
+    """
+    Modo de medicion: cuantos bloques de NumPy (buffers de frame, tambien los que crea
+    OpenCV) se asignan dentro de cada frame, sin umbral de tamano. begin() limpia las
+    trazas de tracemalloc; end() toma una instantanea y cuenta los bloques del dominio de
+    NumPy que nacieron en el frame y siguen vivos (un buffer nuevo que reemplaza al del
+    frame anterior tambien cuenta). Un frame "asigna" si esa cuenta supera threshold
+    (0 por defecto): con el pool en regimen estable frames_with_alloc debe quedar en 0.
+    """
+    def __init__(self, threshold=0, warmup=30):
+        self.threshold = int(threshold)
+        self.warmup = int(warmup)
+        self.frames = 0
+        self.frames_with_alloc = 0
+        self.blocks = 0
+        self.max_blocks = 0
+        self.max_kb = 0.0
+        self.last_sites = []  # (archivo:linea, bloques) del ultimo frame que asigno
+        self._filters = [tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)]
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def begin(self):
+        tracemalloc.clear_traces()
+
+    def end(self):
+        snap = tracemalloc.take_snapshot().filter_traces(self._filters)
+        traces = snap.traces
+        n = len(traces)
+        self.frames += 1
+        if self.frames <= self.warmup:
+            return n
+        self.blocks += n
+        self.max_blocks = max(self.max_blocks, n)
+        self.max_kb = max(self.max_kb, sum(tr.size for tr in traces) / 1024.0)
+        if n > self.threshold:
+            self.frames_with_alloc += 1
+            self.last_sites = [(f"{st.traceback[0].filename}:{st.traceback[0].lineno}", st.count)
+                               for st in snap.statistics("lineno")[:5]]
+        return n
+
+    def summary(self):
+        return {
+            "frames": max(0, self.frames - self.warmup),
+            "frames_with_alloc": self.frames_with_alloc,
+            "blocks": self.blocks,
+            "max_blocks": self.max_blocks,
+            "max_kb": round(self.max_kb, 1),
+            "sites": self.last_sites,
+        }
+
+    def stop(self):
+        tracemalloc.stop()
@@ -0,0 +1,471 @@
+# frame_source.py - Fuentes de frames intercambiables: camara, video, sintetica y memoria compartida (ASCII)
+#
+# Todas hablan la misma interfaz que cv2.VideoCapture (isOpened, read(buf), set, get,
+# release), asi CameraCapture, GameApp y HandDetector las usan sin saber de donde viene
+# el frame. open_source() elige segun settings.FRAME_SOURCE.
+#
+# Uso (servidor/pruebas de carga):
+#   python frame_source.py --publish camera --shm handpong   # comparte la camara
+#   python frame_source.py --source shm --shm handpong --detect --seconds 10
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+import settings
+
+_BACKENDS = {
+    "any": cv2.CAP_ANY,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "v4l2": cv2.CAP_V4L2,
+    "avfoundation": cv2.CAP_AVFOUNDATION,
+    "gstreamer": cv2.CAP_GSTREAMER,
+}
+
+
+def camera_backend(name="auto"):
+    """Backend de OpenCV por nombre; "auto" = DirectShow en Windows, V4L2 en Linux, cualquiera en otro."""
+    name = (name or "auto").lower()
+    if name == "auto":
+        if sys.platform.startswith("win"):
+            return cv2.CAP_DSHOW
+        if sys.platform.startswith("linux"):
+            return cv2.CAP_V4L2
+        return cv2.CAP_ANY
+    return _BACKENDS.get(name, cv2.CAP_ANY)
+
+
+class FrameSource:
+    """Base: fuente compatible con cv2.VideoCapture. read(image) escribe en image si se pasa."""
+    def isOpened(self):
+        return False
+
+    def read(self, image=None):
+        return False, None
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        return 0.0
+
+    def release(self):
+        pass
+
+
+def _pace(t_next, period):
+    """Espera hasta t_next (perf_counter) y devuelve el siguiente instante del ritmo."""
+    now = time.perf_counter()
+    if t_next is None or now - t_next > period:
+        return now + period  # primer frame o atraso grande: no intentar recuperar
+    if t_next > now:
+        time.sleep(t_next - now)
+    return t_next + period
+
+
+def open_camera(index=None, w=None, h=None, fps=None, backend=None):
+    """Camara con el backend de la plataforma (o el de CAMERA_BACKEND) y el formato de settings."""
+    index = settings.CAMERA_INDEX if index is None else index
+    cap = cv2.VideoCapture(index, camera_backend(backend or getattr(settings, "CAMERA_BACKEND", "auto")))
+    if not cap.isOpened():
+        cap.release()
+        cap = cv2.VideoCapture(index)  # ultimo intento con el backend por defecto
+    if cap.isOpened():
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, w or settings.CAMERA_CAPTURE_W)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h or settings.CAMERA_CAPTURE_H)
+        cap.set(cv2.CAP_PROP_FPS, fps or settings.CAMERA_FPS)
+        try:
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        except Exception:
+            pass
+    return cap
+
+
+class VideoFileSource(FrameSource):
+    """Video grabado, en bucle y (si realtime) al ritmo del archivo."""
+    def __init__(self, path, loop=True, realtime=True):
+        self.cap = cv2.VideoCapture(path)
+        self.loop = bool(loop)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0.0
+        self.period = 1.0 / fps if realtime and fps > 0 else 0.0
+        self._t_next = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        if self.period:
+            self._t_next = _pace(self._t_next, self.period)
+        ok, img = self.cap.read(image)
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, img = self.cap.read(image)
+        return ok, img
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+
+class SyntheticSource(FrameSource):
+    """
+    Escena generada: fondo con ruido fijo y una mancha color piel que sube y baja como
+    una mano. Sirve para pruebas de carga sin camara (MediaPipe no la reconoce como mano).
+    """
+    def __init__(self, w=None, h=None, fps=None, seed=0, realtime=True):
+        self.w = int(w or settings.CAMERA_CAPTURE_W)
+        self.h = int(h or settings.CAMERA_CAPTURE_H)
+        fps = float(fps or settings.CAMERA_FPS)
+        self.period = 1.0 / fps if realtime and fps > 0 else 0.0
+        rng = np.random.default_rng(seed)
+        self._base = rng.integers(40, 90, size=(self.h, self.w, 3), dtype=np.uint8)
+        self.n = 0
+        self._t_next = None
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self.period:
+            self._t_next = _pace(self._t_next, self.period)
+        if image is None or image.shape != self._base.shape:
+            image = np.empty_like(self._base)
+        np.copyto(image, self._base)
+        cy = int(self.h * (0.5 + 0.35 * np.sin(self.n / 15.0)))
+        cv2.ellipse(image, (int(self.w * 0.3), cy), (60, 90), 0, 0, 360, (150, 180, 220), -1)
+        self.n += 1
+        return True, image
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.w)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.h)
+        return 0.0
+
+
+# -------- memoria compartida --------
+# Un solo protocolo para todo lo que cruza procesos (esta fuente "shm" y los anillos de
+# pipeline.py): ShmRing, registros de forma fija con un seqlock por ranura (seq impar =
+# escribiendo; el lector reintenta si la ranura cambio mientras copiaba).
+
+# cabecera de control comun: head (registros escritos), slots y w/h (anillos de frames,
+# para abrirlos solo con el nombre) y los campos con que pipeline.py maneja a sus hijos
+_CTRL = (("head", (), np.uint64), ("stop", (), np.uint32), ("ready", (), np.uint32),
+         ("t_want", (), np.float64), ("beat", (), np.float64),
+         ("max_hands", (), np.int32), ("pid", (), np.int32), ("infer_scale", (), np.float64),
+         ("period", (), np.float64), ("slots", (), np.int32), ("w", (), np.int32), ("h", (), np.int32))
+
+_OWNED = set()  # bloques creados (y registrados en el resource_tracker) por este proceso
+
+
+def _layout(fields, offset=0):
+    """[(nombre, forma, dtype, offset)] alineado a 8 bytes y el tamano total."""
+    out = []
+    for name, shape, dtype in fields:
+        dtype = np.dtype(dtype)
+        out.append((name, shape, dtype, offset))
+        size = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        offset += (size + 7) // 8 * 8
+    return out, offset
+
+
+class ShmRing:
+    """
+    Anillo de registros de forma fija en memoria compartida (un escritor, N lectores).
+    fields = [(nombre, forma, dtype)]; write(**valores) y read_latest(last) -> (n, dict).
+    """
+    def __init__(self, name, fields, slots=3, create=False):
+        from multiprocessing import shared_memory
+        self.fields = [(n, tuple(s), np.dtype(d).str) for n, s, d in fields]
+        self.slots = int(slots)
+        ctrl, ctrl_size = _layout(_CTRL)
+        rec, rec_size = _layout([("seq", (), np.uint64)] + self.fields)
+        size = ctrl_size + rec_size * self.slots
+        if create:
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # bloque huerfano de una ejecucion anterior
+                old = shared_memory.SharedMemory(name=name)
+                old.close()
+                old.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.shm.buf[:size] = bytes(size)
+            _OWNED.add(name)
+        else:
+            # los hijos "spawn" comparten el resource_tracker del padre: el registro de este
+            # attach es el mismo que el del dueno y se borra cuando el padre hace unlink
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = name
+        self.owner = bool(create)
+        buf = self.shm.buf
+        self.ctrl = {n: np.ndarray(s, d, buffer=buf, offset=o) for n, s, d, o in ctrl}
+        if create:
+            self.ctrl["slots"][...] = self.slots
+        self._slots = []
+        for i in range(self.slots):
+            base = ctrl_size + i * rec_size
+            self._slots.append({n: np.ndarray(s, d, buffer=buf, offset=base + o) for n, s, d, o in rec})
+
+    def spec(self):
+        """Lo necesario para abrir el mismo anillo desde otro proceso."""
+        return self.name, self.fields, self.slots
+
+    @classmethod
+    def attach(cls, spec):
+        name, fields, slots = spec
+        return cls(name, fields, slots, create=False)
+
+    # -------- escritor --------
+    def slot_for_write(self):
+        """Ranura siguiente, ya marcada como "escribiendo"; cerrar con commit()."""
+        n = int(self.ctrl["head"])
+        rec = self._slots[n % self.slots]
+        rec["seq"][...] = rec["seq"] + 1  # impar
+        return rec
+
+    def commit(self, rec):
+        rec["seq"][...] = rec["seq"] + 1
+        self.ctrl["head"][...] = self.ctrl["head"] + 1
+
+    def write(self, **values):
+        rec = self.slot_for_write()
+        for k, v in values.items():
+            rec[k][...] = v
+        self.commit(rec)
+
+    # -------- lector --------
+    @property
+    def head(self):
+        return int(self.ctrl["head"])
+
+    def read_latest(self, last=0, out=None, tries=4):
+        """
+        Copia el registro mas nuevo si head > last: (head, dict) o (last, None).
+        out (dict de arreglos) evita asignar; se reintenta si el escritor piso la ranura.
+        """
+        for _ in range(tries):
+            n = int(self.ctrl["head"])
+            if n <= last:
+                return last, None
+            rec = self._slots[(n - 1) % self.slots]
+            s1 = int(rec["seq"])
+            if s1 & 1:
+                continue
+            if out is None:
+                out = {k: np.empty_like(v) for k, v in rec.items() if k != "seq"}
+            for k, v in out.items():
+                np.copyto(v, rec[k])
+            if int(rec["seq"]) == s1:
+                return n, out
+        return last, None
+
+    def close(self):
+        self.ctrl = self._slots = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # queda alguna vista viva; el bloque se libera al salir del proceso
+        if self.owner:
+            self.shm.unlink()
+            _OWNED.discard(self.name)
+
+
+def frame_fields(w, h):
+    """Registro de frame: instante, tamano real (hw) y una imagen de hasta w x h."""
+    return [("t", (), np.float64), ("hw", (2,), np.int32), ("img", (h, w, 3), np.uint8)]
+
+
+def create_frame_ring(name, w, h, slots=3):
+    """Anillo de frames nuevo; guarda w/h en la cabecera para open_frame_ring()."""
+    ring = ShmRing(name, frame_fields(w, h), slots=slots, create=True)
+    ring.ctrl["w"][...] = w
+    ring.ctrl["h"][...] = h
+    return ring
+
+
+def open_frame_ring(name):
+    """Abre un anillo de frames existente solo con el nombre (lee slots y w/h de la cabecera)."""
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    ctrl, _ = _layout(_CTRL)
+    head = {n: int(np.ndarray(s, d, buffer=shm.buf, offset=o)) for n, s, d, o in ctrl if n in ("slots", "w", "h")}
+    shm.close()
+    return ShmRing(name, frame_fields(head["w"], head["h"]), slots=head["slots"])
+
+
+class SharedFramePublisher:
+    """
+    Publica frames en un anillo de frames: un solo escritor, cualquier cantidad de
+    lectores (SharedMemorySource) en otros procesos. Un frame mas grande que el anillo
+    se reduce al escribir.
+    """
+    def __init__(self, name, w, h, slots=3):
+        self.ring = create_frame_ring(name, w, h, slots)
+        self._own = True
+
+    @classmethod
+    def on(cls, ring):
+        """Publicador sobre un anillo ya abierto (no lo borra al cerrar)."""
+        pub = cls.__new__(cls)
+        pub.ring = ring
+        pub._own = False
+        return pub
+
+    def publish(self, frame, t=None):
+        rec = self.ring.slot_for_write()
+        img = rec["img"]
+        cap_h, cap_w = img.shape[:2]
+        h, w = frame.shape[:2]
+        if h > cap_h or w > cap_w:
+            s = min(cap_w / w, cap_h / h)
+            h, w = max(1, int(h * s)), max(1, int(w * s))
+            cv2.resize(frame, (w, h), dst=img[:h, :w], interpolation=cv2.INTER_AREA)
+        else:
+            img[:h, :w] = frame
+        rec["hw"][...] = (h, w)
+        rec["t"][...] = time.perf_counter() if t is None else t
+        self.ring.commit(rec)
+
+    def close(self):
+        if self._own:
+            self.ring.close()
+
+
+class SharedMemorySource(FrameSource):
+    """
+    Lee el frame mas reciente de un anillo de frames (SharedFramePublisher o la captura
+    de pipeline.py): espera uno nuevo hasta timeout segundos (mas el periodo del anillo).
+    """
+    def __init__(self, name=None, timeout=2.0, ring=None):
+        self.timeout = float(timeout)
+        self.ring = ring
+        self._last = 0
+        self._out = None
+        self.t_frame = 0.0
+        if ring is None and name is not None:
+            try:
+                self.ring = open_frame_ring(name)
+            except FileNotFoundError:
+                return
+            if name in _OWNED:
+                return  # el dueno esta en este mismo proceso: su registro es este
+            try:
+                # el lector no es dueno del bloque: que el resource_tracker no lo borre al salir
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self.ring.shm._name, "shared_memory")
+            except Exception:
+                pass
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def _waiting(self, now):
+        """Se llama mientras se espera un frame; False corta la espera."""
+        return True
+
+    def read(self, image=None):
+        ring = self.ring
+        if ring is None:
+            return False, None
+        now = time.perf_counter()
+        t_end = now + self.timeout + float(ring.ctrl["period"])
+        while now < t_end:
+            n, rec = ring.read_latest(self._last, self._out)
+            if rec is not None:
+                self._out = rec
+                self._last = n
+                h, w = (int(v) for v in rec["hw"])
+                if image is None or image.shape != (h, w, 3):
+                    image = np.empty((h, w, 3), np.uint8)
+                np.copyto(image, rec["img"][:h, :w])
+                self.t_frame = float(rec["t"])
+                return True, image
+            time.sleep(0.001)
+            now = time.perf_counter()
+            if not self._waiting(now):
+                break
+        return False, None
+
+    def get(self, prop):
+        if self.ring is None:
+            return 0.0
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.ring.ctrl["w"])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.ring.ctrl["h"])
+        return 0.0
+
+    def release(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+def open_source(kind=None):
+    """Fuente segun settings.FRAME_SOURCE: "camera", "video", "synthetic" o "shm"."""
+    kind = (kind or getattr(settings, "FRAME_SOURCE", "camera")).lower()
+    if kind == "video":
+        return VideoFileSource(getattr(settings, "FRAME_SOURCE_PATH", ""))
+    if kind == "synthetic":
+        return SyntheticSource()
+    if kind == "shm":
+        return SharedMemorySource(getattr(settings, "FRAME_SOURCE_SHM", "handpong"))
+    return open_camera()
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Fuentes de frames de Hand Pong")
+    ap.add_argument("--source", default=None, help="camera | video | synthetic | shm (por defecto settings.FRAME_SOURCE)")
+    ap.add_argument("--path", help="video para --source video")
+    ap.add_argument("--shm", default=getattr(settings, "FRAME_SOURCE_SHM", "handpong"), help="nombre del bloque compartido")
+    ap.add_argument("--publish", metavar="SOURCE", help="publicar esta fuente en memoria compartida")
+    ap.add_argument("--detect", action="store_true", help="correr HandDetector sobre la fuente")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+
+    if args.path:
+        settings.FRAME_SOURCE_PATH = args.path
+    settings.FRAME_SOURCE_SHM = args.shm
+    src = open_source(args.publish or args.source)
+    if not src.isOpened():
+        sys.exit("No se pudo abrir la fuente")
+
+    pub = None
+    det = None
+    if args.detect:
+        from hand_detector import HandDetector
+        det = HandDetector()
+    buf = None
+    n = hands = 0
+    t0 = time.perf_counter()
+    try:
+        while time.perf_counter() - t0 < args.seconds:
+            ok, buf = src.read(buf)
+            if not ok:
+                break
+            if args.publish:
+                if pub is None:
+                    pub = SharedFramePublisher(args.shm, buf.shape[1], buf.shape[0])
+                pub.publish(buf)
+            if det is not None:
+                hands += det.process(buf)[2]
+            n += 1
+    finally:
+        src.release()
+        if pub is not None:
+            pub.close()
+    dt = max(1e-6, time.perf_counter() - t0)
+    print({"frames": n, "fps": round(n / dt, 1), "hands": hands if det is not None else None})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
-# game_objects.py - Paletas y pelota con colision barrida y perfiles (ASCII)
+# game_objects.py - Paletas y pelota con colision continua y perfiles (ASCII)
 
 import math
+import random
 import settings
+from collision import sweep_circle_rect, separate_circle_rect
+
+MAX_EVENTS_PER_STEP = 8  # rebotes resueltos dentro de un mismo paso (pared, paleta, pared...)
 
 def clamp(v, a, b):
     return max(a, min(b, v))
@@ -14,12 +18,14 @@ class PaddleBase:
         self.height = settings.PADDLE_HEIGHT
         self.color = color
         self.max_speed = settings.PADDLE_MAX_SPEED
+        self.vy = 0.0  # px/s del ultimo update (la pelota lo usa para la colision continua)
 
     def center_y(self):
         return self.y + self.height * 0.5
 
     def update(self, target_y, dt):
         """Movimiento suave con zona muerta para evitar tiriteo."""
+        self.vy = 0.0
         if target_y is None:
             return
         # alinear el centro de la paleta con target_y
@@ -37,8 +43,10 @@ class PaddleBase:
         max_step = int(self.max_speed * dt)
         step = clamp(desired_step, -max_step, max_step)
 
+        y_old = self.y
         self.y += step
         self.y = clamp(self.y, 0, settings.SCREEN_HEIGHT - self.height)
+        self.vy = (self.y - y_old) / dt if dt > 0 else 0.0
 
 class PlayerPaddle(PaddleBase):
     pass
@@ -47,7 +55,9 @@ class AIPaddle(PaddleBase):
     pass
 
 class Ball:
-    def __init__(self):
+    def __init__(self, rng=None):
+        # generador propio: con la misma semilla los saques se repiten (simulacion determinista)
+        self.rng = rng if rng is not None else random.Random()
         # posiciones previas para colision barrida
         self.last_x = 0.0
         self.last_y = 0.0
@@ -71,8 +81,7 @@ class Ball:
         self.last_y = float(self.y)
 
         # direccion inicial con angulo leve aleatorio
-        import random
-        ang_deg = random.uniform(-25, 25)
+        ang_deg = self.rng.uniform(-25, 25)
         ang = math.radians(ang_deg)
         spd = self.spd_start
         self.vx = direction * spd * math.cos(ang)
@@ -90,24 +99,90 @@ class Ball:
         self.spd_step = perfil["step"]
         # no tocamos vx/vy ni spd_start hasta el proximo reset
 
-    def update(self, dt):
-        # guardar posicion anterior
+    def update(self, dt, paddles=()):
+        """
+        Avanza dt resolviendo en orden temporal todos los contactos del paso: techo/suelo
+        y paletas (circulo barrido contra rectangulo en movimiento, incluidos extremos y
+        esquinas). Las paletas ya estan en su posicion final del paso; su vy da de donde
+        venian. Devuelve la lista de eventos ("hit", x, y, lado) de golpes con paleta.
+        """
         self.last_x = float(self.x)
         self.last_y = float(self.y)
+        r = settings.BALL_RADIUS
+        top = r
+        bot = settings.SCREEN_HEIGHT - r
+        events = []
 
-        # integrar
-        self.x += self.vx * dt
-        self.y += self.vy * dt
-
-        # rebotes contra techo y suelo
-        top = settings.BALL_RADIUS
-        bot = settings.SCREEN_HEIGHT - settings.BALL_RADIUS
-        if self.y <= top:
-            self.y = top
-            self.vy *= -1
-        elif self.y >= bot:
-            self.y = bot
-            self.vy *= -1
+        t = 0.0
+        pinned = []  # paletas que aprietan la pelota contra la pared: se ignoran el resto del paso
+        for _ in range(MAX_EVENTS_PER_STEP):
+            remain = dt - t
+            if remain <= 1e-9:
+                break
+            best_s, best = 1.0, None
+
+            # techo y suelo
+            if self.vy < 0 and self.y + self.vy * remain < top:
+                best_s, best = max(0.0, (top - self.y) / (self.vy * remain)), ("wall", None, 0.0, 1.0)
+            elif self.vy > 0 and self.y + self.vy * remain > bot:
+                best_s, best = max(0.0, (bot - self.y) / (self.vy * remain)), ("wall", None, 0.0, -1.0)
+
+            # paletas, en su marco (velocidad relativa) y en la posicion de este instante
+            for p in paddles:
+                if p in pinned:
+                    continue
+                py = p.y - p.vy * (dt - t)
+                hit = sweep_circle_rect(self.x, self.y, self.vx * remain, (self.vy - p.vy) * remain, r,
+                                        p.x, py, p.x + p.width, py + p.height)
+                if hit is not None and hit[0] < best_s:
+                    best_s, best = hit[0], ("paddle", p, hit[1], hit[2])
+
+            step = remain * best_s
+            self.x += self.vx * step
+            self.y += self.vy * step
+            t += step
+            if best is None:
+                break
+            kind, p, nx, ny = best
+            if kind == "wall":
+                self.vy = -self.vy
+            else:
+                py = p.y - p.vy * (dt - t)
+                self.x, self.y = separate_circle_rect(self.x, self.y, r, p.x, py, p.x + p.width, py + p.height, nx, ny)
+                if not top <= self.y <= bot:
+                    # no cabe entre el extremo de la paleta y la pared
+                    self.y = clamp(self.y, top, bot)
+                    pinned.append(p)
+                ev = self._paddle_contact(p, nx, ny, dt - t)
+                if ev is not None:
+                    events.append(ev)
+
+        # red de seguridad: la pelota nunca queda fuera de la cancha en Y
+        self.y = clamp(self.y, top, bot)
+        return events
+
+    def _paddle_contact(self, paddle, nx, ny, t_left):
+        """Respuesta al contacto: cara (o esquina casi frontal) = devolucion con angulo; extremo = reflejo."""
+        pvy = paddle.vy
+        if abs(nx) >= 0.7:
+            # devolucion como en el juego original: angulo segun punto de impacto y aceleracion
+            pc = paddle.center_y() - pvy * t_left
+            ang = self._bounce_angle(pc)
+            spd = (self.vx ** 2 + self.vy ** 2) ** 0.5
+            spd = min(spd + self.spd_step, self.spd_max)
+            side = 1.0 if nx > 0 else -1.0
+            self.vx = side * abs(spd * math.cos(ang))
+            self.vy = spd * math.sin(ang)
+            self._cap_min_vy()
+            return ("hit", self.x, self.y, "left" if paddle.x < settings.SCREEN_WIDTH * 0.5 else "right")
+
+        # extremo superior/inferior: reflejar la velocidad relativa a la paleta
+        rvx, rvy = self.vx, self.vy - pvy
+        dot = rvx * nx + rvy * ny
+        if dot < 0.0:
+            self.vx = rvx - 2.0 * dot * nx
+            self.vy = rvy - 2.0 * dot * ny + pvy
+        return None
 
     def _bounce_angle(self, paddle_center_y):
         # calcula angulo de salida segun punto de impacto en la paleta
@@ -115,54 +190,3 @@ class Ball:
         rel = clamp(rel, -1.0, 1.0)
         max_ang = math.radians(settings.BALL_MAX_BOUNCE_DEG)
         return rel * max_ang
-
-    def check_collisions(self, ai_paddle, player_paddle):
-        """
-        Colisiones barridas contra los planos verticales de las paletas.
-        Evita que la pelota atraviese cuando va rapido o el dt es grande.
-        """
-        events = []
-        r = settings.BALL_RADIUS
-
-        # --- Paleta IA (izquierda): plano x = ai.right ---
-        ax, ay, aw, ah = ai_paddle.x, ai_paddle.y, ai_paddle.width, ai_paddle.height
-        ai_plane = ax + aw
-        if self.vx < 0:
-            # ¿cruzo el borde derecho de la paleta IA?
-            if (self.last_x - r) >= ai_plane and (self.x - r) <= ai_plane:
-                denom = (self.x - r) - (self.last_x - r)
-                t = 0.0 if denom == 0 else (ai_plane - (self.last_x - r)) / denom
-                t = clamp(t, 0.0, 1.0)
-                impact_y = self.last_y + (self.y - self.last_y) * t
-                if ay <= impact_y <= ay + ah:
-                    # colocar al contacto y rebotar
-                    self.x = ai_plane + r
-                    ang = self._bounce_angle(ai_paddle.center_y())
-                    spd = (self.vx ** 2 + self.vy ** 2) ** 0.5
-                    spd = min(spd + self.spd_step, self.spd_max)
-                    self.vx = abs(spd * math.cos(ang))
-                    self.vy = spd * math.sin(ang)
-                    self._cap_min_vy()
-                    events.append(("hit", self.x, impact_y, "left"))
-
-        # --- Paleta Jugador (derecha): plano x = player.left ---
-        px, py, pw, ph = player_paddle.x, player_paddle.y, player_paddle.width, player_paddle.height
-        pl_plane = px
-        if self.vx > 0:
-            # ¿cruzo el borde izquierdo de la paleta del jugador?
-            if (self.last_x + r) <= pl_plane and (self.x + r) >= pl_plane:
-                denom = (self.x + r) - (self.last_x + r)
-                t = 0.0 if denom == 0 else (pl_plane - (self.last_x + r)) / denom
-                t = clamp(t, 0.0, 1.0)
-                impact_y = self.last_y + (self.y - self.last_y) * t
-                if py <= impact_y <= py + ph:
-                    self.x = pl_plane - r
-                    ang = self._bounce_angle(player_paddle.center_y())
-                    spd = (self.vx ** 2 + self.vy ** 2) ** 0.5
-                    spd = min(spd + self.spd_step, self.spd_max)
-                    self.vx = -abs(spd * math.cos(ang))
-                    self.vy = spd * math.sin(ang)
-                    self._cap_min_vy()
-                    events.append(("hit", self.x, impact_y, "right"))
-
-        return events
\ No newline at end of file
@@ -0,0 +1,130 @@
+# gestures.py - Gestos de la mano (palma, puno, pinza, 1-3 dedos) a partir de los landmarks (ASCII)
+#
+# HandDetector ya entrega los 21 puntos de cada mano y el juego solo usaba el nudillo
+# medio. classify() mira la geometria de todos los puntos con NumPy (sin otro modelo):
+# un dedo esta extendido si su punta queda mas lejos de la muneca que su articulacion
+# media, lo que no depende de la rotacion de la mano. GestureRecognizer confirma un
+# gesto cuando se mantiene un rato y lo entrega una sola vez, asi GameApp lo convierte
+# en la tecla que corresponda al estado actual (kiosco sin teclado).
+
+import time
+
+import numpy as np
+
+N_LANDMARKS = 21
+# indice, medio, anular, menique: puntas y articulaciones medias (PIP)
+_TIPS = (8, 12, 16, 20)
+_PIPS = (6, 10, 14, 18)
+_FINGERS = np.array(_TIPS + _PIPS)
+
+EXTEND_RATIO = 1.12   # punta / PIP respecto de la muneca para contar el dedo como extendido
+PINCH_RATIO = 0.25    # pulgar-indice (fraccion del tamano de la palma) para la pinza
+
+GESTURES = ("palma", "puno", "pinza", "1", "2", "3")
+
+
+def classify(pts, aspect=1.0):
+    """
+    pts (k, 21, 2|3) en coordenadas normalizadas del frame -> lista de k etiquetas
+    ("palma", "puno", "pinza", "1", "2", "3" o None). aspect = ancho / alto del frame.
+      - palma: los cuatro dedos extendidos (el pulgar no cuenta, es el menos confiable).
+      - puno: ninguno extendido.
+      - pinza: punta del pulgar tocando la del indice con al menos dos de los otros
+        dedos extendidos (el "OK"; en un puno el pulgar tambien queda cerca del indice).
+      - "1".."3": los primeros N dedos extendidos desde el indice y el resto doblados.
+    """
+    xy = pts[:, :, :2] * (aspect, 1.0)
+    wrist = xy[:, :1]
+    palm = np.hypot(*(xy[:, 9] - xy[:, 0]).T)
+    d = np.hypot(*np.moveaxis(xy[:, _FINGERS] - wrist, -1, 0))
+    ext = d[:, :4] > d[:, 4:] * EXTEND_RATIO
+    n_ext = ext.sum(axis=1)
+    pinch = np.hypot(*(xy[:, 4] - xy[:, 8]).T) < PINCH_RATIO * palm
+    # 1..3 dedos: ext debe ser [1]*n + [0]*(4-n) (los dedos en orden desde el indice)
+    leading = (np.cumprod(ext, axis=1).sum(axis=1) == n_ext)
+
+    out = []
+    for i in range(len(pts)):
+        if not palm[i] > 1e-4:  # tambien descarta NaN (mano sin datos)
+            out.append(None)
+        elif pinch[i] and ext[i, 1:].sum() >= 2:
+            out.append("pinza")
+        elif n_ext[i] == 4:
+            out.append("palma")
+        elif n_ext[i] == 0:
+            out.append("puno")
+        elif leading[i]:
+            out.append(str(int(n_ext[i])))
+        else:
+            out.append(None)
+    return out
+
+
+class GestureRecognizer:
+    """
+    update(manos, t) con los landmarks de la ultima deteccion -> gesto confirmado o None:
+      - un gesto se confirma si la misma etiqueta se mantiene hold_s seguidos.
+      - se entrega una sola vez: para repetirlo hay que soltarlo (otro gesto o sin mano)
+        y, entre dos gestos entregados, pasa al menos cooldown_s.
+      - con dos manos vale la primera que haga un gesto reconocido.
+    manos es una secuencia de NormalizedLandmarkList o arreglos (21, 3); los None se ignoran.
+    """
+    def __init__(self, hold_s=0.5, cooldown_s=1.0, aspect=1.0, max_hands=2):
+        self.hold_s = float(hold_s)
+        self.cooldown_s = float(cooldown_s)
+        self.aspect = float(aspect)
+        self._pts = np.empty((max_hands, N_LANDMARKS, 3), np.float32)
+        self._label = None
+        self._since = 0.0
+        self._fired = False
+        self._t_fire = None
+
+        self.label = None          # etiqueta del ultimo update (sin confirmar)
+        self.events = {}
+        self.cost_ms = 0.0
+
+    def _fill(self, hands):
+        k = 0
+        for lm in hands:
+            if lm is None or k == len(self._pts):
+                continue
+            if isinstance(lm, np.ndarray):
+                self._pts[k] = lm[:N_LANDMARKS, :3]
+            else:
+                dst = self._pts[k]
+                for i, p in enumerate(lm.landmark[:N_LANDMARKS]):
+                    dst[i, 0] = p.x
+                    dst[i, 1] = p.y
+                    dst[i, 2] = p.z
+            k += 1
+        return k
+
+    def reset(self):
+        self._label = None
+        self._fired = False
+
+    def update(self, hands, t):
+        t0 = time.perf_counter()
+        k = self._fill(hands)
+        labels = classify(self._pts[:k], self.aspect) if k else ()
+        label = next((g for g in labels if g is not None), None)
+        self.label = label
+
+        event = None
+        if label != self._label:
+            self._label = label
+            self._since = t
+            self._fired = False
+        elif (label is not None and not self._fired and t - self._since >= self.hold_s
+              and (self._t_fire is None or t - self._t_fire >= self.cooldown_s)):
+            self._fired = True
+            self._t_fire = t
+            self.events[label] = self.events.get(label, 0) + 1
+            event = label
+
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.cost_ms = ms if self.cost_ms == 0.0 else 0.9 * self.cost_ms + 0.1 * ms
+        return event
+
+    def stats(self):
+        return {"events": dict(self.events), "cost_ms": round(self.cost_ms, 3)}
@@ -0,0 +1,98 @@
+# hand_assign.py - Reparto estable de manos detectadas entre las paletas (modo dos jugadores) (ASCII)
+#
+# MediaPipe devuelve las manos sin identidad fija (el orden cambia entre frames). Cada
+# paleta ("slot": 0 = izquierda, 1 = derecha) recuerda donde vio a su mano y la sigue
+# por cercania; la mitad de pantalla solo decide el reparto inicial y el traspaso.
+
+import itertools
+import math
+
+_INF = float("inf")
+
+
+class _Slot:
+    __slots__ = ("x", "y", "t_seen", "active", "wrong_since")
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.t_seen = -1.0e9
+        self.active = False
+        self.wrong_since = None
+
+
+class HandAssigner:
+    """
+    update(manos, t) con manos = [(x_norm, y_norm, landmarks), ...] en coordenadas de
+    pantalla (ya espejada) devuelve por slot (y_norm, landmarks, valid):
+      - slot libre: toma una mano de su mitad de pantalla.
+      - slot con mano: sigue a la mano mas cercana a su ultima posicion (hasta gate), asi
+        un cruce de brazos no intercambia las paletas.
+      - traspaso: si la mano se queda en la otra mitad mas de handover_s y la paleta de
+        esa mitad esta libre, pasa a esa paleta.
+      - un slot sin mano por mas de drop_s se libera (el jugador se fue o se tapo).
+    """
+    def __init__(self, n=2, gate=0.25, handover_s=0.6, drop_s=0.5):
+        self.n = int(n)
+        self.gate = float(gate)
+        self.handover_s = float(handover_s)
+        self.drop_s = float(drop_s)
+        self.slots = [_Slot() for _ in range(self.n)]
+        self.handovers = 0
+
+    def reset(self):
+        self.slots = [_Slot() for _ in range(self.n)]
+
+    def _side(self, x):
+        return min(self.n - 1, max(0, int(x * self.n)))
+
+    def _cost(self, slot_i, hand):
+        s = self.slots[slot_i]
+        if hand is None:
+            return 0.5 if s.active else 0.0
+        x, y = hand[0], hand[1]
+        if s.active:
+            d = math.hypot(x - s.x, y - s.y)
+            return d if d <= self.gate else _INF
+        return 0.3 if self._side(x) == slot_i else _INF
+
+    def update(self, hands, t):
+        hands = list(hands)[:self.n + 2]
+        # todas las asignaciones posibles (pocas manos y pocos slots): la de menor costo;
+        # una mano que no entra en ningun slot cuesta 1
+        options = list(range(len(hands))) + [None] * self.n
+        best, best_cost = (None,) * self.n, _INF
+        for combo in set(itertools.permutations(options, self.n)):
+            cost = sum(self._cost(i, None if k is None else hands[k]) for i, k in enumerate(combo))
+            cost += 1.0 * (len(hands) - sum(k is not None for k in combo))
+            if cost < best_cost:
+                best, best_cost = combo, cost
+
+        out = [(None, None, False)] * self.n
+        for i, k in enumerate(best):
+            s = self.slots[i]
+            if k is None:
+                if s.active and t - s.t_seen > self.drop_s:
+                    s.active = False
+                    s.wrong_since = None
+                continue
+            x, y, lm = hands[k]
+            s.x, s.y, s.t_seen, s.active = x, y, t, True
+            out[i] = (y, lm, True)
+
+        # traspaso: mano asentada en la mitad de la otra paleta, que esta libre
+        for i, s in enumerate(self.slots):
+            if not s.active or s.t_seen != t:
+                continue
+            side = self._side(s.x)
+            if side == i:
+                s.wrong_since = None
+                continue
+            if s.wrong_since is None:
+                s.wrong_since = t
+            elif t - s.wrong_since >= self.handover_s and not self.slots[side].active:
+                self.slots[i], self.slots[side] = self.slots[side], s
+                s.wrong_since = None
+                out[i], out[side] = out[side], out[i]
+                self.handovers += 1
+        return out
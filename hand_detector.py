@@ -1,71 +1,258 @@
 # hand_detector.py — Deteccion de mano con MediaPipe (opcional). Devuelve (y_norm, landmarks, valid)
 
+import importlib.util
+import threading
+
 import cv2
 import settings
+from frame_pool import FramePool
+
+# MediaPipe se importa recien al cargar el modelo (tarda ~1 s): el menu no lo espera
+_mp = None
+
+
+def mediapipe_available():
+    """True si MediaPipe esta instalado (sin importarlo)."""
+    return importlib.util.find_spec("mediapipe") is not None
 
-try:
-    import mediapipe as mp
-    _MP = True
-except Exception:
-    _MP = False
+
+def _import_mediapipe():
+    global _mp
+    if _mp is None:
+        import mediapipe as mp
+        _mp = mp
+    return _mp
 
 def clamp(v, a, b):
     return max(a, min(b, v))
 
 class HandDetector:
-    def __init__(self):
-        self.enabled = _MP
+    """
+    Deteccion de una mano. El modelo se carga con load() (en segundo plano desde
+    startup.py) o, si nadie lo cargo antes, en el primer process(). warmup() corre una
+    inferencia vacia para que el primer frame de juego no pague el armado del grafo.
+    Con max_hands > 1 una sola inferencia por frame devuelve todas las manos
+    (process_hands); la ROI de seguimiento solo se usa con una mano.
+    """
+    def __init__(self, max_hands=1):
+        self.enabled = mediapipe_available()
         self._ready = False
+        # reentrante: process_hands/warmup lo toman y dentro load() tambien; asi set_max_hands
+        # (juego) no cierra el grafo ni warmup pisa los buffers mientras infiere el hilo de deteccion
+        self._lock = threading.RLock()
+        self.mp_draw = None      # import_backend(); alcanza para dibujar sin cargar el modelo
+        self.max_hands = int(max(1, max_hands))
+
+        # inferencia reducida + region de interes (ROI) alrededor de la ultima mano
+        self.base_infer_w = int(getattr(settings, "DETECTION_INFER_WIDTH", 480))
+        self.base_roi_w = int(getattr(settings, "DETECTION_ROI_SIZE", 256))
+        self.infer_w = self.base_infer_w
+        self.roi_enabled = bool(getattr(settings, "DETECTION_ROI", True))
+        self.roi_w = self.base_roi_w
+        self.roi_margin = float(getattr(settings, "DETECTION_ROI_MARGIN", 0.35))
+        self.search_x0 = float(getattr(settings, "DETECTION_SEARCH_X0", 0.0))
+        self.roi = None          # (x0, y0, x1, y1) en pixeles del frame, None = busqueda completa
+        self.last_rect = None    # rect usado en la ultima inferencia (para depurar/overlay)
+        self.pool = FramePool()  # buffers de reduccion/RGB y del esqueleto, reutilizados
 
-        # suavizado
-        self.hand_ema = None
-        self.hand_ema_alpha = float(getattr(settings, "HAND_EMA_ALPHA", 0.28))
+    @property
+    def ready(self):
+        return self._ready
+
+    def import_backend(self):
+        """Importa MediaPipe; si falla, el detector queda deshabilitado (mouse/teclas)."""
+        if not self.enabled:
+            return None
+        try:
+            mp = _import_mediapipe()
+        except Exception as e:
+            print("MediaPipe no disponible:", e)
+            self.enabled = False
+            return None
+        self.mp_hands = mp.solutions.hands
+        self.mp_draw = mp.solutions.drawing_utils
+        self.mp_styles = mp.solutions.drawing_styles
+        return mp
 
-        if self.enabled:
-            self.mp_hands = mp.solutions.hands
-            self.mp_draw = mp.solutions.drawing_utils
-            self.mp_styles = mp.solutions.drawing_styles
+    def load(self):
+        with self._lock:
+            if self._ready or not self.enabled:
+                return
+            if self.import_backend() is None:
+                return
+            self.hands = self.mp_hands.Hands(
+                max_num_hands=self.max_hands,
+                min_detection_confidence=settings.DETECTION_CONFIDENCE,
+                min_tracking_confidence=settings.TRACKING_CONFIDENCE
+            )
+            self._ready = True
 
     def _ensure(self):
-        if self._ready or not self.enabled:
-            return
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=1,
-            min_detection_confidence=settings.DETECTION_CONFIDENCE,
-            min_tracking_confidence=settings.TRACKING_CONFIDENCE
-        )
-        self._ready = True
+        if not self._ready:
+            self.load()
 
-    def process(self, frame_bgr):
-        if not self.enabled:
-            return None, None, False
-        self._ensure()
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    def set_max_hands(self, n):
+        """Cambia cuantas manos sigue el modelo; el grafo se rearma en el proximo load()/process()."""
+        n = int(max(1, n))
+        with self._lock:
+            if n == self.max_hands:
+                return
+            self.max_hands = n
+            if self._ready:
+                self.hands.close()
+                self._ready = False
+            self.roi = None
+
+    def warmup(self, w, h):
+        """Inferencia sobre un frame vacio de w x h (busqueda completa y ROI), sin tocar el tracking."""
+        with self._lock:
+            self._ensure()
+            if not self._ready:
+                return
+            blank = self.pool.get("warmup", (h, w, 3))
+            blank[:] = 0
+            roi, last_rect = self.roi, self.last_rect
+            self._infer(blank, self._search_rect(w, h), self.infer_w)
+            if self.roi_enabled:
+                side = min(w, h) // 2
+                self._infer(blank, (0, 0, side, side), self.roi_w)
+            self.roi, self.last_rect = roi, last_rect
+
+    # -------- ROI --------
+    def _search_rect(self, w, h):
+        x0 = int(clamp(self.search_x0, 0.0, 0.9) * w)
+        return x0, 0, w, h
+
+    def _roi_from_landmarks(self, lm, w, h):
+        xs = [p.x for p in lm.landmark]
+        ys = [p.y for p in lm.landmark]
+        bx0, bx1 = min(xs) * w, max(xs) * w
+        by0, by1 = min(ys) * h, max(ys) * h
+
+        # si la mano sigue holgada dentro de la ROI actual, no se mueve (tracking estable)
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            pad = 0.10 * (rx1 - rx0)
+            side_ok = max(bx1 - bx0, by1 - by0) * (1.0 + 2.0 * self.roi_margin) <= (rx1 - rx0) * 1.25
+            if side_ok and bx0 >= rx0 + pad and bx1 <= rx1 - pad and by0 >= ry0 + pad and by1 <= ry1 - pad:
+                return self.roi
+
+        # cuadrado centrado en la mano con margen, minimo 1/4 del alto
+        side = max(bx1 - bx0, by1 - by0) * (1.0 + 2.0 * self.roi_margin)
+        side = int(clamp(side, h * 0.25, min(w, h)))
+        cx = (bx0 + bx1) * 0.5
+        cy = (by0 + by1) * 0.5
+        x0 = int(clamp(cx - side * 0.5, 0, w - side))
+        y0 = int(clamp(cy - side * 0.5, 0, h - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def _infer(self, frame_bgr, rect, target_w):
+        """
+        Recorta rect, lo lleva a target_w de ancho (la ROI, cuadrada, siempre queda de
+        target_w x target_w: el modelo ve el mismo tamano aunque la mano se acerque o se
+        aleje) y devuelve la lista de manos (landmarks en coordenadas del frame).
+        """
+        x0, y0, x1, y1 = rect
+        crop = frame_bgr[y0:y1, x0:x1]
+        cw, ch = x1 - x0, y1 - y0
+        if cw != target_w:
+            th = max(1, int(round(ch * target_w / cw)))
+            small = self.pool.get(f"small{target_w}x{th}", (th, target_w, 3))
+            interp = cv2.INTER_AREA if cw > target_w else cv2.INTER_LINEAR
+            cv2.resize(crop, (target_w, th), dst=small, interpolation=interp)
+        else:
+            small = crop
+        rgb = self.pool.get(f"rgb{target_w}x{small.shape[0]}", small.shape)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+        self.last_rect = rect
         res = self.hands.process(rgb)
         if not res.multi_hand_landmarks:
-            return None, None, False
+            return []
 
-        lm = res.multi_hand_landmarks[0]
-        h = frame_bgr.shape[0]
-        y_px = int(lm.landmark[9].y * h)  # middle_mcp aprox
-        y_norm = clamp(y_px / max(1, h), 0.0, 1.0)
+        # volver de coordenadas del recorte a coordenadas normalizadas del frame completo
+        h, w = frame_bgr.shape[:2]
+        for lm in res.multi_hand_landmarks:
+            for p in lm.landmark:
+                p.x = (x0 + p.x * cw) / w
+                p.y = (y0 + p.y * ch) / h
+        return list(res.multi_hand_landmarks)
 
-        # EMA para suavizar
-        if self.hand_ema is None:
-            self.hand_ema = float(y_norm)
-        else:
-            a = self.hand_ema_alpha
-            self.hand_ema = (1.0 - a) * float(self.hand_ema) + a * float(y_norm)
+    def process_hands(self, frame_bgr):
+        """
+        Todas las manos del frame en una sola inferencia: lista de (x_norm, y_norm, landmarks),
+        con x/y del nudillo medio (middle_mcp). Con una mano usa la ROI de seguimiento; si
+        la ROI pierde la mano, este frame queda sin manos y el siguiente busca en todo el
+        frame (una sola inferencia por frame).
+        """
+        if not self.enabled:
+            return []
+        h, w = frame_bgr.shape[:2]
+        with self._lock:
+            self._ensure()
+            if not self._ready:
+                return []
+            track = self.roi_enabled and self.max_hands == 1
 
-        return float(self.hand_ema), lm, True
+            if track and self.roi is not None:
+                found = self._infer(frame_bgr, self.roi, self.roi_w)
+                if not found:
+                    self.roi = None
+            else:
+                # sin tracking: busqueda en todo el frame a resolucion reducida
+                self.roi = None
+                found = self._infer(frame_bgr, self._search_rect(w, h), self.infer_w)
+            if track and found:
+                self.roi = self._roi_from_landmarks(found[0], w, h)
 
-    def draw_skeleton(self, frame_bgr, landmarks):
-        if not self.enabled or landmarks is None:
+        # sin suavizado aqui: el juego filtra con HandKalman usando el instante de captura
+        out = []
+        for lm in found:
+            p = lm.landmark[9]  # middle_mcp aprox
+            y_px = int(p.y * h)
+            out.append((clamp(p.x, 0.0, 1.0), clamp(y_px / max(1, h), 0.0, 1.0), lm))
+        return out
+
+    def process(self, frame_bgr):
+        """Una mano: (y_norm, landmarks, valid)."""
+        hands = self.process_hands(frame_bgr)
+        if not hands:
+            return None, None, False
+        _, y_norm, lm = hands[0]
+        return float(y_norm), lm, True
+
+    def set_infer_scale(self, scale):
+        """Reduce (o restaura) el ancho de inferencia; lo usa el gobernador de calidad."""
+        scale = max(0.1, float(scale))
+        self.infer_w = max(160, int(self.base_infer_w * scale))
+        self.roi_w = max(128, int(self.base_roi_w * scale))
+
+    def draw_skeleton(self, frame_bgr, landmarks, simple=False):
+        if self.mp_draw is None or landmarks is None:
+            return
+        if simple:
+            # calidad reducida: solo las conexiones, sin estilo ni mezcla
+            h, w = frame_bgr.shape[:2]
+            pts = [(int(p.x * w), int(p.y * h)) for p in landmarks.landmark]
+            for a, b in self.mp_hands.HAND_CONNECTIONS:
+                cv2.line(frame_bgr, pts[a], pts[b], (235, 235, 235), 2)
+            return
+        # solo se mezcla el rectangulo de la mano (+ radio de los puntos) sobre un
+        # buffer del pool, en vez de copiar y mezclar el frame completo
+        h, w = frame_bgr.shape[:2]
+        xs = [p.x for p in landmarks.landmark]
+        ys = [p.y for p in landmarks.landmark]
+        pad = 12
+        x0, x1 = int(clamp(min(xs) * w - pad, 0, w)), int(clamp(max(xs) * w + pad, 0, w))
+        y0, y1 = int(clamp(min(ys) * h - pad, 0, h)), int(clamp(max(ys) * h + pad, 0, h))
+        if x1 <= x0 or y1 <= y0:
             return
-        overlay = frame_bgr.copy()
+        overlay = self.pool.get("skeleton", frame_bgr.shape)
+        roi = frame_bgr[y0:y1, x0:x1]
+        over = overlay[y0:y1, x0:x1]
+        over[:] = roi
         self.mp_draw.draw_landmarks(
             overlay, landmarks, self.mp_hands.HAND_CONNECTIONS,
             self.mp_styles.get_default_hand_landmarks_style(),
             self.mp_styles.get_default_hand_connections_style()
         )
-        cv2.addWeighted(overlay, 0.85, frame_bgr, 0.15, 0, frame_bgr)
\ No newline at end of file
+        cv2.addWeighted(over, 0.85, roi, 0.15, 0, dst=roi)
\ No newline at end of file
@@ -0,0 +1,89 @@
+# hand_filter.py - Filtro predictivo de la mano (Kalman 1-D velocidad constante) (ASCII)
+
+import settings
+
+
+def clamp(v, a, b):
+    return max(a, min(b, v))
+
+
+class HandKalman:
+    """
+    Filtro de Kalman 1-D de velocidad constante para la Y de la mano (en px).
+      - update(y, t): incorpora una medicion con su instante; acepta intervalos irregulares.
+      - predict(t): extrapola la posicion al instante t para compensar la latencia
+        de captura + inferencia. El horizonte se limita a la latencia medida (latency:
+        EMA de la edad de cada medicion la primera vez que se predice con ella) y nunca
+        pasa de max_horizon segundos (0 = sin extrapolar).
+    Reemplaza las dos EMA en cascada (detector + juego) que agregaban retraso.
+    """
+    def __init__(self, q=None, r=None, max_horizon=None, reset_gap=0.5):
+        self.q = float(getattr(settings, "HAND_FILTER_Q", 2.0e5) if q is None else q)    # ruido de aceleracion
+        self.r = float(getattr(settings, "HAND_FILTER_R", 16.0) if r is None else r)     # ruido de medicion (px^2)
+        self.max_horizon = float(getattr(settings, "HAND_PREDICT_MAX", 0.1) if max_horizon is None else max_horizon)
+        self.reset_gap = float(reset_gap)
+        self.latency = None   # s; captura + inferencia medida (None = todavia sin medir)
+        self.reset()
+
+    def reset(self):
+        self.x = None     # posicion
+        self.v = 0.0      # velocidad (px/s)
+        self.t = None     # instante de la ultima medicion
+        self.p00 = self.p01 = self.p10 = self.p11 = 0.0
+        self._fresh = False   # medicion nueva aun no usada por predict (mide su latencia)
+
+    @property
+    def ready(self):
+        return self.x is not None
+
+    def update(self, y, t):
+        y = float(y)
+        if self.x is None or t - self.t > self.reset_gap:
+            # primera medicion (o mano perdida mucho tiempo): reiniciar
+            self.x, self.v, self.t = y, 0.0, t
+            self.p00, self.p01, self.p10, self.p11 = self.r, 0.0, 0.0, 1.0e6
+            self._fresh = True
+            return self.x
+        dt = t - self.t
+        if dt < 0.0:
+            return self.x  # medicion fuera de orden: se ignora
+        self.t = t
+        self._fresh = True
+
+        # prediccion: x += v*dt ; P = F P F' + Q (aceleracion blanca)
+        x = self.x + self.v * dt
+        p00 = self.p00 + dt * (self.p10 + self.p01) + dt * dt * self.p11
+        p01 = self.p01 + dt * self.p11
+        p10 = self.p10 + dt * self.p11
+        p11 = self.p11
+        q = self.q
+        p00 += q * dt * dt * dt / 3.0
+        p01 += q * dt * dt / 2.0
+        p10 += q * dt * dt / 2.0
+        p11 += q * dt
+
+        # correccion con la medicion de posicion
+        s = p00 + self.r
+        k0 = p00 / s
+        k1 = p10 / s
+        innov = y - x
+        self.x = x + k0 * innov
+        self.v = self.v + k1 * innov
+        self.p00 = (1.0 - k0) * p00
+        self.p01 = (1.0 - k0) * p01
+        self.p10 = p10 - k1 * p00
+        self.p11 = p11 - k1 * p01
+        return self.x
+
+    def predict(self, t):
+        """Posicion extrapolada al instante t (None si aun no hay mediciones)."""
+        if self.x is None:
+            return None
+        age = t - self.t
+        if self._fresh:
+            # primera vez que se ve esta medicion: su edad es la latencia de captura + inferencia
+            self._fresh = False
+            if 0.0 <= age <= self.reset_gap:
+                self.latency = age if self.latency is None else 0.9 * self.latency + 0.1 * age
+        limit = self.max_horizon if self.latency is None else min(self.max_horizon, self.latency)
+        return self.x + self.v * clamp(age, 0.0, limit)
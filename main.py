@@ -1,363 +1,955 @@
-# main.py - Hand Pong en espanol ASCII con EMA de mano, menu de perfiles y panel opcional
+# main.py - Hand Pong en espanol ASCII con filtro de mano, fisica a paso fijo, menu de perfiles y panel opcional
 
 import cv2
 import time
-import math
-import numpy as np
+import random
 
 import settings
 from hand_detector import HandDetector
-from game_objects import PlayerPaddle, AIPaddle, Ball
-from ai_strategy import OpponentAI
+from simulation import MatchSim
+from camera_capture import CameraCapture
+from detector_worker import AsyncHandDetector
+from hand_filter import HandKalman
+from profiler import FrameProfiler
+from overlay_cache import LayerCache, darken_rect
+from frame_pool import FramePool, AllocationMeter
+from session_record import SessionRecorder, SessionReplay
+from ai_store import AIStore, store_key
+from startup import StartupTimer, BackgroundStartup
+from hand_assign import HandAssigner
+from quality import QualityGovernor
+from pipeline import CaptureProcess, ProcessHandDetector
+from output_sink import open_sink
+from config import AppConfig
+from state_machine import StateMachine
+from presence import KioskIdle, PresenceDetector
+from gestures import GestureRecognizer
+from tournament import ANONYMOUS, ConsoleQueue, Leaderboard, PlayerQueue, match_rows
 
 # ---------- util ----------
-def fit_fill(frame, w, h):
-    return cv2.resize(frame, (w, h), interpolation=cv2.INTER_LINEAR)
+def fit_fill(frame, w, h, dst=None, interp=cv2.INTER_LINEAR):
+    return cv2.resize(frame, (w, h), dst=dst, interpolation=interp)
 
-def draw_text(frame, txt, x, y, scale, color, thickness=2, center=False):
+def to_display(raw, w, h, dst, interp=cv2.INTER_LINEAR):
+    """Espejo + escalado de un frame de camara al buffer de pantalla dst (sin asignar)."""
+    if raw.shape[1] == w and raw.shape[0] == h:
+        return cv2.flip(raw, 1, dst=dst)
+    fit_fill(raw, w, h, dst=dst, interp=interp)
+    return cv2.flip(dst, 1, dst=dst)  # flip en sitio sobre el frame ya escalado
+
+def draw_text(frame, txt, x, y, scale, color, thickness=2, center=False, line=cv2.LINE_AA):
     font = cv2.FONT_HERSHEY_SIMPLEX
     (tw, th), _ = cv2.getTextSize(txt, font, scale, thickness)
     if center:
         x = int(x - tw / 2)
-    cv2.putText(frame, txt, (int(x), int(y)), font, scale, color, thickness, cv2.LINE_AA)
+    cv2.putText(frame, txt, (int(x), int(y)), font, scale, color, thickness, line)
 
 def clamp(v, a, b):
     return max(a, min(b, v))
 
 # ---------- app ----------
 class GameApp:
-    def __init__(self):
-        self.w = settings.SCREEN_WIDTH
-        self.h = settings.SCREEN_HEIGHT
-
-        cv2.namedWindow(settings.WINDOW_NAME, cv2.WINDOW_NORMAL)
-        if settings.FULLSCREEN:
-            cv2.setWindowProperty(settings.WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-        else:
-            cv2.resizeWindow(settings.WINDOW_NAME, self.w, self.h)
-        self.window_name = settings.WINDOW_NAME
-
-        # Estados
-        self.state = "MENU"  # MENU -> SERVE -> PLAYING -> PAUSED/GAME_OVER
-        self.last_serve = time.time()
-        self.score_p = 0
-        self.score_ai = 0
-
-        # Objetos
-        margin = 40
-        self.player = PlayerPaddle(self.w - settings.PADDLE_WIDTH - margin, settings.PADDLE_R_COLOR)
-        self.ai     = AIPaddle(margin, settings.PADDLE_L_COLOR)
-        self.ball   = Ball()
-
-        # IA
-        self.ai_brain = OpponentAI(self.ai.x)
+    def __init__(self, headless=False):
+        # settings se resuelve una vez a constantes con tipo (config.py)
+        self.cfg = cfg = AppConfig()
+        self.w = cfg.width
+        self.h = cfg.height
+        self.headless = headless  # sin ventana ni camara (benchmark.py)
+        self.startup = StartupTimer()
+
+        if not headless:
+            with self.startup.phase("window"):
+                cv2.namedWindow(cfg.window_name, cv2.WINDOW_NORMAL)
+                if cfg.fullscreen:
+                    cv2.setWindowProperty(cfg.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+                else:
+                    cv2.resizeWindow(cfg.window_name, self.w, self.h)
+        self.window_name = cfg.window_name
+
+        # Sesion grabada (reemplaza camara, teclas, mouse y reloj) o grabacion de la sesion en vivo.
+        # El reloj del juego se lee una vez por vuelta (_tick) y now() devuelve ese valor: toda
+        # la logica de la vuelta ve el mismo instante y la repeticion lo reproduce exacto.
+        self._clock = time.perf_counter
+        seed = cfg.physics_seed
+        self.replay = None
+        self.recorder = None
+        self.two_players = cfg.two_players
+        if cfg.replay_session:
+            self.replay = SessionReplay(cfg.replay_session, cfg.replay_realtime)
+            self._clock = self.replay.now
+            seed = self.replay.meta.get("seed", seed)
+            settings.BALL_PROFILE = self.replay.meta.get("profile", settings.BALL_PROFILE)
+            self.two_players = bool(self.replay.meta.get("two_players", False))
+        elif cfg.record_session:
+            if seed is None:
+                seed = random.randrange(1 << 30)  # la repeticion necesita la misma semilla
+            self.recorder = SessionRecorder(cfg.record_session, cfg.record_mode,
+                                            meta={"seed": seed, "profile": settings.BALL_PROFILE,
+                                                  "two_players": self.two_players, "gestures": cfg.gestures})
+
+        # Estados: MENU -> SERVE -> PLAYING -> PAUSED/GAME_OVER (ver _build_states)
+        self._t_loop = self._clock()
+        self.last_serve = self.now()
+        self._quit = False
+        # Modo kiosco: sin actividad en menu/fin, reposo con camara lenta y deteccion de
+        # presencia (no al grabar/repetir ni sin ventana)
+        kiosk = not headless and self.replay is None and self.recorder is None
+        self.kiosk = KioskIdle(cfg.kiosk_idle_s if kiosk else 0.0)
+        self.presence = PresenceDetector(threshold=cfg.presence_threshold, min_fraction=cfg.presence_min_area)
+        self.kiosk_wait_ms = max(1, int(1000.0 / max(0.5, cfg.kiosk_capture_fps)))
+        self._raw = None
+        self._build_states()
+
+        # Simulacion a paso fijo (objetos, IA y marcador viven en MatchSim)
+        self.sim = MatchSim(seed=seed, two_players=self.two_players)
+        self.player = self.sim.player
+        self.ai = self.sim.ai
+        self.ball = self.sim.ball
+        self.ai_brain = self.sim.ai_brain
+        self.sim_acc = 0.0
+
+        # Aprendizaje guardado por perfil y jugador (no al grabar/repetir: la IA debe arrancar igual)
+        self.ai_store = None
+        self._ai_key = None
+        if cfg.ai_store_path and self.replay is None and self.recorder is None:
+            self.ai_store = AIStore(cfg.ai_store_path)
+            self._load_ai()
+        self.sim_alpha = 1.0
+        self.max_frame_dt = cfg.max_frame_dt
+
+        # Torneo: cola de jugadores (consola) y partidos/ranking en SQLite (no al repetir)
+        self.players = PlayerQueue()
+        self.match_players = (ANONYMOUS, ANONYMOUS)  # (derecho, izquierdo)
+        self._match_tick0 = 0
+        self.board = None
+        if cfg.tournament_db and self.replay is None:
+            self.board = Leaderboard(cfg.tournament_db, cfg.tournament_season or time.strftime("%Y"),
+                                     cfg.leaderboard_size)
+            if cfg.tournament_console and not headless:
+                ConsoleQueue(self.players, self.board).start()
 
         # Entrada
-        self.detector = HandDetector()
+        # una sola inferencia por frame devuelve todas las manos; con dos jugadores se
+        # reparten entre las paletas con HandAssigner
+        self.detector = HandDetector(max_hands=2 if self.two_players else 1)
+        self.assigner = HandAssigner(handover_s=cfg.hand_handover_s, drop_s=cfg.hand_drop_s)
+        self._last_hands = []
+        self._pair = ((None, None, False), (None, None, False))
+        self._t_pair = None
         self.input_safe = not getattr(self.detector, "enabled", False)
+        self.detector_async = None
+        # camara en su propio proceso (frames por memoria compartida); solo en vivo
+        self.capture_proc = None
+        if not headless and self.replay is None and cfg.capture_process:
+            self.capture_proc = CaptureProcess().start()
+        # la repeticion usa deteccion en linea: mismo frame -> mismo resultado, sin hilos
+        mode = cfg.detection_mode
+        if not self.input_safe and self.replay is None:
+            max_age = cfg.detection_max_age
+            if mode == "async":
+                self.detector_async = AsyncHandDetector(self.detector, max_age=max_age).start()
+            elif mode == "process" and not headless:
+                self.detector_async = ProcessHandDetector(self.detector, (self.h, self.w), max_age=max_age,
+                                                          capture=self.capture_proc).start()
+        self.remote_detector = isinstance(self.detector_async, ProcessHandDetector)
+        # Gestos (palma, puno, pinza, 1-3 dedos) desde los mismos landmarks; con ellos la
+        # deteccion corre tambien en menu, pausa y fin. Una repeticion los usa solo si la
+        # sesion se grabo con gestos (si no, el estado no seguiria las teclas grabadas).
+        gestures = cfg.gestures if self.replay is None else bool(self.replay.meta.get("gestures", False))
+        self.gestures = GestureRecognizer(cfg.gesture_hold_s, cfg.gesture_cooldown_s,
+                                          aspect=self.w / max(1, self.h)) if gestures else None
+        self._t_gesture = None
         self.y_from_mouse = self.h // 2
         self.key_up = False
         self.key_down = False
-        cv2.setMouseCallback(self.window_name, self._on_mouse)
-
-        # Suavizado de mano/mouse (EMA)
-        self.hand_y_ema = self.h // 2
-
-        # Camara
-        self.cap = cv2.VideoCapture(settings.CAMERA_INDEX, cv2.CAP_DSHOW)
-        self.cam_ok = self.cap.isOpened()
-        if self.cam_ok:
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings.CAMERA_CAPTURE_W)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.CAMERA_CAPTURE_H)
-            self.cap.set(cv2.CAP_PROP_FPS, settings.CAMERA_FPS)
-            try:
-                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
-            except Exception:
-                pass
+        self.key2_up = False    # W/S del jugador izquierdo (dos jugadores)
+        self.key2_down = False
+        self._build_input_tables()
+        if not headless:
+            cv2.setMouseCallback(self.window_name, self._on_mouse)
+
+        # Filtro predictivo de mano/mouse (Kalman con compensacion de latencia)
+        self.hand_filter = HandKalman()
+        self.left_filter = HandKalman()
+        self._t_meas = None
+        self._t_meas_left = None
+        self.hand_trace = open(cfg.hand_trace_file, "w") if cfg.hand_trace_file else None
+        if self.hand_trace is not None:
+            self.hand_trace.write("t,y\n")
+
+        # Fuente de frames (camara, video, sintetica o memoria compartida; ver FRAME_SOURCE) y
+        # modelo de mano: se preparan detras del menu; _finish_startup los conecta al terminar.
+        # Grabando, repitiendo o sin ventana el arranque es en linea (determinista).
+        self.cap = None
+        self.cam_ok = False
+        self.capture = None
+        self._t_capture = 0.0
+        self._frame_new = True
+        self._start_pending = False
+        self.loader = BackgroundStartup(self.detector, (self.w, self.h), self.startup,
+                                        open_camera=not headless and self.replay is None and self.capture_proc is None,
+                                        remote=self.detector_async if self.remote_detector else None)
+        if cfg.startup_background and not headless and self.replay is None and self.recorder is None:
+            self.loader.start()
+        else:
+            self.loader.run()
+            self._finish_startup()
+
+        # Buffers de frame reutilizados (captura sin hilo y frame de pantalla)
+        self.pool = FramePool()
+        self.alloc_meter = AllocationMeter() if cfg.frame_alloc_check else None
 
         # Visuales
+        self.layers = LayerCache(self.w, self.h)
         self.show_skeleton = True
-        self.show_panel = settings.EDU_PANEL_ENABLED  # empieza como diga settings (False por defecto)
+        self.show_panel = cfg.edu_panel_enabled  # empieza como diga settings (False por defecto)
+
+        # Instrumentacion por etapa (overlay con P, log CSV opcional)
+        self.profiler = FrameProfiler(log_path=cfg.profiler_log)
+        self.show_profiler = cfg.profiler_overlay
+
+        # Gobernador de calidad: sostiene QUALITY_TARGET_FPS bajando/subiendo perillas.
+        # Repitiendo o sin ventana queda fijo (la inferencia no debe depender del equipo).
+        self.quality = QualityGovernor(target_fps=cfg.quality_target_fps, start=cfg.quality_level,
+                                       enabled=cfg.quality_governor and not headless and self.replay is None,
+                                       restore_s=cfg.quality_restore_s)
+        self._infer_tick = 0
+        self._t_hands = None
+        self._apply_quality()
 
-        # Telemetria
-        self.last_speed = 0.0
-        self.last_angle_deg = 0.0
+        # Salida para publico (video y/o stream MJPEG local), codificada en otro hilo
+        self.output = None if headless else open_sink()
+
+        # Estados sin movimiento (menu, pausa, fin) se dibujan a IDLE_FPS; nunca al repetir
+        self.idle_period = 0.0 if headless or self.replay is not None or cfg.idle_fps <= 0 else 1.0 / cfg.idle_fps
 
         # Tiempo
-        self.t_prev = time.time()
+        self.t_prev = self.now()
 
-        print("Controles: ESPACIO iniciar/pausar/continuar | R reiniciar | ESC salir | H esqueleto | E panel | 1/2/3 perfil")
+        if not headless:
+            print("Controles: ESPACIO iniciar/pausar/continuar | R reiniciar | ESC salir | H esqueleto | E panel | P rendimiento | 1/2/3 perfil")
 
     # -------- bucle --------
+    def now(self):
+        """Reloj del juego: el instante de la vuelta actual (tomado una vez por vuelta)."""
+        return self._t_loop
+
     def run(self):
+        prof = self.profiler
+        meter = self.alloc_meter
         while True:
+            if self.replay is not None and not self.replay.next():
+                break
+            if self.loader is not None and self.loader.done:
+                self._finish_startup()
+            if self.kiosk.asleep:
+                self._t_loop = self._clock()
+                self._kiosk_step()
+                if self._quit:
+                    break
+                continue
+            if meter is not None:
+                meter.begin()
+            prof.begin_frame()
+            t_frame = time.perf_counter()
             frame = self._grab_frame()
-
-            # dt
-            t = time.time()
-            dt = max(0.0, min(0.05, t - self.t_prev))
+            # reloj de la vuelta, leido una sola vez: todo lo de abajo usa t (o now(), igual a t)
+            t = self._t_loop = self._clock()
+            quiet = self.fsm.current in self._quiet_states
+            if quiet and self.kiosk.enabled and self._raw is not None and self._frame_new:
+                # alguien frente a la camara en el menu: el reposo no empieza
+                if self.presence.update(self._raw):
+                    self.kiosk.touch(t)
+            prof.lap("capture")
+
+            # dt real del frame (la fisica lo consume en pasos fijos)
+            dt = max(0.0, min(self.max_frame_dt, t - self.t_prev))
             self.t_prev = t
 
             # Mano (si disponible y no en menu)
+            in_game = self.fsm.current is not self._menu_state
             y_norm = None
             landmarks = None
             valid = False
-            if not self.input_safe and self.state != "MENU":
-                y_norm, landmarks, valid = self.detector.process(frame)
-                if self.show_skeleton and landmarks is not None:
-                    self.detector.draw_skeleton(frame, landmarks)
+            t_meas = None
+            hands = ()
+            left_hand = (None, None, False)
+            # fuera de juego la deteccion solo sirve a los gestos: espera a que termine el
+            # arranque en segundo plano (el modelo se carga alla, no en este hilo) y nunca
+            # corre sobre frames vacios (sin camara)
+            gesture_track = (self.gestures is not None and self.loader is None and self._model_ready()
+                             and self._raw is not None)
+            if self.replay is not None and not self.replay.has_frames:
+                # sesion de solo landmarks: las manos grabadas (con su paleta y el instante
+                # de la medicion) reemplazan a la deteccion
+                if in_game or self.gestures is not None:
+                    (y_norm, landmarks, valid), left_hand, t_meas = self.replay.hands()
+                    if self.show_skeleton:
+                        for lm in (landmarks, left_hand[1]):
+                            if lm is not None:
+                                self.detector.draw_skeleton(frame, lm)
+            elif not self.input_safe and (in_game or gesture_track):
+                # 1 de cada infer_every frames nuevos (gobernador de calidad)
+                infer_now = False
+                if self._frame_new:
+                    self._infer_tick += 1
+                    infer_now = self._infer_tick >= self.infer_every
+                    if infer_now:
+                        self._infer_tick = 0
+                if self.detector_async is not None:
+                    if infer_now:
+                        self.detector_async.submit(frame, self._t_capture)
+                    hands = self.detector_async.latest_hands()
+                    t_meas = self.detector_async.result_time
+                else:
+                    # mismo frame de camara (o frame salteado): reutilizar resultado
+                    if infer_now:
+                        self._last_hands = self.detector.process_hands(frame)
+                        self._t_hands = self._t_capture
+                    hands = self._last_hands
+                    t_meas = self._t_hands
+                if self.two_players:
+                    # reparto solo con resultados nuevos: el mismo resultado no avanza los relojes
+                    if t_meas is None or t_meas != self._t_pair:
+                        self._pair = self.assigner.update(hands, t if t_meas is None else t_meas)
+                        self._t_pair = t_meas
+                    left_hand, (y_norm, landmarks, valid) = self._pair
+                elif hands:
+                    _, y_norm, landmarks = hands[0]
+                    valid = True
+                prof.lap("inference")
+                if self.show_skeleton and self.skeleton_mode != "off":
+                    for lm in (landmarks, left_hand[1]):
+                        if lm is not None:
+                            self.detector.draw_skeleton(frame, lm, simple=self.skeleton_mode == "simple")
+                    prof.lap("draw")
+
+            hand = (y_norm, landmarks, valid)
+            if (self.gestures is not None and t_meas is not None and t_meas != self._t_gesture
+                    and (self._model_ready() or self.replay is not None)):
+                # solo con resultados nuevos (el mismo resultado no cuenta como tiempo sostenido)
+                self._t_gesture = t_meas
+                gesture = self.gestures.update((landmarks, left_hand[1]), t_meas)
+                if gesture is not None:
+                    self._on_gesture(gesture)
 
             # Respaldo (mouse/teclas) fuera del menu
-            if self.state != "MENU" and (self.input_safe or not valid or y_norm is None):
+            if in_game and (not valid or y_norm is None):
                 y_px = int(self.y_from_mouse)
                 if self.key_up:   y_px -= int(900 * dt)
                 if self.key_down: y_px += int(900 * dt)
 
                 # margen seguro para el centro de la paleta
-                margin = settings.PADDLE_HEIGHT // 2 + 6
+                margin = self.cfg.paddle_margin
                 y_px = clamp(y_px, margin, self.h - margin)
 
-                # EMA para que no rebote
-                alpha = float(getattr(settings, "HAND_EMA_ALPHA", 0.28))
-                self.hand_y_ema = int((1.0 - alpha) * self.hand_y_ema + alpha * y_px)
-
-                y_norm = self.hand_y_ema / max(1, self.h)
-                self._draw_banner(frame, "Entrada alterna: MOUSE o FLECHAS", (60, 210, 255))
-
-            # Estados
-            if self.state == "MENU":
-                self._draw_menu(frame)
-            elif self.state == "SERVE":
-                remain = max(0.0, settings.SERVE_DELAY - (time.time() - self.last_serve))
-                self._draw_center(frame, "Listo", 0.9)
-                self._draw_center(frame, f"Saque en {remain:.1f} s", 0.6, dy=60)
-                if remain <= 0.0:
-                    self.state = "PLAYING"
-            elif self.state == "PLAYING":
-                self._update_game(y_norm, dt)
-            elif self.state == "PAUSED":
-                self._draw_center(frame, "Pausa", 0.9)
-                self._draw_center(frame, "Pulsa ESPACIO para continuar", 0.6, dy=60)
-            elif self.state == "GAME_OVER":
-                msg = "Ganaste" if self.score_p > self.score_ai else "Perdiste"
-                self._draw_center(frame, "Fin del juego", 0.9)
-                self._draw_center(frame, msg, 0.7, dy=60)
-                self._draw_center(frame, "Pulsa ESPACIO para jugar de nuevo", 0.6, dy=110)
-
-            # Dibujo comun
-            if self.state != "MENU":
-                # IA mas lenta/rapida segun skill (anti-tiriteo se maneja en ai_strategy)
-                self.ai.max_speed = int(settings.PADDLE_MAX_SPEED * (0.6 + 0.4 * self.ai_brain.skill))
-
+                self._feed_hand(y_px, self.now())
+                self._draw_banner(frame, "Entrada alterna: MOUSE o FLECHAS" + (" (der.) | W/S (izq.)" if self.two_players else ""),
+                                  (60, 210, 255))
+            elif valid and y_norm is not None:
+                if self.hand_trace is not None and t_meas != self._t_meas:
+                    self.hand_trace.write(f"{t_meas:.4f},{y_norm:.5f}\n")
+                self._feed_hand(y_norm * self.h, t_meas)
+
+            # posicion filtrada y extrapolada a "ahora" (compensa captura + inferencia)
+            y_pred = self.hand_filter.predict(self.now())
+            y_norm = None if y_pred is None else y_pred / max(1, self.h)
+            left_norm = self._left_input(left_hand, t_meas, dt) if self.two_players and in_game else None
+
+            # Estado actual (ver _build_states); el dibujo comun va encima de sus textos
+            state = self.fsm.current
+            self.fsm.update(frame, dt, y_norm, left_norm)
+            prof.lap("update")
+            if in_game:
                 self._draw_gameplay(frame)
                 self._draw_center_line(frame)
                 self._draw_score(frame)
                 self._draw_footer(frame)
+            if state.draw is not None:
+                state.draw(frame)
 
-                if self.state == "PLAYING" and self.show_panel:
-                    self._draw_edu_panel(frame)
+            # el publico ve el juego sin el overlay de rendimiento
+            if self.output is not None:
+                self.output.offer(frame, t)
 
-                if self.state == "PLAYING" and settings.SHOW_PREDICTION and self.ai_brain.pred_y is not None:
-                    x_line = self.ai.x + self.ai.width
-                    cv2.circle(frame, (x_line, int(self.ai_brain.pred_y)), 6, settings.PRED_LINE_COLOR, 2, cv2.LINE_AA)
+            if self.show_profiler:
+                prof.draw(frame)
+                draw_text(frame, f"Calidad: {self.quality.current.name}", 20, 50, 0.5, (255, 255, 255), 1,
+                          line=self.line_type)
+            prof.lap("draw")
 
             cv2.imshow(self.window_name, frame)
-            if self._handle_keys(cv2.waitKey(1) & 0xFF):
+            if self.capture is not None:
+                self.capture.mark_displayed(self._t_capture)
+            # waitKey despacha teclado/mouse; en estados quietos tambien espera hasta el
+            # proximo frame de IDLE_FPS (una tecla lo despierta antes)
+            idle = self.fsm.idle and self.idle_period > 0.0
+            wait_ms = 1
+            if idle:
+                wait_ms = max(1, int((self.idle_period - (time.perf_counter() - t_frame)) * 1000.0))
+            key = cv2.waitKey(wait_ms) & 0xFF
+            if self.replay is not None and key != 27:
+                key = self.replay.key()
+            quit_game = self._handle_keys(key)
+            if self.replay is not None:
+                self.y_from_mouse = self.replay.mouse()
+            elif self.recorder is not None:
+                self.recorder.add_loop(t, key, int(self.y_from_mouse), hand, hands, left_hand, t_meas)
+            self.startup.mark("menu_visible")
+            prof.lap("present")
+            age = None if t_meas is None else (self.now() - t_meas) * 1000.0
+            prof.end_frame(self.state, age)
+            # la espera de los estados quietos no es costo de frame: el gobernador no la ve
+            if not idle and self.quality.update(prof.frame_ms[-1], time.perf_counter()):
+                self._apply_quality()
+            if meter is not None:
+                meter.end()
+            if quit_game:
                 break
-
-        if self.cam_ok:
+            if self.kiosk.should_sleep(self.now(), quiet and self.loader is None):
+                self._kiosk_sleep()
+
+        if self.hand_trace is not None:
+            self.hand_trace.close()
+        if self.loader is not None:
+            # salida durante el arranque: esperar al hilo para liberar la camara que abra
+            self.loader.join(5.0)
+            if self.loader.cap is not None:
+                self.loader.cap.release()
+        if self.ai_store is not None:
+            self.ai_store.close()
+            print("Aprendizaje IA:", self.ai_store.stats())
+        if self.recorder is not None:
+            print("Sesion grabada:", self.recorder.path, self.recorder.close(), "vueltas")
+        if self.replay is not None:
+            print("Repeticion:", self.replay.stats())
+        print("Frame:", prof.summary())
+        print("Calidad:", self.quality.stats())
+        if self.gestures is not None:
+            print("Gestos:", self.gestures.stats())
+        if self.board is not None:
+            self.board.close()
+            print("Ranking:", self.board.stats())
+        if self.kiosk.enabled:
+            print("Kiosco:", self.kiosk.stats(), "presencia_ms:", round(self.presence.cost_ms, 3))
+        if self.output is not None:
+            self.output.close()
+            print("Salida:", self.output.stats())
+        prof.close()
+        if meter is not None:
+            print("Asignaciones:", meter.summary(), "buffers:", self.pool.allocations + self.detector.pool.allocations)
+            meter.stop()
+        if self.detector_async is not None:
+            print("Deteccion:", self.detector_async.stats())
+            self.detector_async.stop()
+        if self.capture_proc is not None:
+            print("Proceso de captura:", self.capture_proc.stats())
+        if self.capture is not None:
+            print("Captura:", self.capture.stats())
+            self.capture.release()
+        elif self.cam_ok:
             self.cap.release()
+        if self.capture_proc is not None:
+            self.capture_proc.stop()
         cv2.destroyAllWindows()
 
     # -------- logica --------
-    def _update_game(self, y_norm, dt):
-        # Jugador (mano con EMA y margen)
-        if y_norm is not None:
-            margin = settings.PADDLE_HEIGHT // 2 + 6
-            raw_y = int(y_norm * self.h)
-            raw_y = clamp(raw_y, margin, self.h - margin)
-            alpha = float(getattr(settings, "HAND_EMA_ALPHA", 0.28))
-            self.hand_y_ema = int((1.0 - alpha) * self.hand_y_ema + alpha * raw_y)
-            y_px = self.hand_y_ema
-        else:
-            y_px = None
-
-        self.player.update(y_px, dt)
-
-        # IA
-        ai_target = self.ai_brain.decide(self.ball, self.ai.center_y(), dt)
-        self.ai.update(int(ai_target), dt)
-
-        # Pelota
-        self.ball.update(dt)
-
-        # Telemetria
-        vx = float(getattr(self.ball, "vx", 0.0))
-        vy = float(getattr(self.ball, "vy", 0.0))
-        self.last_speed = math.hypot(vx, vy)
-        self.last_angle_deg = math.degrees(math.atan2(vy, vx if abs(vx) > 1e-6 else 1e-6))
-
-        # Colisiones
-        _ = self.ball.check_collisions(self.ai, self.player)
-
-        # Goles
-        if self.ball.x < 0:
-            self.score_p += 1
-            self.ai_brain.learn_on_point_end(player_scored=True, ball_final_y=float(self.ball.y))
-            self.ball.reset(direction=-1)
-            self.state = "SERVE"
-            self.last_serve = time.time()
-        elif self.ball.x > self.w:
-            self.score_ai += 1
-            self.ai_brain.learn_on_point_end(player_scored=False, ball_final_y=float(self.ball.y))
-            self.ball.reset(direction=1)
-            self.state = "SERVE"
-            self.last_serve = time.time()
-
-        if max(self.score_p, self.score_ai) >= settings.WINNING_SCORE:
-            self.state = "GAME_OVER"
+    def _update_game(self, y_norm, dt, left_norm=None):
+        # Jugador (mano ya filtrada, con margen); left_norm = jugador izquierdo en modo dos jugadores
+        margin = self.cfg.paddle_margin
+        y_px = None if y_norm is None else clamp(int(y_norm * self.h), margin, self.h - margin)
+        left_px = None if left_norm is None else clamp(int(left_norm * self.h), margin, self.h - margin)
+
+        # acumulador: la fisica avanza en pasos fijos, independiente del FPS
+        self.sim_acc += dt
+        while self.sim_acc >= self.sim.dt:
+            self.sim_acc -= self.sim.dt
+            if self.sim.step(y_px, left_px) is not None:
+                # punto: nuevo saque (el tiempo sobrante no se arrastra)
+                self.sim_acc = 0.0
+                self._save_ai()
+                self.fsm.go("GAME_OVER" if self.sim.is_over() else "SERVE")
+                break
+        self.sim_alpha = self.sim_acc / self.sim.dt
 
     # -------- entrada --------
-    def _handle_keys(self, key):
-        if key == 27:  # ESC
-            return True
-
-        # cambiar perfil en cualquier estado
-        if key in (ord('1'), ord('2'), ord('3')):
-            settings.BALL_PROFILE = int(chr(key))
-            # actualizar limites de la pelota al vuelo
-            self.ball.apply_profile_change()
-            print("Perfil activo:", settings.BALL_PROFILES[settings.BALL_PROFILE]["name"])
-
-        # ESPACIO maneja flujo
-        if key == ord(' '):
-            if self.state == "MENU":
-                self._reset_match()
-                self.state = "SERVE"
-                self.last_serve = time.time()
-            elif self.state == "SERVE":
-                self.state = "PLAYING"
-            elif self.state == "PLAYING":
-                self.state = "PAUSED"
-            elif self.state == "PAUSED":
-                self.state = "PLAYING"
-            elif self.state == "GAME_OVER":
-                self._reset_match()
-                self.state = "SERVE"
-                self.last_serve = time.time()
-
-        elif key == ord('r'):
-            self._reset_match()
-            self.state = "SERVE"
-            self.last_serve = time.time()
-        elif key == ord('h'):
-            self.show_skeleton = not self.show_skeleton
-        elif key == ord('e'):
-            self.show_panel = not self.show_panel
-
-        # Flechas / WASD (fuera de menu)
-        if self.state != "MENU":
-            if key in (82, ord('w')):
-                self.key_up, self.key_down = True, False
-            elif key in (84, ord('s')):
-                self.key_up, self.key_down = False, True
-            elif key == 255:
-                pass
-            else:
-                self.key_up = self.key_down = False
+    def _feed_hand(self, y_px, t_meas):
+        # solo mediciones nuevas: el filtro extrapola entre ellas
+        if t_meas is None or t_meas == self._t_meas:
+            return
+        self._t_meas = t_meas
+        self.hand_filter.update(y_px, t_meas)
+
+    def _left_input(self, left_hand, t_meas, dt):
+        """Jugador izquierdo: su mano (filtrada) o W/S; sin ninguna, la paleta se queda."""
+        y_norm, _, valid = left_hand
+        now = self.now()
+        if valid and y_norm is not None:
+            if t_meas is not None and t_meas != self._t_meas_left:
+                self._t_meas_left = t_meas
+                self.left_filter.update(y_norm * self.h, t_meas)
+        elif self.key2_up or self.key2_down:
+            y_prev = self.left_filter.predict(now)
+            y_px = self.h * 0.5 if y_prev is None else y_prev
+            y_px += (-900.0 if self.key2_up else 900.0) * dt
+            margin = self.cfg.paddle_margin
+            self.left_filter.update(clamp(y_px, margin, self.h - margin), now)
+        y_pred = self.left_filter.predict(now)
+        return None if y_pred is None else y_pred / max(1, self.h)
+
+    def _build_input_tables(self):
+        """Tablas de despacho: teclas globales, movimiento por modo y eventos de mouse."""
+        self.global_keys = {
+            27: self._quit_game,  # ESC
+            ord('1'): lambda: self._set_profile(1),
+            ord('2'): lambda: self._set_profile(2),
+            ord('3'): lambda: self._set_profile(3),
+            ord('r'): self._start_match,
+            ord('h'): lambda: setattr(self, "show_skeleton", not self.show_skeleton),
+            ord('e'): lambda: setattr(self, "show_panel", not self.show_panel),
+            ord('p'): lambda: setattr(self, "show_profiler", not self.show_profiler),
+        }
+        # tecla -> (key_up, key_down, key2_up, key2_down); None deja el valor como esta.
+        # Una tecla fuera de la tabla detiene ambas paletas.
+        if self.two_players:
+            # flechas para el jugador derecho, W/S para el izquierdo
+            self.move_keys = {
+                82: (True, False, None, None), 84: (False, True, None, None),
+                ord('w'): (None, None, True, False), ord('s'): (None, None, False, True),
+            }
+        else:
+            self.move_keys = {
+                82: (True, False, None, None), ord('w'): (True, False, None, None),
+                84: (False, True, None, None), ord('s'): (False, True, None, None),
+            }
+        self.mouse_events = frozenset((cv2.EVENT_MOUSEMOVE, cv2.EVENT_LBUTTONDOWN, cv2.EVENT_LBUTTONUP))
+        # gesto confirmado -> tecla equivalente segun el estado (mientras se juega solo la
+        # pinza: palma y puno son poses normales al mover la paleta)
+        space = ord(' ')
+        self.gesture_keys = {
+            "MENU": {"palma": space, "1": ord('1'), "2": ord('2'), "3": ord('3'), "pinza": ord('m')},
+            "PLAYING": {"pinza": space},
+            "PAUSED": {"palma": space, "puno": ord('r')},
+            "GAME_OVER": {"palma": space},
+        }
 
-        return False
+    def _handle_keys(self, key):
+        """Tecla global, luego la del estado actual y por ultimo movimiento. True = salir."""
+        if key == 255:
+            return False
+        self._activity("tecla")
+        action = self.global_keys.get(key)
+        if action is not None:
+            action()
+        else:
+            self.fsm.key(key)
+        if self.fsm.current is not self._menu_state:
+            move = self.move_keys.get(key, (False, False, False, False))
+            if move[0] is not None:
+                self.key_up, self.key_down = move[0], move[1]
+            if move[2] is not None:
+                self.key2_up, self.key2_down = move[2], move[3]
+        return self._quit
+
+    def _model_ready(self):
+        # con DETECTION_MODE = "process" el modelo vive (y se calienta) en el proceso hijo
+        return self.remote_detector or self.detector.ready
+
+    def _on_gesture(self, gesture):
+        key = self.gesture_keys.get(self.fsm.name, {}).get(gesture)
+        if key is not None:
+            self._handle_keys(key)
+
+    def _quit_game(self):
+        self._quit = True
+
+    def _set_profile(self, profile):
+        # cambiar perfil en cualquier estado; actualiza limites de la pelota al vuelo
+        settings.BALL_PROFILE = profile
+        self.ball.apply_profile_change()
+        self._load_ai()
+        print("Perfil activo:", settings.BALL_PROFILES[settings.BALL_PROFILE]["name"])
 
     def _on_mouse(self, event, x, y, flags, param):
-        if event in (cv2.EVENT_MOUSEMOVE, cv2.EVENT_LBUTTONDOWN, cv2.EVENT_LBUTTONUP):
+        if event in self.mouse_events:
             self.y_from_mouse = y
+            self._activity("mouse")
+
+    # -------- kiosco --------
+    def _activity(self, reason):
+        if self.kiosk.asleep:
+            self._wake(reason)
+        else:
+            self.kiosk.touch(self.now())
+
+    def _set_capture_rate(self, fps):
+        if self.capture_proc is not None:
+            self.capture_proc.set_rate(fps)
+        if self.capture is not None:
+            self.capture.set_rate(fps)
+
+    def _kiosk_sleep(self):
+        """Reposo: pantalla de espera dibujada una sola vez y camara a KIOSK_CAPTURE_FPS."""
+        if self.fsm.current is not self._menu_state:
+            self.fsm.go("MENU")
+        self.kiosk.sleep(self.now())
+        self.presence.reset()
+        self._set_capture_rate(self.cfg.kiosk_capture_fps)
+        frame = self.pool.get("display", (self.h, self.w, 3))
+        frame[:] = 15
+        self._draw_menu(frame)
+        self._draw_center(frame, "Acercate o saluda para jugar", 0.8, dy=-150, color=(60, 210, 255))
+        cv2.imshow(self.window_name, frame)
+        if self.output is not None:
+            self.output.offer(frame, self.now())
+
+    def _kiosk_step(self):
+        """Un ciclo en reposo: presencia sobre el frame nuevo y eventos; no se redibuja nada."""
+        raw = self._read_raw()
+        if raw is not None and self._frame_new and self.presence.update(raw):
+            self._wake("presencia")
+        key = cv2.waitKey(self.kiosk_wait_ms if self.kiosk.asleep else 1) & 0xFF
+        # la tecla que despierta tambien cuenta (ESPACIO ya empieza la partida)
+        self._handle_keys(key)
+
+    def _wake(self, reason):
+        self.kiosk.wake(self.now(), reason)
+        self._set_capture_rate(0)
+        self.t_prev = self.now()
 
     # -------- frame/camara --------
+    # Todo se escribe en buffers del pool (dst=): en regimen estable no se asigna
+    # memoria de frame (comprobable con FRAME_ALLOC_CHECK = True).
     def _grab_frame(self):
-        if self.cam_ok:
-            ok, frame = self.cap.read()
-            if not ok:
+        frame = self.pool.get("display", (self.h, self.w, 3))
+        if self.replay is not None:
+            raw, self._t_capture, self._frame_new = self.replay.frame()
+            self._raw = raw
+            if raw is not None:
+                return to_display(raw, self.w, self.h, frame, self.fit_interp)
+            frame[:] = 15 if self.fsm.current is self._menu_state else 25
+            return frame
+        no_cam = self.capture is None and not self.cam_ok
+        raw = self._read_raw()
+        if raw is not None:
+            return to_display(raw, self.w, self.h, frame, self.fit_interp)
+        frame[:] = 15 if no_cam and self.fsm.current is self._menu_state else 25
+        return frame
+
+    def _read_raw(self):
+        """Frame crudo de la camara (hilo o lectura directa) o None; self._raw queda con el ultimo."""
+        raw = None
+        if self.capture is not None:
+            raw, self._t_capture, self._frame_new = self.capture.read()
+            if not self.capture.ok:
                 self.cam_ok = False
-                return np.full((self.h, self.w, 3), 25, dtype=np.uint8)
-            frame = cv2.flip(frame, 1)
-            return fit_fill(frame, self.w, self.h)
-        else:
-            color = 15 if self.state == "MENU" else 25
-            return np.full((self.h, self.w, 3), color, dtype=np.uint8)
+                raw = None
+            elif raw is not None and self._frame_new and self.recorder is not None:
+                self.recorder.add_frame(raw, self._t_capture)
+        elif self.cam_ok:
+            buf = self.pool.peek("capture")
+            ok, raw = self.cap.read(buf) if buf is not None else self.cap.read()
+            self._t_capture = self._clock()  # instante real de la lectura (no el de la vuelta)
+            if not ok or raw is None:
+                self.cam_ok = False
+                raw = None
+            else:
+                if raw is not buf:
+                    # primer frame (o cambio de tamano): ese arreglo pasa a ser el buffer
+                    self.pool.adopt("capture", raw)
+                if self.recorder is not None:
+                    self.recorder.add_frame(raw, self._t_capture)
+        self._raw = raw
+        return raw
 
     # -------- dibujo --------
+    # Lo estatico (menu, pie, linea central, marcador, titulos) se rasteriza una vez en
+    # self.layers y se pega; solo los valores que cambian por frame usan putText directo.
     def _draw_menu(self, frame):
         nombre = settings.BALL_PROFILES[settings.BALL_PROFILE]["name"]
-        self._draw_center(frame, "Hand Pong", 1.1, dy=-60)
+        self.layers.blit(frame, ("menu", nombre, self.two_players, self.loader is not None, self._start_pending,
+                                 self.players.version), self._render_menu)
+
+    def _render_menu(self, frame):
+        nombre = settings.BALL_PROFILES[settings.BALL_PROFILE]["name"]
+        if self.loader is not None:
+            txt = "Preparando camara y deteccion..." + (" (empieza al terminar)" if self._start_pending else "")
+            draw_text(frame, txt, self.w // 2, int(self.h * 0.90), 0.55, (60, 210, 255), 2, center=True)
+        draw_text(frame, "Hand Pong", self.w // 2, self.h // 2 - 60, 1.1, (255, 255, 255), 2, center=True)
         draw_text(frame, "Pulsa ESPACIO para iniciar", self.w // 2, int(self.h * 0.55), 0.7, (255, 255, 255), 2, center=True)
         draw_text(frame, "Controles: mano (si hay camara) o MOUSE / FLECHAS", self.w // 2, int(self.h * 0.64), 0.55, (230, 230, 230), 2, center=True)
         draw_text(frame, "Velocidad: 1=Lento  2=Normal  3=Rapido", self.w // 2, int(self.h * 0.73), 0.6, (210, 210, 210), 2, center=True)
         draw_text(frame, f"Perfil actual: {nombre}", self.w // 2, int(self.h * 0.80), 0.65, (255, 255, 255), 2, center=True)
+        modo = "2 jugadores (mano izq. y der.)" if self.two_players else "1 jugador vs IA"
+        draw_text(frame, f"Modo: {modo}  -  M cambia", self.w // 2, int(self.h * 0.45), 0.6, (255, 230, 150), 2, center=True)
+        cola = self.players.peek(4)
+        if cola:
+            n = 2 if self.two_players else 1
+            txt = "Turno: " + " y ".join(cola[:n]) + ("  |  Luego: " + ", ".join(cola[n:]) if cola[n:] else "")
+            draw_text(frame, txt, self.w // 2, int(self.h * 0.36), 0.65, (150, 230, 150), 2, center=True)
         draw_text(frame, "E: panel  |  H: esqueleto  |  R: reiniciar  |  ESC: salir", self.w // 2, int(self.h * 0.88), 0.5, (210, 210, 210), 2, center=True)
+        if self.gestures is not None:
+            draw_text(frame, "Sin teclado: palma abierta = jugar  |  1-3 dedos = velocidad  |  OK = modo",
+                      self.w // 2, int(self.h * 0.95), 0.5, (150, 230, 150), 1, center=True)
 
     def _draw_center(self, frame, text, scale=1.0, dy=0, color=(255, 255, 255)):
-        draw_text(frame, text, self.w // 2, self.h // 2 + dy, scale, color, thickness=2, center=True)
+        self.layers.blit(frame, ("center", text, scale, dy, color),
+                         lambda f: draw_text(f, text, self.w // 2, self.h // 2 + dy, scale, color, thickness=2, center=True))
 
     def _draw_center_line(self, frame):
+        self.layers.blit(frame, ("center_line",), self._render_center_line)
+
+    def _render_center_line(self, frame):
         for y in range(0, self.h, 24):
             cv2.line(frame, (self.w // 2, y), (self.w // 2, y + 12), (255, 255, 255), 2, cv2.LINE_AA)
 
     def _draw_score(self, frame):
-        s = f"{self.score_ai}   {self.score_p}"
-        draw_text(frame, s, self.w // 2, 60, 1.6, (255, 255, 255), thickness=3, center=True)
+        s = f"{self.sim.score_ai}   {self.sim.score_p}"
+        self.layers.blit(frame, ("score", s),
+                         lambda f: draw_text(f, s, self.w // 2, 60, 1.6, (255, 255, 255), thickness=3, center=True))
 
     def _draw_footer(self, frame):
         nombre = settings.BALL_PROFILES[settings.BALL_PROFILE]["name"]
         footer = f"ESPACIO: iniciar/pausar | R: reiniciar | ESC: salir | H: esqueleto | E: panel | Perfil: {nombre} (1/2/3)"
-        draw_text(frame, footer, 20, self.h - 20, 0.7, (235, 235, 235), thickness=2, center=False)
+        self.layers.blit(frame, ("footer", nombre),
+                         lambda f: draw_text(f, footer, 20, self.h - 20, 0.7, (235, 235, 235), thickness=2, center=False))
 
     def _draw_gameplay(self, frame):
-        cv2.rectangle(frame, (self.ai.x, self.ai.y),
-                      (self.ai.x + self.ai.width, self.ai.y + self.ai.height),
-                      settings.PADDLE_L_COLOR, -1)
-        cv2.rectangle(frame, (self.player.x, self.player.y),
-                      (self.player.x + self.player.width, self.player.y + self.player.height),
-                      settings.PADDLE_R_COLOR, -1)
-        cv2.circle(frame, (int(self.ball.x), int(self.ball.y)), settings.BALL_RADIUS, settings.BALL_COLOR, -1, cv2.LINE_AA)
+        # posiciones interpoladas entre los dos ultimos pasos de fisica
+        alpha = self.sim_alpha if self.fsm.name == "PLAYING" else 1.0
+        bx, by, ay, py = self.sim.render_state(alpha)
+        ay, py = int(round(ay)), int(round(py))
+        cv2.rectangle(frame, (self.ai.x, ay),
+                      (self.ai.x + self.ai.width, ay + self.ai.height),
+                      self.cfg.paddle_l_color, -1)
+        cv2.rectangle(frame, (self.player.x, py),
+                      (self.player.x + self.player.width, py + self.player.height),
+                      self.cfg.paddle_r_color, -1)
+        cv2.circle(frame, (int(bx), int(by)), self.cfg.ball_radius, self.cfg.ball_color, -1, self.line_type)
+
+    def _panel_bg(self, frame, x0, y0, x1, y1, alpha):
+        # mezcla solo el rectangulo; con calidad reducida, fondo liso (sin multiplicar)
+        if self.panel_blend:
+            darken_rect(frame, x0, y0, x1, y1, alpha)
+        else:
+            frame[max(0, y0):y1, max(0, x0):x1] = 20
+
+    def _draw_leaderboard(self, frame):
+        """Ranking de la temporada (cache de Leaderboard) con los jugadores del partido resaltados."""
+        board = self.board
+        if board is None or not board.top:
+            return
+        lh = 28
+        x0, y0 = 80, 100
+        x1, y1 = x0 + 360, y0 + 46 + lh * len(board.top)
+        self._panel_bg(frame, x0, y0, x1, y1, self.cfg.edu_panel_alpha)
+
+        def render(f):
+            draw_text(f, f"Ranking {board.season}", x0 + 16, y0 + 30, 0.7, (255, 255, 255), 2)
+            for i, (name, best, wins, matches) in enumerate(board.top):
+                color = (150, 230, 150) if name in self.match_players else (230, 230, 230)
+                draw_text(f, f"{i + 1}. {name}", x0 + 16, y0 + 30 + lh * (i + 1), 0.6, color, 2)
+                draw_text(f, f"{best} pts", x1 - 110, y0 + 30 + lh * (i + 1), 0.6, color, 2)
+        self.layers.blit(frame, ("ranking", board.top_version, self.match_players), render)
 
     def _draw_banner(self, frame, text, color=(60, 210, 255)):
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (self.w, 40), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.55, frame, 0.45, 0, frame)
-        draw_text(frame, text, 16, 28, 0.6, color, 2, center=False)
+        # mezcla solo la franja superior (antes: copia + addWeighted de todo el frame)
+        self._panel_bg(frame, 0, 0, self.w, 41, 0.55)
+        self.layers.blit(frame, ("banner", text, color),
+                         lambda f: draw_text(f, text, 16, 28, 0.6, color, 2, center=False))
+
+    def _edu_panel_rect(self):
+        pad = self.cfg.edu_panel_padding
+        w_panel = int(self.w * self.cfg.edu_panel_width_frac)
+        return self.w - w_panel - pad, pad, self.w - pad, int(self.h * 0.40)
 
     def _draw_edu_panel(self, frame):
         # Panel reducido: Prediccion, Exactitud, Error IA, Aprendizaje
-        pad = settings.EDU_PANEL_PADDING
-        w_panel = int(self.w * settings.EDU_PANEL_WIDTH_FRAC)
-        x0 = self.w - w_panel - pad
-        y0 = pad
-        x1 = self.w - pad
-        y1 = int(self.h * 0.40)
-
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (x0, y0), (x1, y1), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, settings.EDU_PANEL_ALPHA, frame, 1 - settings.EDU_PANEL_ALPHA, 0, frame)
+        x0, y0, x1, y1 = self._edu_panel_rect()
+        self._panel_bg(frame, x0, y0, x1 + 1, y1 + 1, self.cfg.edu_panel_alpha)
 
         sx = x0 + 16
         sy = y0 + 28
         lh = 26
-        scale = settings.EDU_TEXT_SCALE
-        thick = settings.EDU_TEXT_THICK
+        scale = self.cfg.edu_text_scale
+        thick = self.cfg.edu_text_thick
+
+        # titulo, exactitud y aprendizaje solo cambian al terminar un punto
+        acc = f"Exactitud: {self.ai_brain.acc_recent:4.1f} %"
+        skill = f"Aprendizaje: {int(self.ai_brain.skill*100):3d} %"
 
-        draw_text(frame, "Panel educativo", sx, sy, scale + 0.05, (255, 255, 255), thick); sy += lh * 2
+        def render_static(f):
+            draw_text(f, "Panel educativo", sx, sy, scale + 0.05, (255, 255, 255), thick)
+            draw_text(f, acc, sx, sy + lh * 3, scale, (255, 230, 150), thick)
+            draw_text(f, skill, sx, sy + lh * 5, scale, (200, 220, 255), thick)
+        self.layers.blit(frame, ("edu_panel", acc, skill), render_static)
 
         pred_txt = "n/a" if self.ai_brain.pred_y is None else f"{int(self.ai_brain.pred_y)} px"
-        draw_text(frame, f"Prediccion: {pred_txt}", sx, sy, scale, (200, 255, 200), thick); sy += lh
-        draw_text(frame, f"Exactitud: {self.ai_brain.acc_recent:4.1f} %", sx, sy, scale, (255, 230, 150), thick); sy += lh
-        draw_text(frame, f"Error IA: {self.ai_brain.error_pct:4.1f} %", sx, sy, scale, (255, 180, 180), thick); sy += lh
-        draw_text(frame, f"Aprendizaje: {int(self.ai_brain.skill*100):3d} %", sx, sy, scale, (200, 220, 255), thick); sy += lh
+        draw_text(frame, f"Prediccion: {pred_txt}", sx, sy + lh * 2, scale, (200, 255, 200), thick, line=self.line_type)
+        draw_text(frame, f"Error IA: {self.ai_brain.error_pct:4.1f} %", sx, sy + lh * 4, scale, (255, 180, 180), thick,
+                  line=self.line_type)
 
     def _reset_match(self):
-        self.score_p = 0
-        self.score_ai = 0
-        self.ball.reset(direction=1)
+        self.sim.reset_match()
+        self.sim_acc = 0.0
+
+    # -------- estados --------
+    @property
+    def state(self):
+        return self.fsm.name
+
+    def _build_states(self):
+        """MENU -> SERVE -> PLAYING <-> PAUSED -> GAME_OVER; cada estado con su update y sus teclas."""
+        space = ord(' ')
+        self.fsm = fsm = StateMachine(on_change=self._on_state_change)
+        self._menu_state = fsm.add("MENU", update=self._state_menu, idle=True,
+                                   keys={space: self._start_match, ord('m'): self._on_toggle_players})
+        fsm.add("SERVE", update=self._state_serve, enter=self._on_enter_serve,
+                keys={space: lambda: fsm.go("PLAYING")})
+        fsm.add("PLAYING", update=self._state_playing, draw=self._draw_playing,
+                keys={space: lambda: fsm.go("PAUSED")})
+        fsm.add("PAUSED", update=self._state_paused, idle=True,
+                keys={space: lambda: fsm.go("PLAYING")})
+        game_over = fsm.add("GAME_OVER", update=self._state_game_over, draw=self._draw_leaderboard,
+                            enter=self._on_match_over, idle=True, keys={space: self._start_match})
+        # estados entre jugadores: ahi el kiosco puede entrar en reposo
+        self._quiet_states = (self._menu_state, game_over)
+        fsm.go("MENU")
+
+    def _on_state_change(self, old, new):
+        self.kiosk.touch(self.now())
+
+    def _start_match(self):
+        # desde el menu o el fin del juego entra el siguiente de la cola; R a mitad de
+        # partido repite los mismos jugadores
+        if self.loader is not None:
+            # camara/modelo todavia cargando (ESPACIO, R o gesto): se empieza apenas esten listos
+            self._start_pending = True
+            return
+        if self.fsm.current in self._quiet_states:
+            self.match_players = (self.players.pop(), self.players.pop() if self.two_players else ANONYMOUS)
+        self._reset_match()
+        self._match_tick0 = self.sim.tick
+        self.fsm.go("SERVE")
+
+    def _on_match_over(self):
+        # solo encola: Leaderboard escribe en su hilo
+        if self.board is not None:
+            seconds = (self.sim.tick - self._match_tick0) / self.sim.hz
+            self.board.record(match_rows(self.match_players, self.sim, settings.BALL_PROFILE, seconds,
+                                         self.board.season))
+
+    def _on_toggle_players(self):
+        if self.loader is None:
+            self._set_two_players(not self.two_players)
+
+    def _on_enter_serve(self):
+        self.last_serve = self.now()
+
+    # update(frame, dt, y_norm, left_norm) de cada estado
+    def _state_menu(self, frame, dt, y_norm, left_norm):
+        self._draw_menu(frame)
+
+    def _state_serve(self, frame, dt, y_norm, left_norm):
+        remain = max(0.0, self.cfg.serve_delay - (self.now() - self.last_serve))
+        self._draw_center(frame, "Listo", 0.9)
+        self._draw_center(frame, f"Saque en {remain:.1f} s", 0.6, dy=60)
+        if remain <= 0.0:
+            self.fsm.go("PLAYING")
+
+    def _state_playing(self, frame, dt, y_norm, left_norm):
+        self._update_game(y_norm, dt, left_norm)
+
+    def _state_paused(self, frame, dt, y_norm, left_norm):
+        self._draw_center(frame, "Pausa", 0.9)
+        self._draw_center(frame, "Pulsa ESPACIO para continuar", 0.6, dy=60)
+        if self.gestures is not None:
+            self._draw_center(frame, "o palma abierta (puno: reiniciar)", 0.55, dy=100, color=(150, 230, 150))
+
+    def _state_game_over(self, frame, dt, y_norm, left_norm):
+        if self.two_players:
+            msg = "Gana el jugador " + ("derecho" if self.sim.score_p > self.sim.score_ai else "izquierdo")
+        else:
+            msg = "Ganaste" if self.sim.score_p > self.sim.score_ai else "Perdiste"
+        self._draw_center(frame, "Fin del juego", 0.9)
+        self._draw_center(frame, msg, 0.7, dy=60)
+        self._draw_center(frame, "Pulsa ESPACIO para jugar de nuevo", 0.6, dy=110)
+        if self.gestures is not None:
+            self._draw_center(frame, "o muestra la palma abierta", 0.55, dy=150, color=(150, 230, 150))
+
+    def _draw_playing(self, frame):
+        # encima del dibujo comun: panel educativo y prediccion de la IA (solo contra la IA)
+        if self.two_players:
+            return
+        if self.show_panel:
+            self._draw_edu_panel(frame)
+        if self.cfg.show_prediction and self.ai_brain.pred_y is not None:
+            x_line = self.ai.x + self.ai.width
+            cv2.circle(frame, (x_line, int(self.ai_brain.pred_y)), 6, self.cfg.pred_line_color, 2, self.line_type)
+
+    def _apply_quality(self):
+        """Lleva las perillas del nivel actual del gobernador a detector y dibujo."""
+        q = self.quality.current
+        self.detector.set_infer_scale(q.infer_scale)
+        if self.remote_detector:
+            self.detector_async.set_infer_scale(q.infer_scale)
+        self.infer_every = max(1, q.infer_every)
+        self.skeleton_mode = q.skeleton
+        self.panel_blend = q.blend
+        self.fit_interp = q.interp
+        self.line_type = cv2.LINE_AA if q.antialias else cv2.LINE_8
+
+    def _set_two_players(self, on):
+        """Cambia de modo en el menu: el modelo se rearma para 1 o 2 manos y se calienta aqui."""
+        self.two_players = bool(on)
+        self.sim.two_players = self.two_players
+        self.detector.set_max_hands(2 if self.two_players else 1)
+        if self.remote_detector:
+            self.detector_async.set_max_hands(2 if self.two_players else 1)
+        elif self.detector.enabled:
+            self.detector.warmup(self.w, self.h)
+        self._build_input_tables()
+        self.assigner.reset()
+        self.left_filter.reset()
+        self._last_hands = []
+        self._t_pair = None
+        print("Modo:", "2 jugadores" if self.two_players else "1 jugador vs IA")
+
+    # -------- arranque --------
+    def _finish_startup(self):
+        """Conecta la camara abierta en segundo plano; el detector ya quedo cargado y calentado."""
+        loader, self.loader = self.loader, None
+        if loader.error is not None:
+            print("Arranque con errores:", loader.error)
+        self.cap = loader.cap if self.capture_proc is None else self.capture_proc.source()
+        self.cam_ok = self.cap is not None and self.cap.isOpened()
+        # Captura en hilo propio (ultimo frame gana)
+        if self.cam_ok and self.cfg.camera_threaded:
+            self.capture = CameraCapture(self.cap, self.cfg.capture_ring_size).start()
+        self.input_safe = not getattr(self.detector, "enabled", False)
+        if not self.headless:
+            print("Arranque:", self.startup.summary())
+        if self._start_pending:
+            self._start_pending = False
+            self._start_match()
+
+    # -------- aprendizaje persistente --------
+    def _load_ai(self):
+        """Carga lo aprendido para el perfil activo (guardando antes el anterior); sin datos, IA nueva."""
+        if self.ai_store is None:
+            return
+        key = store_key(settings.BALL_PROFILE, self.cfg.ai_store_player)
+        if key == self._ai_key:
+            return
+        self._save_ai()
+        self._ai_key = key
+        self.ai_brain.reset_learning()
+        self.ai_brain.set_state(self.ai_store.load(key))
+
+    def _save_ai(self):
+        # solo copia el estado; el archivo se escribe en el hilo de AIStore (dos jugadores: la IA no juega)
+        if self.ai_store is not None and self._ai_key is not None and not self.two_players:
+            self.ai_store.put(self._ai_key, self.ai_brain.get_state())
 
 if __name__ == "__main__":
     GameApp().run()
\ No newline at end of file
@@ -0,0 +1,264 @@
+# output_sink.py - Salida para publico: el frame compuesto a un video o a un stream MJPEG local (ASCII)
+#
+# Para una segunda pantalla o grabar lo mejor de la feria, capturar la ventana cuesta
+# mucho CPU. OutputSink recibe el frame ya dibujado, lo reduce a la resolucion de salida
+# en un buffer propio y un hilo aparte lo codifica (cv2, por software):
+#   - VideoFileTarget: archivo de video (cv2.VideoWriter).
+#   - MjpegTarget: http://127.0.0.1:<puerto>/ con el juego como MJPEG (navegador, OBS, VLC).
+# El juego nunca espera: la cola es de pocos buffers y, si el codificador va atrasado,
+# el frame encolado mas viejo se descarta y se reusa su buffer.
+
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+import settings
+
+
+class VideoFileTarget:
+    """
+    Video a ritmo real: si faltan frames (juego lento o descartes) se repite el ultimo,
+    asi la grabacion dura lo mismo que la partida.
+    """
+    def __init__(self, path, size, fps, fourcc="MJPG"):
+        self.path = path
+        self.fps = float(fps)
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), self.fps, size)
+        self.ok = self.writer.isOpened()
+        if not self.ok:
+            print("Salida: no se pudo abrir el video", path, "con", fourcc)
+        self._t0 = None
+        self._written = 0
+        self.repeated = 0
+
+    def write(self, img, t):
+        if not self.ok:
+            return
+        if self._t0 is None:
+            self._t0 = t
+        # frames que deberian existir hasta t (como mucho un segundo de relleno)
+        due = int((t - self._t0) * self.fps) + 1
+        missing = min(int(self.fps), due - self._written - 1)
+        for _ in range(max(0, missing)):
+            self.writer.write(img)
+            self.repeated += 1
+        self.writer.write(img)
+        self._written = max(self._written + 1 + max(0, missing), due)
+
+    def close(self):
+        if self.ok:
+            self.writer.release()
+
+    def stats(self):
+        return {"file": self.path, "frames": self._written, "repeated": self.repeated}
+
+
+class MjpegTarget:
+    """
+    Servidor HTTP local: / (pagina), /stream (multipart MJPEG) y /frame.jpg (foto).
+    Sin clientes conectados no se codifica nada.
+    """
+    def __init__(self, port, quality=80, host="127.0.0.1"):
+        self.quality = int(quality)
+        self.clients = 0
+        self.sent = 0
+        self._jpeg = None
+        self._seq = 0
+        self._running = True
+        self._cond = threading.Condition()
+        self.server = ThreadingHTTPServer((host, int(port)), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}/"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mjpeg-http", daemon=True)
+        self._thread.start()
+
+    def write(self, img, t):
+        if self.clients == 0:
+            return
+        ok, enc = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        with self._cond:
+            self._jpeg = enc.tobytes()
+            self._seq += 1
+            self._cond.notify_all()
+
+    def _next_jpeg(self, last_seq, timeout=1.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != last_seq or not self._running, timeout)
+            return self._seq, self._jpeg
+
+    def _handler(self):
+        target = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith("/stream"):
+                    self._stream()
+                elif self.path.startswith("/frame.jpg"):
+                    _, jpeg = target._next_jpeg(-1, 0.0)
+                    if jpeg is None:
+                        self.send_error(503, "Sin frames todavia")
+                        return
+                    self._send(200, "image/jpeg", jpeg)
+                else:
+                    page = b"<html><body style='margin:0;background:#000'>" \
+                           b"<img src='/stream' style='width:100%'></body></html>"
+                    self._send(200, "text/html", page)
+
+            def _send(self, code, ctype, body):
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                with target._cond:
+                    target.clients += 1
+                seq = -1
+                try:
+                    while target._running:
+                        new_seq, jpeg = target._next_jpeg(seq)
+                        if jpeg is None or new_seq == seq:
+                            continue
+                        seq = new_seq
+                        self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                                         + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+                        target.sent += 1
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with target._cond:
+                        target.clients -= 1
+
+        return Handler
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        return {"url": self.url, "clients": self.clients, "sent": self.sent}
+
+
+class OutputSink:
+    """
+    offer(frame, t) desde el bucle del juego: respeta fps de salida, reduce a size sobre
+    un buffer libre y encola; el hilo codificador lo pasa a cada destino (targets).
+      - queue_size buffers en total (cola acotada, sin asignar por frame).
+      - si no hay buffer libre se descarta el encolado mas viejo (dropped).
+    """
+    def __init__(self, targets, size, fps=30.0, queue_size=3):
+        self.targets = list(targets)
+        self.size = (int(size[0]), int(size[1]))
+        self.period = 1.0 / max(1.0, float(fps))
+        w, h = self.size
+        self._free = [np.empty((h, w, 3), np.uint8) for _ in range(max(2, int(queue_size)))]
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self._t_next = None
+        self.offered = 0
+        self.encoded = 0
+        self.dropped = 0
+        self.encode_ms = 0.0
+        self._thread = threading.Thread(target=self._loop, name="output-sink", daemon=True)
+        self._thread.start()
+
+    def offer(self, frame, t):
+        """No bloquea. True si el frame entro a la cola."""
+        if self._t_next is not None and t < self._t_next:
+            return False
+        # ritmo fijo de salida; tras un atraso grande no se intenta recuperar
+        if self._t_next is None or t - self._t_next > self.period:
+            self._t_next = t + self.period
+        else:
+            self._t_next += self.period
+        with self._cond:
+            if self._free:
+                buf = self._free.pop()
+            elif self._queue:
+                buf, _ = self._queue.popleft()
+                self.dropped += 1
+            else:
+                self.dropped += 1
+                return False
+        h, w = frame.shape[:2]
+        if (w, h) == self.size:
+            np.copyto(buf, frame)
+        else:
+            cv2.resize(frame, self.size, dst=buf, interpolation=cv2.INTER_AREA)
+        with self._cond:
+            self._queue.append((buf, t))
+            self._cond.notify()
+        self.offered += 1
+        return True
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                buf, t = self._queue.popleft()
+            t0 = time.perf_counter()
+            for target in self.targets:
+                target.write(buf, t)
+            ms = (time.perf_counter() - t0) * 1000.0
+            self.encode_ms = ms if self.encode_ms == 0.0 else 0.9 * self.encode_ms + 0.1 * ms
+            self.encoded += 1
+            with self._cond:
+                self._free.append(buf)
+
+    def close(self):
+        """Codifica lo que quedo en cola y cierra los destinos."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+        for target in self.targets:
+            target.close()
+
+    def stats(self):
+        out = {"offered": self.offered, "encoded": self.encoded, "dropped": self.dropped,
+               "encode_ms": round(self.encode_ms, 2)}
+        for target in self.targets:
+            out.update(target.stats())
+        return out
+
+
+def open_sink():
+    """OutputSink segun OUTPUT_FILE / OUTPUT_STREAM_PORT de settings; None si ambos estan apagados."""
+    size = (int(getattr(settings, "OUTPUT_WIDTH", 640)), int(getattr(settings, "OUTPUT_HEIGHT", 360)))
+    fps = float(getattr(settings, "OUTPUT_FPS", 30))
+    targets = []
+    path = getattr(settings, "OUTPUT_FILE", "")
+    if path:
+        targets.append(VideoFileTarget(path, size, fps, getattr(settings, "OUTPUT_FOURCC", "MJPG")))
+    port = int(getattr(settings, "OUTPUT_STREAM_PORT", 0))
+    if port:
+        try:
+            stream = MjpegTarget(port, getattr(settings, "OUTPUT_JPEG_QUALITY", 80))
+            print("Salida: stream en", stream.url)
+            targets.append(stream)
+        except OSError as e:
+            print("Salida: no se pudo abrir el puerto", port, e)
+    if not targets:
+        return None
+    return OutputSink(targets, size, fps, getattr(settings, "OUTPUT_QUEUE", 3))
@@ -0,0 +1,113 @@
+# overlay_cache.py - Capas estaticas prerenderizadas y oscurecido solo de rectangulos (ASCII)
+
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class Layer:
+    """
+    Recorte prerenderizado pegado en (x, y) del frame: color premultiplicado por alpha
+    y (255 - alpha) en 3 canales, asi el antialiasing se mezcla igual que con putText.
+    """
+    __slots__ = ("x", "y", "premult", "inv_alpha")
+
+    def __init__(self, x, y, premult, inv_alpha):
+        self.x = x
+        self.y = y
+        self.premult = premult
+        self.inv_alpha = inv_alpha
+
+
+class LayerCache:
+    """
+    Compositor de capas estaticas (texto del menu, pie, linea central, marcador...):
+      - get(key, dibujar) rasteriza la capa una sola vez (sobre negro y sobre blanco para
+        obtener el alpha) y guarda solo el rectangulo ocupado; despues se mezcla sobre el
+        frame con dos operaciones en sitio limitadas a ese rectangulo.
+      - La clave incluye lo que cambia el contenido (estado, perfil, textos); la resolucion
+        es parte del cache: si cambia, resize() lo vacia.
+      - LRU acotado para textos que cambian (cuenta regresiva, marcador).
+    """
+    def __init__(self, w, h, max_layers=96):
+        self.w = int(w)
+        self.h = int(h)
+        self.max_layers = int(max_layers)
+        self._layers = OrderedDict()
+        self._alloc_canvas()
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, w, h):
+        if (int(w), int(h)) != (self.w, self.h):
+            self.w, self.h = int(w), int(h)
+            self._alloc_canvas()
+            self.invalidate()
+
+    def _alloc_canvas(self):
+        # lienzos de rasterizado reutilizados: un fallo de cache solo asigna el recorte final
+        self._canvas = np.zeros((self.h, self.w, 3), dtype=np.uint8)
+        self._white = np.empty_like(self._canvas)
+        self._diff = np.empty_like(self._canvas)
+        self._inv = np.empty((self.h, self.w), dtype=np.uint8)
+        self._mask = np.empty_like(self._inv)
+
+    def invalidate(self, pred=None):
+        """Descarta todas las capas, o solo las cuyas claves cumplan pred(key)."""
+        if pred is None:
+            self._layers.clear()
+            return
+        for k in [k for k in self._layers if pred(k)]:
+            del self._layers[k]
+
+    def get(self, key, draw):
+        layer = self._layers.get(key)
+        if layer is not None:
+            self._layers.move_to_end(key)
+            self.hits += 1
+            return layer
+        self.misses += 1
+        layer = self._render(draw)
+        self._layers[key] = layer
+        if len(self._layers) > self.max_layers:
+            self._layers.popitem(last=False)
+        return layer
+
+    def _render(self, draw):
+        black = self._canvas
+        black[:] = 0
+        draw(black)
+        white = self._white
+        white[:] = 255
+        draw(white)
+        # alpha por pixel: cuanto del fondo deja pasar (0 en el trazo, 255 fuera)
+        cv2.subtract(white, black, dst=self._diff)
+        inv = cv2.cvtColor(self._diff, cv2.COLOR_BGR2GRAY, dst=self._inv)
+        x, y, w, h = cv2.boundingRect(cv2.bitwise_not(inv, dst=self._mask))
+        if w == 0 or h == 0:
+            return Layer(0, 0, np.zeros((0, 0, 3), np.uint8), np.zeros((0, 0, 3), np.uint8))
+        inv3 = cv2.cvtColor(inv[y:y + h, x:x + w], cv2.COLOR_GRAY2BGR)
+        return Layer(x, y, black[y:y + h, x:x + w].copy(), inv3)
+
+    def blit(self, frame, key, draw):
+        layer = self.get(key, draw)
+        h, w = layer.premult.shape[:2]
+        if h and w:
+            roi = frame[layer.y:layer.y + h, layer.x:layer.x + w]
+            cv2.multiply(roi, layer.inv_alpha, dst=roi, scale=1.0 / 255.0)
+            cv2.add(roi, layer.premult, dst=roi)
+
+
+def darken_rect(frame, x0, y0, x1, y1, alpha):
+    """
+    Equivale a mezclar un rectangulo negro con opacidad alpha (addWeighted sobre una copia
+    del frame), pero solo toca la region: sin copia ni mezcla de pantalla completa.
+    """
+    h, w = frame.shape[:2]
+    x0, x1 = max(0, int(x0)), min(w, int(x1))
+    y0, y1 = max(0, int(y0)), min(h, int(y1))
+    if x1 <= x0 or y1 <= y0:
+        return
+    roi = frame[y0:y1, x0:x1]
+    cv2.convertScaleAbs(roi, dst=roi, alpha=1.0 - float(alpha))
@@ -0,0 +1,408 @@
+# pipeline.py - Captura y deteccion en procesos aparte, con anillos de memoria compartida (ASCII)
+#
+# En un solo proceso la captura, MediaPipe, el dibujo y cv2.imshow se pelean el GIL. Aqui
+# cada etapa pesada puede ir en su propio proceso:
+#
+#   captura (CaptureProcess)  --frames-->  ShmRing  --+--> juego (RingFrameSource + CameraCapture)
+#                                                      +--> deteccion (ProcessHandDetector)
+#   deteccion  --manos (arreglos fijos)-->  ShmRing  --> juego (latest_hands)
+#
+# Los anillos son los de frame_source.py (ShmRing, el mismo protocolo que la fuente "shm"):
+# un solo escritor y lectores sin locks, con un seqlock por ranura.
+# El proceso del juego crea y borra todos los bloques, asi un hijo que se cae (o se
+# reinicia) no los pierde. Los hijos se arrancan con "spawn" (MediaPipe y OpenCV no se
+# llevan bien con fork) y reciben una copia de settings.
+
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+import settings
+from frame_source import SharedFramePublisher, SharedMemorySource, ShmRing, create_frame_ring, open_source
+from session_record import N_LANDMARKS, _array_to_landmarks
+
+
+def hand_fields(max_hands=2):
+    return [("t", (), np.float64), ("frame", (), np.uint64), ("n", (), np.int32), ("ms", (), np.float32),
+            ("xy", (max_hands, 2), np.float32), ("lm", (max_hands, N_LANDMARKS, 3), np.float32)]
+
+
+def _ring_name(kind):
+    return f"handpong-{kind}-{os.getpid()}"
+
+
+# -------- procesos hijos --------
+class ChildProcess:
+    """
+    Un proceso hijo supervisado: poll() lo reinicia si murio (o si colgo: beat viejo),
+    con espera creciente entre reinicios para no entrar en bucle si falla siempre.
+    Despues de max_restarts reinicios se da por muerto (dead) y poll() ya no lo levanta.
+    """
+    def __init__(self, name, target, args, ring=None, hang_s=3.0, max_restarts=5):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.ring = ring            # anillo cuyo ctrl.beat/ready escribe el hijo
+        self.hang_s = float(hang_s)
+        self.proc = None
+        self.restarts = 0
+        self.max_restarts = int(max_restarts)
+        self.dead = False
+        self._backoff = 0.5
+        self._t_retry = 0.0
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self.proc = ctx.Process(target=self.target, args=self.args, name=self.name, daemon=True)
+        self.proc.start()
+        return self
+
+    def _hung(self):
+        if self.ring is None or not int(self.ring.ctrl["ready"]):
+            return False
+        return time.perf_counter() - float(self.ring.ctrl["beat"]) > self.hang_s
+
+    def poll(self):
+        """Llamar seguido desde el juego; True si el hijo esta vivo."""
+        if self.proc is None or self.dead:
+            return False
+        if self.proc.is_alive() and not self._hung():
+            if self.ring is not None and int(self.ring.ctrl["ready"]):
+                self._backoff = 0.5
+            return True
+        now = time.perf_counter()
+        if now < self._t_retry:
+            return False
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join(1.0)
+        if self.ring is not None:
+            self.ring.ctrl["ready"][...] = 0
+        if self.restarts >= self.max_restarts:
+            print(f"Proceso {self.name} caido (codigo {self.proc.exitcode}) tras {self.restarts} reinicios; se da por muerto")
+            self.dead = True
+            return False
+        print(f"Proceso {self.name} caido (codigo {self.proc.exitcode}); reiniciando")
+        self.restarts += 1
+        self._t_retry = now + self._backoff
+        self._backoff = min(10.0, self._backoff * 2.0)
+        self.start()
+        return False
+
+    def stop(self, timeout=2.0):
+        if self.proc is None:
+            return
+        self.proc.join(timeout)
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join(1.0)
+        self.proc = None
+
+
+def _child_setup(snapshot):
+    """Settings del proceso padre y Ctrl+C solo para el padre (el apaga a los hijos)."""
+    vars(settings).update(snapshot)
+    try:
+        import signal
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    except Exception:
+        pass
+    return mp.parent_process()
+
+
+def _settings_snapshot():
+    return {k: v for k, v in vars(settings).items() if k.isupper()}
+
+
+def _capture_main(frame_spec, snapshot):
+    parent = _child_setup(snapshot)
+    ring = ShmRing.attach(frame_spec)
+    pub = SharedFramePublisher.on(ring)  # un frame mas grande que el anillo se reduce al escribir
+    src = open_source()
+    buf = None
+    try:
+        while not int(ring.ctrl["stop"]) and src.isOpened():
+            ring.ctrl["beat"][...] = time.perf_counter()
+            ok, buf = src.read(buf)
+            if not ok or buf is None:
+                break
+            t = time.perf_counter()
+            pub.publish(buf, t)
+            ring.ctrl["ready"][...] = 1
+            if parent is not None and not parent.is_alive():
+                break
+            # ritmo limitado (modo kiosco): pausa en tramos cortos para ver stop/period/beat
+            while float(ring.ctrl["period"]) > 0.0 and not int(ring.ctrl["stop"]):
+                left = float(ring.ctrl["period"]) - (time.perf_counter() - t)
+                if left <= 0.0:
+                    break
+                ring.ctrl["beat"][...] = time.perf_counter()
+                time.sleep(min(left, 0.02))
+    finally:
+        src.release()
+        ring.close()
+
+
+def _detector_main(frame_spec, hand_spec, mirror, follow, snapshot):
+    parent = _child_setup(snapshot)
+    from hand_detector import HandDetector
+    frames = ShmRing.attach(frame_spec)
+    hands = ShmRing.attach(hand_spec)
+    ctrl = hands.ctrl
+    max_slots = dict((n, s) for n, s, _ in hands.fields)["xy"][0]
+    det = HandDetector(max_hands=int(ctrl["max_hands"]) or 1)
+    det.set_infer_scale(float(ctrl["infer_scale"]) or 1.0)
+    det.load()
+    h, w = dict((n, s) for n, s, _ in frames.fields)["img"][:2]
+    det.warmup(w, h)
+    ctrl["pid"][...] = os.getpid()
+    ctrl["beat"][...] = time.perf_counter()
+    ctrl["ready"][...] = 1
+
+    last = frames.head  # no procesar frames viejos del reinicio
+    out = None
+    ms = 0.0
+    t_check = 0.0
+    scale = float(ctrl["infer_scale"]) or 1.0
+    try:
+        while not int(ctrl["stop"]):
+            now = time.perf_counter()
+            ctrl["beat"][...] = now
+            if now - t_check > 0.5:
+                t_check = now
+                if parent is not None and not parent.is_alive():
+                    break
+            # cambios pedidos por el juego (modo dos jugadores, gobernador de calidad)
+            want_hands = int(ctrl["max_hands"]) or 1
+            if want_hands != det.max_hands:
+                det.set_max_hands(want_hands)
+                det.load()
+            if (float(ctrl["infer_scale"]) or 1.0) != scale:
+                scale = float(ctrl["infer_scale"]) or 1.0
+                det.set_infer_scale(scale)
+            # siguiendo a la captura: solo mientras el juego pide manos
+            if follow and now - float(ctrl["t_want"]) > 0.5:
+                time.sleep(0.01)
+                continue
+            n, out = frames.read_latest(last, out)
+            if n == last:
+                time.sleep(0.001)
+                continue
+            last = n
+            h, w = (int(v) for v in out["hw"])
+            t0 = time.perf_counter()
+            found = det.process_hands(out["img"][:h, :w])
+            dt_ms = (time.perf_counter() - t0) * 1000.0
+            ms = dt_ms if ms == 0.0 else 0.9 * ms + 0.1 * dt_ms
+
+            rec = hands.slot_for_write()
+            k = min(len(found), max_slots)
+            for i in range(k):
+                x, y, lm = found[i]
+                arr = rec["lm"][i]
+                for j, p in enumerate(lm.landmark[:N_LANDMARKS]):
+                    arr[j] = (p.x, p.y, p.z)
+                rec["xy"][i] = (x, y)
+            if mirror and k:
+                # frame crudo de camara: el juego muestra el espejo
+                rec["xy"][:k, 0] = 1.0 - rec["xy"][:k, 0]
+                rec["lm"][:k, :, 0] = 1.0 - rec["lm"][:k, :, 0]
+            rec["n"][...] = k
+            rec["t"][...] = out["t"]
+            rec["frame"][...] = n
+            rec["ms"][...] = ms
+            hands.commit(rec)
+    finally:
+        frames.close()
+        hands.close()
+
+
+# -------- lado del juego --------
+class CaptureProcess:
+    """Camara en su propio proceso; source() da una FrameSource que lee el anillo."""
+    def __init__(self, w=None, h=None, slots=4):
+        w = int(w or settings.CAMERA_CAPTURE_W)
+        h = int(h or settings.CAMERA_CAPTURE_H)
+        self.ring = create_frame_ring(_ring_name("frames"), w, h, slots=slots)
+        self.child = ChildProcess("captura", _capture_main, (self.ring.spec(), _settings_snapshot()), ring=self.ring)
+
+    def start(self):
+        self.child.start()
+        return self
+
+    def source(self):
+        return RingFrameSource(self)
+
+    def set_rate(self, fps):
+        """Maximo de frames por segundo del proceso de captura; 0 = ritmo de la camara."""
+        if self.ring is not None:
+            self.ring.ctrl["period"][...] = 1.0 / fps if fps > 0 else 0.0
+
+    def stop(self):
+        if self.ring is None:
+            return
+        self.ring.ctrl["stop"][...] = 1
+        self.child.stop()
+        self.ring.close()
+        self.ring = None
+
+    def stats(self):
+        return {"restarts": self.child.restarts, "dead": self.child.dead}
+
+
+class RingFrameSource(SharedMemorySource):
+    """
+    SharedMemorySource sobre el anillo de CaptureProcess que ademas sondea al proceso de
+    captura mientras espera (lo reinicia si se cae). Si no llega ningun frame en timeout,
+    o el proceso se dio por muerto, devuelve (False, None) y el juego sigue sin camara.
+    """
+    def __init__(self, capture, timeout=3.0, poll_s=0.1):
+        super().__init__(timeout=timeout, ring=capture.ring)
+        self.capture = capture
+        self.poll_s = float(poll_s)
+        self._t_poll = 0.0
+
+    def isOpened(self):
+        return self.capture.ring is not None and not self.capture.child.dead
+
+    def _waiting(self, now):
+        if now >= self._t_poll:
+            self._t_poll = now + self.poll_s
+            if not self.capture.child.poll() and self.capture.child.dead:
+                return False
+        return True
+
+    def read(self, image=None):
+        self.ring = ring = self.capture.ring
+        if ring is None or int(ring.ctrl["stop"]) or self.capture.child.dead:
+            return False, None
+        self._t_poll = time.perf_counter() + self.poll_s
+        ok, image = super().read(image)
+        if not ok and not self.capture.child.dead:
+            print(f"Captura: sin frames en {self.timeout:.1f} s; se sigue sin camara")
+        return ok, image
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.capture.stop()
+
+
+class ProcessHandDetector:
+    """
+    Misma interfaz que AsyncHandDetector, pero MediaPipe corre en otro proceso:
+      - submit() copia el frame a un anillo compartido (o, si la camara ya esta en su
+        proceso, solo avisa que se quieren manos: el detector lee la captura directo).
+      - latest_hands() lee el resultado mas nuevo sin locks; lista vacia si es viejo o si
+        el proceso de deteccion se esta reiniciando (el juego sigue con mouse/teclas).
+    """
+    def __init__(self, detector, frame_shape, max_age=0.5, capture=None, slots=3):
+        self.detector = detector
+        self.max_age = float(max_age)
+        self.follow = capture is not None
+        if self.follow:
+            self.frames = capture.ring
+            self._own_frames = False
+        else:
+            h, w = frame_shape[:2]
+            self.frames = create_frame_ring(_ring_name("display"), w, h, slots=slots)
+            self._own_frames = True
+        self._pub = SharedFramePublisher.on(self.frames)
+        self.hands = ShmRing(_ring_name("hands"), hand_fields(2), slots=slots, create=True)
+        self.hands.ctrl["max_hands"][...] = detector.max_hands
+        self.hands.ctrl["infer_scale"][...] = 1.0
+        args = (self.frames.spec(), self.hands.spec(), self.follow, self.follow, _settings_snapshot())
+        self.child = ChildProcess("deteccion", _detector_main, args, ring=self.hands)
+
+        self._last = 0
+        self._out = None
+        self._result = []
+        self._t_result = 0.0
+        self.result_time = None
+        self.inference_ms = 0.0
+        self.result_age_ms = 0.0
+        self.submitted = 0
+        self.skipped = 0
+
+    # -------- ciclo de vida --------
+    def start(self):
+        self.child.start()
+        return self
+
+    def wait_ready(self, timeout=10.0):
+        t_end = time.perf_counter() + timeout
+        while time.perf_counter() < t_end:
+            if int(self.hands.ctrl["ready"]):
+                return True
+            if not self.child.poll() and self.child.restarts > 2:
+                return False
+            time.sleep(0.02)
+        return False
+
+    def stop(self):
+        if self.hands is None:
+            return
+        self.hands.ctrl["stop"][...] = 1
+        self.child.stop()
+        self.hands.close()
+        if self._own_frames:
+            self.frames.close()
+        self.hands = self.frames = None
+
+    def set_max_hands(self, n):
+        self.hands.ctrl["max_hands"][...] = int(max(1, n))
+
+    def set_infer_scale(self, scale):
+        self.hands.ctrl["infer_scale"][...] = float(scale)
+
+    # -------- lado del juego --------
+    def submit(self, frame_bgr, t_frame=None):
+        """No bloquea: una copia a memoria compartida (o nada si se sigue a la captura)."""
+        now = time.perf_counter()
+        self.hands.ctrl["t_want"][...] = now
+        if self.follow:
+            return
+        self._pub.publish(frame_bgr, now if not t_frame else t_frame)
+        self.submitted += 1
+
+    def latest_hands(self):
+        """Ultimas manos detectadas; lista vacia si el resultado es mas viejo que max_age."""
+        self.child.poll()
+        n, rec = self.hands.read_latest(self._last, self._out)
+        if rec is not None:
+            self._out = rec
+            self._last = n
+            k = int(rec["n"])
+            self._result = [(float(rec["xy"][i, 0]), float(rec["xy"][i, 1]), _array_to_landmarks(rec["lm"][i]))
+                            for i in range(k)]
+            self._t_result = float(rec["t"])
+            self.inference_ms = float(rec["ms"])
+        t_res = self._t_result
+        self.result_time = t_res if t_res > 0.0 else None
+        if t_res > 0.0:
+            age = time.perf_counter() - t_res
+            self.result_age_ms = age * 1000.0
+            if age > self.max_age:
+                return []
+        return self._result
+
+    def latest(self):
+        hands = self.latest_hands()
+        if not hands:
+            return None, None, False
+        _, y_norm, landmarks = hands[0]
+        return float(y_norm), landmarks, True
+
+    def stats(self):
+        processed = self.hands.head if self.hands is not None else self._last
+        return {
+            "inference_ms": round(self.inference_ms, 1),
+            "result_age_ms": round(self.result_age_ms, 1),
+            "processed": processed,
+            "skipped": max(0, self.submitted - processed) if not self.follow else None,
+            "restarts": self.child.restarts,
+            "dead": self.child.dead,
+        }
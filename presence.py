@@ -0,0 +1,118 @@
+# presence.py - Modo kiosco: deteccion barata de presencia y reposo entre jugadores (ASCII)
+#
+# En la feria el juego pasa mucho tiempo en el menu o en "Fin del juego" sin nadie
+# delante. KioskIdle decide cuando dormir (estado quieto y sin actividad por un rato):
+# la camara baja a pocos FPS, la pantalla de espera se dibuja una sola vez y solo corre
+# PresenceDetector, una diferencia de frames sobre una imagen chica en gris. Cualquier
+# movimiento frente a la camara, tecla o mouse despierta el juego en el mismo ciclo.
+
+import time
+
+import cv2
+import numpy as np
+
+
+class PresenceDetector:
+    """
+    update(raw_bgr) -> True si hay alguien moviendose frente a la camara:
+      - el frame se reduce a size (INTER_AREA) y pasa a gris en buffers propios.
+      - se compara con un fondo que se adapta lento (adapt), asi la luz que cambia de a
+        poco no cuenta como movimiento.
+      - hay presencia si la fraccion de pixeles que cambiaron mas de threshold supera
+        min_fraction durante confirm frames seguidos (un parpadeo de luz no despierta).
+    """
+    def __init__(self, size=(80, 45), threshold=18, min_fraction=0.02, confirm=2, adapt=0.05):
+        self.size = (int(size[0]), int(size[1]))
+        w, h = self.size
+        self.threshold = float(threshold)
+        self.min_fraction = float(min_fraction)
+        self.confirm = max(1, int(confirm))
+        self.adapt = float(adapt)
+
+        self._small = np.empty((h, w, 3), np.uint8)
+        self._gray = np.empty((h, w), np.uint8)
+        self._bg = np.zeros((h, w), np.float32)
+        self._bg8 = np.empty((h, w), np.uint8)
+        self._diff = np.empty((h, w), np.uint8)
+        self._ready = False
+        self._hits = 0
+
+        self.checks = 0
+        self.fraction = 0.0
+        self.cost_ms = 0.0
+
+    def reset(self):
+        """Olvida el fondo (al dormir de nuevo la escena pudo cambiar)."""
+        self._ready = False
+        self._hits = 0
+
+    def update(self, raw):
+        t0 = time.perf_counter()
+        cv2.resize(raw, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        present = False
+        if not self._ready:
+            self._bg[:] = self._gray
+            self._ready = True
+        else:
+            cv2.convertScaleAbs(self._bg, dst=self._bg8)
+            cv2.absdiff(self._gray, self._bg8, dst=self._diff)
+            cv2.threshold(self._diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+            self.fraction = cv2.countNonZero(self._diff) / float(self._diff.size)
+            self._hits = self._hits + 1 if self.fraction >= self.min_fraction else 0
+            present = self._hits >= self.confirm
+            cv2.accumulateWeighted(self._gray, self._bg, self.adapt)
+        self.checks += 1
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.cost_ms = ms if self.cost_ms == 0.0 else 0.9 * self.cost_ms + 0.1 * ms
+        return present
+
+
+class KioskIdle:
+    """
+    Reloj de actividad del kiosco (GameApp aplica los cambios de camara y pantalla):
+      - touch(t) ante cualquier actividad (tecla, mouse, presencia, cambio de estado).
+      - should_sleep(t, quiet) True si el estado es quieto y no hubo actividad en after_s.
+      - sleep(t) / wake(t, motivo) llevan la cuenta de reposos, despertares y tiempo dormido.
+    after_s <= 0 apaga el modo kiosco.
+    """
+    def __init__(self, after_s=30.0, verbose=True):
+        self.after_s = float(after_s)
+        self.enabled = self.after_s > 0.0
+        self.verbose = bool(verbose)
+        self.asleep = False
+        self.t_active = None
+        self._t_sleep = 0.0
+        self.sleeps = 0
+        self.wakes = {}
+        self.slept_s = 0.0
+
+    def touch(self, t):
+        self.t_active = t
+
+    def should_sleep(self, t, quiet):
+        if not self.enabled or self.asleep or not quiet:
+            return False
+        if self.t_active is None:
+            self.t_active = t
+        return t - self.t_active >= self.after_s
+
+    def sleep(self, t):
+        self.asleep = True
+        self._t_sleep = t
+        self.sleeps += 1
+        if self.verbose:
+            print(f"Kiosco: reposo tras {self.after_s:.0f} s sin actividad")
+
+    def wake(self, t, reason):
+        if not self.asleep:
+            return
+        self.asleep = False
+        self.t_active = t
+        self.slept_s += t - self._t_sleep
+        self.wakes[reason] = self.wakes.get(reason, 0) + 1
+        if self.verbose:
+            print(f"Kiosco: despierto por {reason} tras {t - self._t_sleep:.1f} s")
+
+    def stats(self):
+        return {"sleeps": self.sleeps, "wakes": dict(self.wakes), "slept_s": round(self.slept_s, 1)}
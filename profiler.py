@@ -0,0 +1,131 @@
+# profiler.py - Tiempos por etapa del frame, histograma movil, overlay en pantalla y log CSV (ASCII)
+
+import time
+from collections import deque
+
+import cv2
+
+
+class FrameProfiler:
+    """
+    Instrumentacion liviana de GameApp.run:
+      - lap(etapa) anota el tiempo desde la marca anterior (un perf_counter por etapa).
+      - Ventana movil de los ultimos frames e histograma de tiempo de frame mantenido
+        de forma incremental (entra un frame, sale el mas viejo).
+      - draw() pinta el overlay (FPS, desglose por etapa, edad de la inferencia).
+      - Si hay log_path, agrega una fila CSV por frame para analizar despues.
+    """
+    STAGES = ("capture", "inference", "update", "draw", "present")
+    HIST_STEP_MS = 5.0
+    HIST_BINS = 10   # 0-5, 5-10, ... , 45+ ms
+
+    def __init__(self, window=120, log_path=""):
+        self.window = int(window)
+        self.samples = {s: deque(maxlen=self.window) for s in self.STAGES}
+        self.frame_ms = deque(maxlen=self.window)
+        self.hist = [0] * self.HIST_BINS
+        self.frames = 0
+        self.inference_age_ms = None
+
+        self._t_frame = None
+        self._t_lap = None
+        self._cur = dict.fromkeys(self.STAGES, 0.0)
+
+        self.log = None
+        if log_path:
+            self.log = open(log_path, "w", buffering=1 << 16)
+            self.log.write("t,frame_ms," + ",".join(f"{s}_ms" for s in self.STAGES) + ",inference_age_ms,state\n")
+
+    # -------- marcas --------
+    def begin_frame(self):
+        t = time.perf_counter()
+        self._t_frame = t
+        self._t_lap = t
+        for s in self.STAGES:
+            self._cur[s] = 0.0
+
+    def lap(self, stage):
+        t = time.perf_counter()
+        self._cur[stage] += (t - self._t_lap) * 1000.0
+        self._t_lap = t
+
+    def end_frame(self, state="", inference_age_ms=None):
+        if self._t_frame is None:
+            return
+        t = time.perf_counter()
+        total = (t - self._t_frame) * 1000.0
+        for s in self.STAGES:
+            self.samples[s].append(self._cur[s])
+
+        # histograma movil: sacar el frame que sale de la ventana
+        if len(self.frame_ms) == self.window:
+            self.hist[self._bin(self.frame_ms[0])] -= 1
+        self.frame_ms.append(total)
+        self.hist[self._bin(total)] += 1
+        self.frames += 1
+        self.inference_age_ms = inference_age_ms
+
+        if self.log is not None:
+            age = "" if inference_age_ms is None else f"{inference_age_ms:.1f}"
+            vals = ",".join(f"{self._cur[s]:.2f}" for s in self.STAGES)
+            self.log.write(f"{t:.4f},{total:.2f},{vals},{age},{state}\n")
+
+    def _bin(self, ms):
+        return min(self.HIST_BINS - 1, int(ms / self.HIST_STEP_MS))
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    # -------- resumen --------
+    def fps(self):
+        if not self.frame_ms:
+            return 0.0
+        return 1000.0 / max(1e-6, sum(self.frame_ms) / len(self.frame_ms))
+
+    def mean_ms(self, stage):
+        d = self.samples[stage]
+        return sum(d) / len(d) if d else 0.0
+
+    def p95_ms(self):
+        if not self.frame_ms:
+            return 0.0
+        s = sorted(self.frame_ms)
+        return s[min(len(s) - 1, int(0.95 * len(s)))]
+
+    def summary(self):
+        out = {"frames": self.frames, "fps": round(self.fps(), 1), "p95_ms": round(self.p95_ms(), 2)}
+        for s in self.STAGES:
+            out[f"{s}_ms"] = round(self.mean_ms(s), 2)
+        return out
+
+    # -------- overlay --------
+    def draw(self, frame, x0=12, y0=60):
+        """Caja semitransparente con FPS, desglose por etapa e histograma de tiempo de frame."""
+        w_box, h_box = 300, 62 + 20 * len(self.STAGES) + 50
+        roi = frame[y0:y0 + h_box, x0:x0 + w_box]
+        cv2.convertScaleAbs(roi, dst=roi, alpha=1.0 / 3.0)  # oscurecer solo la caja, en sitio
+
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        white = (255, 255, 255)
+        y = y0 + 22
+        cv2.putText(frame, f"FPS {self.fps():5.1f}   p95 {self.p95_ms():5.1f} ms", (x0 + 8, y), font, 0.5, white, 1)
+        y += 20
+        age = "n/a" if self.inference_age_ms is None else f"{self.inference_age_ms:5.1f} ms"
+        cv2.putText(frame, f"Edad inferencia: {age}", (x0 + 8, y), font, 0.5, white, 1)
+
+        colors = [(255, 200, 80), (80, 220, 255), (120, 255, 120), (255, 120, 200), (200, 200, 200)]
+        for s, col in zip(self.STAGES, colors):
+            y += 20
+            ms = self.mean_ms(s)
+            cv2.putText(frame, f"{s:9s} {ms:5.1f}", (x0 + 8, y), font, 0.45, col, 1)
+            cv2.rectangle(frame, (x0 + 130, y - 9), (x0 + 130 + int(min(160, ms * 8)), y - 1), col, -1)
+
+        # histograma movil (cada barra = 5 ms)
+        base_y = y0 + h_box - 8
+        peak = max(1, max(self.hist))
+        for i, c in enumerate(self.hist):
+            bh = int(36 * c / peak)
+            bx = x0 + 8 + i * 28
+            cv2.rectangle(frame, (bx, base_y - bh), (bx + 22, base_y), (180, 180, 180), -1)
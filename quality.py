@@ -0,0 +1,113 @@
+# quality.py - Gobernador de calidad: baja o sube el trabajo por frame para sostener un FPS objetivo (ASCII)
+#
+# En equipos lentos el bucle simplemente se frenaba. QualityGovernor mira el tiempo de
+# frame (media movil exponencial) y, si se pasa del presupuesto por un rato, baja un
+# nivel; si sobra margen por mas tiempo, sube uno. Los niveles van de lo que menos se
+# nota (antialias, esqueleto simple) a lo que mas ahorra (inferencia mas chica y menos
+# seguida). Cada cambio queda registrado en changes y se imprime.
+
+import time
+
+import cv2
+
+
+class QualityLevel:
+    """Perillas de un nivel de calidad (las aplica GameApp._apply_quality)."""
+    __slots__ = ("name", "infer_scale", "infer_every", "skeleton", "blend", "interp", "antialias")
+
+    def __init__(self, name, infer_scale, infer_every, skeleton, blend, interp, antialias):
+        self.name = name
+        self.infer_scale = float(infer_scale)   # fraccion de DETECTION_INFER_WIDTH / ROI_SIZE
+        self.infer_every = int(infer_every)     # inferir 1 de cada N frames de camara
+        self.skeleton = skeleton                # "full" (estilo MediaPipe + mezcla), "simple" o "off"
+        self.blend = bool(blend)                # paneles semitransparentes (False = fondo liso)
+        self.interp = interp                    # interpolacion de fit_fill
+        self.antialias = bool(antialias)        # cv2.LINE_AA en lo que se dibuja cada frame
+
+
+LEVELS = (
+    QualityLevel("alta",   1.00, 1, "full",   True,  cv2.INTER_LINEAR,  True),
+    QualityLevel("media",  1.00, 1, "simple", True,  cv2.INTER_LINEAR,  False),
+    QualityLevel("baja",   0.75, 1, "simple", False, cv2.INTER_NEAREST, False),
+    QualityLevel("minima", 0.75, 2, "off",    False, cv2.INTER_NEAREST, False),
+    QualityLevel("critica", 0.50, 3, "off",   False, cv2.INTER_NEAREST, False),
+)
+
+
+class QualityGovernor:
+    """
+    update(frame_ms, t) devuelve True si cambio el nivel (current = QualityLevel activo).
+      - baja un nivel si la media pasa de budget * over durante degrade_s
+      - sube un nivel si la media queda bajo budget * headroom durante restore_s
+      - despues de un cambio espera settle_s sin decidir (el costo nuevo tarda en verse)
+      - si al subir vuelve a bajar enseguida (rebote), la espera para subir se duplica
+    Con enabled=False el nivel queda fijo en start.
+    """
+    def __init__(self, target_fps=30.0, start=0, levels=LEVELS, enabled=True,
+                 degrade_s=0.5, restore_s=3.0, settle_s=0.5, over=1.1, headroom=0.7,
+                 smoothing=0.1, verbose=True):
+        self.levels = levels
+        self.level = int(max(0, min(len(levels) - 1, start)))
+        self.enabled = bool(enabled)
+        self.budget_ms = 1000.0 / max(1.0, float(target_fps))
+        self.degrade_s = float(degrade_s)
+        self.restore_s = float(restore_s)
+        self.settle_s = float(settle_s)
+        self.over = float(over)
+        self.headroom = float(headroom)
+        self.smoothing = float(smoothing)
+        self.verbose = bool(verbose)
+
+        self.ema_ms = None
+        self.changes = []           # (t, nivel_anterior, nivel_nuevo, ema_ms)
+        self._restore_wait = self.restore_s
+        self._since = None          # desde cuando la media esta fuera de banda
+        self._settle_until = 0.0
+        self._t_restore = None      # ultimo ascenso (para detectar rebotes)
+
+    @property
+    def current(self):
+        return self.levels[self.level]
+
+    def update(self, frame_ms, t=None):
+        t = time.perf_counter() if t is None else t
+        a = self.smoothing
+        self.ema_ms = frame_ms if self.ema_ms is None else self.ema_ms + a * (frame_ms - self.ema_ms)
+        if not self.enabled or t < self._settle_until:
+            return False
+
+        if self.ema_ms > self.budget_ms * self.over and self.level < len(self.levels) - 1:
+            direction, wait = 1, self.degrade_s
+        elif self.ema_ms < self.budget_ms * self.headroom and self.level > 0:
+            direction, wait = -1, self._restore_wait
+        else:
+            self._since = None
+            return False
+
+        if self._since is None or self._since[0] != direction:
+            self._since = (direction, t)
+            return False
+        if t - self._since[1] < wait:
+            return False
+
+        if direction > 0 and self._t_restore is not None and t - self._t_restore < 2.0 * self._restore_wait:
+            self._restore_wait = min(60.0, self._restore_wait * 2.0)
+        self._set(self.level + direction, t)
+        if direction < 0:
+            self._t_restore = t
+        return True
+
+    def _set(self, level, t):
+        old = self.level
+        self.level = level
+        self.changes.append((t, old, level, self.ema_ms))
+        self._since = None
+        self._settle_until = t + self.settle_s
+        if self.verbose:
+            print(f"Calidad: {self.levels[old].name} -> {self.levels[level].name} "
+                  f"(frame {self.ema_ms:.1f} ms, objetivo {self.budget_ms:.1f} ms)")
+
+    def stats(self):
+        return {"level": self.current.name, "changes": len(self.changes),
+                "frame_ms": None if self.ema_ms is None else round(self.ema_ms, 2),
+                "target_ms": round(self.budget_ms, 2), "restore_s": self._restore_wait}
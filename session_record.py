@@ -0,0 +1,238 @@
+# session_record.py - Grabacion y repeticion de sesiones (frames o landmarks + teclas + mouse) (ASCII)
+#
+# Una sesion "ruta" son dos archivos:
+#   ruta.frames  frames crudos de camara (uint8) uno tras otro, abribles con np.memmap
+#   ruta.npz     indice: por vuelta del bucle (t, frame, tecla, mouse, manos) + datos por frame
+#
+# Al repetir, cada vuelta del bucle consume una vuelta grabada: mismo frame, misma tecla,
+# mismo mouse y mismo reloj, asi el juego y HandDetector corren igual sin camara.
+
+import json
+import time
+
+import numpy as np
+
+N_LANDMARKS = 21
+MAX_HANDS = 2
+SIDE_NONE, SIDE_RIGHT, SIDE_LEFT = -1, 0, 1  # paleta a la que fue cada mano (derecha = jugador 1)
+
+
+def _landmarks_to_array(lm):
+    out = np.full((N_LANDMARKS, 3), np.nan, dtype=np.float32)
+    if lm is not None:
+        for i, p in enumerate(lm.landmark[:N_LANDMARKS]):
+            out[i] = (p.x, p.y, p.z)
+    return out
+
+
+def _array_to_landmarks(arr):
+    """NormalizedLandmarkList para draw_skeleton (None si MediaPipe no esta instalado)."""
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except Exception:
+        return None
+    lm = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in arr:
+        p = lm.landmark.add()
+        p.x, p.y, p.z = float(x), float(y), float(z)
+    return lm
+
+
+class SessionRecorder:
+    """
+    Graba una sesion en vivo:
+      - mode="frames": guarda cada frame nuevo de camara (crudo, antes del espejo) y las manos.
+      - mode="landmarks": solo las manos detectadas (archivo chico, repite sin HandDetector).
+      - add_loop() anota una vuelta del bucle: reloj, frame vigente, tecla, mouse, la mano
+        principal y todas las que entrego process_hands, con la paleta que le toco a cada
+        una y el instante de la medicion (asi una partida de dos se repite igual).
+    El indice se escribe en close().
+    """
+    def __init__(self, path, mode="frames", meta=None):
+        self.path = path
+        self.mode = mode
+        self.meta = dict(meta or {})
+        self._frames = open(path + ".frames", "wb") if mode == "frames" else None
+        self.frame_shape = None
+        self.frame_t = []
+
+        self.loop_t = []
+        self.frame_ref = []
+        self.keys = []
+        self.mouse_y = []
+        self.hand_y = []
+        self.hand_lm = []
+        self.hand_t = []
+        self.hands_xy = []
+        self.hands_lm = []
+        self.hands_side = []
+
+    def add_frame(self, raw, t_capture):
+        """Frame nuevo de camara; si cambia de tamano se descarta (el .frames es de forma fija)."""
+        if self._frames is None or raw is None:
+            return
+        if self.frame_shape is None:
+            self.frame_shape = raw.shape
+        elif raw.shape != self.frame_shape:
+            return
+        self._frames.write(memoryview(np.ascontiguousarray(raw)))
+        self.frame_t.append(t_capture)
+
+    def add_loop(self, t, key, mouse_y, hand, hands=(), left_hand=None, t_meas=None):
+        """
+        hand = (y_norm, landmarks, valid) de la paleta derecha; hands = lista de
+        process_hands (x, y, landmarks); left_hand = la mano de la paleta izquierda (dos jugadores).
+        """
+        y_norm, lm, valid = hand
+        self.loop_t.append(t)
+        self.frame_ref.append(len(self.frame_t) - 1)
+        self.keys.append(key)
+        self.mouse_y.append(mouse_y)
+        self.hand_y.append(y_norm if (valid and y_norm is not None) else np.nan)
+        self.hand_lm.append(_landmarks_to_array(lm if valid else None))
+        self.hand_t.append(np.nan if t_meas is None else t_meas)
+
+        xy = np.full((MAX_HANDS, 2), np.nan, dtype=np.float32)
+        arr = np.full((MAX_HANDS, N_LANDMARKS, 3), np.nan, dtype=np.float32)
+        side = np.full(MAX_HANDS, SIDE_NONE, dtype=np.int8)
+        # primero las manos que movieron una paleta (con el y que uso el juego), despues
+        # las que process_hands entrego sin asignar
+        xs = {id(hlm): x for x, _, hlm in hands}
+        rows = []
+        if valid and y_norm is not None:
+            rows.append((xs.get(id(lm), np.nan), y_norm, lm, SIDE_RIGHT))
+        if left_hand is not None and left_hand[2] and left_hand[0] is not None:
+            rows.append((xs.get(id(left_hand[1]), np.nan), left_hand[0], left_hand[1], SIDE_LEFT))
+        used = {id(r[2]) for r in rows}
+        rows += [(x, y, hlm, SIDE_NONE) for x, y, hlm in hands if id(hlm) not in used]
+        for k, (x, y, hlm, sd) in enumerate(rows[:MAX_HANDS]):
+            xy[k] = (x, y)
+            arr[k] = _landmarks_to_array(hlm)
+            side[k] = sd
+        self.hands_xy.append(xy)
+        self.hands_lm.append(arr)
+        self.hands_side.append(side)
+
+    def close(self):
+        if self._frames is not None:
+            self._frames.close()
+            self._frames = None
+        shape = self.frame_shape or (0, 0, 3)
+        np.savez_compressed(
+            self.path + ".npz",
+            mode=np.array(self.mode),
+            frame_shape=np.array(shape, dtype=np.int32),
+            frame_t=np.array(self.frame_t, dtype=np.float64),
+            loop_t=np.array(self.loop_t, dtype=np.float64),
+            frame_ref=np.array(self.frame_ref, dtype=np.int32),
+            keys=np.array(self.keys, dtype=np.int16),
+            mouse_y=np.array(self.mouse_y, dtype=np.int16),
+            hand_y=np.array(self.hand_y, dtype=np.float32),
+            hand_lm=np.array(self.hand_lm, dtype=np.float32).reshape(-1, N_LANDMARKS, 3),
+            hand_t=np.array(self.hand_t, dtype=np.float64),
+            hands_xy=np.array(self.hands_xy, dtype=np.float32).reshape(-1, MAX_HANDS, 2),
+            hands_lm=np.array(self.hands_lm, dtype=np.float32).reshape(-1, MAX_HANDS, N_LANDMARKS, 3),
+            hands_side=np.array(self.hands_side, dtype=np.int8).reshape(-1, MAX_HANDS),
+            meta=np.array(json.dumps(self.meta)),
+        )
+        return len(self.loop_t)
+
+
+class SessionReplay:
+    """
+    Fuente de repeticion para GameApp:
+      - next() avanza una vuelta (False al terminar); con realtime=True espera para
+        respetar los tiempos grabados, si no corre a maxima velocidad.
+      - now() es el reloj grabado de la vuelta actual (el juego lo usa en vez del real).
+      - frame() devuelve (frame crudo, t_captura, nuevo) leido del memmap sin copiar;
+        None si la sesion es solo de landmarks.
+      - hand() devuelve la mano grabada como (y_norm, landmarks, valid).
+      - hands() devuelve (mano derecha, mano izquierda, t_medicion) con todas las manos
+        grabadas; las sesiones viejas (solo la mano principal) dan la izquierda vacia y
+        el reloj de la vuelta como instante de medicion.
+    """
+    def __init__(self, path, realtime=True):
+        with np.load(path + ".npz") as idx:
+            self.mode = str(idx["mode"])
+            self.frame_t = idx["frame_t"]
+            self.loop_t = idx["loop_t"]
+            self.frame_ref = idx["frame_ref"]
+            self.keys = idx["keys"]
+            self.mouse_y = idx["mouse_y"]
+            self.hand_y = idx["hand_y"]
+            self.hand_lm = idx["hand_lm"]
+            multi = "hands_side" in idx.files
+            self.hand_t = idx["hand_t"] if multi else None
+            self.hands_xy = idx["hands_xy"] if multi else None
+            self.hands_lm = idx["hands_lm"] if multi else None
+            self.hands_side = idx["hands_side"] if multi else None
+            shape = tuple(int(v) for v in idx["frame_shape"])
+            self.meta = json.loads(str(idx["meta"]))
+        self.frames = None
+        if self.mode == "frames" and len(self.frame_t):
+            self.frames = np.memmap(path + ".frames", dtype=np.uint8, mode="r",
+                                    shape=(len(self.frame_t),) + shape)
+        self.realtime = bool(realtime)
+        self.n = len(self.loop_t)
+        self.i = -1
+        self._prev_ref = -1
+        self._t_start = None
+
+    @property
+    def has_frames(self):
+        return self.frames is not None
+
+    def next(self):
+        self.i += 1
+        if self.i >= self.n:
+            return False
+        if self.realtime:
+            if self._t_start is None:
+                self._t_start = time.perf_counter()
+            wait = (self.loop_t[self.i] - self.loop_t[0]) - (time.perf_counter() - self._t_start)
+            if wait > 0:
+                time.sleep(wait)
+        return True
+
+    def now(self):
+        return float(self.loop_t[max(0, min(self.i, self.n - 1))])
+
+    def frame(self):
+        ref = int(self.frame_ref[self.i])
+        if self.frames is None or ref < 0:
+            return None, 0.0, False
+        nuevo = ref != self._prev_ref
+        self._prev_ref = ref
+        return self.frames[ref], float(self.frame_t[ref]), nuevo
+
+    def key(self):
+        return int(self.keys[self.i])
+
+    def mouse(self):
+        return int(self.mouse_y[self.i])
+
+    def hand(self):
+        y = float(self.hand_y[self.i])
+        if y != y:  # NaN = sin mano
+            return None, None, False
+        return y, _array_to_landmarks(self.hand_lm[self.i]), True
+
+    def hands(self):
+        none = (None, None, False)
+        if self.hands_side is None:
+            return self.hand(), none, self.now()
+        sides = {SIDE_RIGHT: none, SIDE_LEFT: none}
+        for k, side in enumerate(self.hands_side[self.i]):
+            if side in sides:
+                y = float(self.hands_xy[self.i, k, 1])
+                sides[int(side)] = (y, _array_to_landmarks(self.hands_lm[self.i, k]), True)
+        t = float(self.hand_t[self.i])
+        return sides[SIDE_RIGHT], sides[SIDE_LEFT], (None if t != t else t)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "loops": self.n,
+            "frames": len(self.frame_t),
+            "seconds": round(float(self.loop_t[-1] - self.loop_t[0]), 2) if self.n else 0.0,
+        }
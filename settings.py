@@ -5,17 +5,28 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FULLSCREEN = False
 WINDOW_NAME = "Hand Pong"
+IDLE_FPS = 15              # FPS en MENU / PAUSA / FIN (ahorra CPU y bateria); 0 = sin limite
 
-# Camara
+# Camara / fuente de frames
+FRAME_SOURCE = "camera"    # "camera", "video" (FRAME_SOURCE_PATH), "synthetic" o "shm" (otro proceso publica)
+FRAME_SOURCE_PATH = ""     # video para FRAME_SOURCE = "video"
+FRAME_SOURCE_SHM = "handpong"  # nombre del bloque de memoria compartida
+CAMERA_BACKEND = "auto"    # "auto" (DirectShow en Windows, V4L2 en Linux), "any", "dshow", "msmf", "v4l2"...
 CAMERA_INDEX = 0
 CAMERA_CAPTURE_W = 1280
 CAMERA_CAPTURE_H = 720
 CAMERA_FPS = 30
+CAMERA_THREADED = True     # captura en hilo propio (el juego nunca espera a la camara)
+CAPTURE_RING_SIZE = 3      # buffers preasignados del anillo de captura
+CAPTURE_PROCESS = False    # camara en un proceso aparte (frames por memoria compartida; se reinicia si se cae)
 
 # =========================
 # ESTADOS
 # =========================
 SERVE_DELAY = 0.9
+PHYSICS_HZ = 120           # pasos fijos de fisica por segundo (independiente del FPS)
+PHYSICS_SEED = None        # entero = partidas repetibles (misma semilla + mismas entradas)
+MAX_FRAME_DT = 0.25        # s; tope de tiempo real consumido por frame (evita espiral)
 WINNING_SCORE = 3  # fin a 3 puntos
 
 # =========================
@@ -46,7 +57,26 @@ BALL_COLOR = (255, 255, 255)
 # =========================
 DETECTION_CONFIDENCE = 0.7
 TRACKING_CONFIDENCE = 0.6
-HAND_EMA_ALPHA = 0.28
+HAND_FILTER_Q = 2.0e5         # Kalman: ruido de aceleracion (mas alto = sigue mas rapido)
+HAND_FILTER_R = 16.0          # Kalman: ruido de medicion (px^2)
+HAND_PREDICT_MAX = 0.1        # s; techo de la extrapolacion: el horizonte real es la latencia medida
+                              # (captura + inferencia) de la mano, 0 = sin prediccion
+HAND_TRACE_FILE = ""          # CSV t,y de mediciones para filter_harness.py ("" = no grabar)
+DETECTION_MODE = "inline"     # "inline" (en el bucle), "async" (hilo de fondo) o "process" (proceso aparte, otro nucleo)
+DETECTION_MAX_AGE = 0.5       # s; resultados async mas viejos se descartan
+DETECTION_INFER_WIDTH = 480   # ancho de inferencia en busqueda completa
+DETECTION_ROI = True          # con mano detectada, inferir solo alrededor de ella
+DETECTION_ROI_SIZE = 256      # ancho de inferencia dentro de la ROI
+DETECTION_ROI_MARGIN = 0.35   # margen alrededor de la mano (fraccion del tamano)
+DETECTION_SEARCH_X0 = 0.0     # inicio de la busqueda (0.5 = solo mitad del jugador)
+TWO_PLAYERS = False           # dos jugadores humanos (una mano cada uno) en vez de jugador vs IA
+HAND_HANDOVER_S = 0.6         # s; mano asentada en la otra mitad -> pasa a esa paleta (si esta libre)
+HAND_DROP_S = 0.5             # s sin ver la mano de una paleta para liberarla
+GESTURES = True               # gestos sin teclado: palma = ESPACIO, 1-3 dedos = perfil, OK = modo / pausa, puno = reiniciar (en pausa)
+GESTURE_HOLD_S = 0.5          # s que hay que sostener un gesto para que cuente
+GESTURE_COOLDOWN_S = 1.0      # s minimos entre dos gestos
+STARTUP_BACKGROUND = True     # camara y MediaPipe cargan detras del menu (False = todo antes de mostrarlo)
+STARTUP_WARMUP = True         # inferencia de calentamiento antes de poder jugar
 
 # =========================
 # PANEL EDUCATIVO
@@ -61,12 +91,63 @@ SHOW_PREDICTION = True
 PRED_LINE_COLOR = (120, 255, 120)
 PRED_LINE_THICK = 2
 
+# =========================
+# RENDIMIENTO (tecla P)
+# =========================
+PROFILER_OVERLAY = False   # overlay con FPS, tiempos por etapa y edad de la inferencia
+PROFILER_LOG = ""          # CSV con una fila por frame ("" = no grabar)
+FRAME_ALLOC_CHECK = False  # cuenta con tracemalloc los buffers asignados por frame (al salir imprime el resumen)
+QUALITY_GOVERNOR = True    # baja/sube la calidad sola para sostener QUALITY_TARGET_FPS (cada cambio se imprime)
+QUALITY_TARGET_FPS = 30
+QUALITY_LEVEL = 0          # nivel inicial (fijo si el gobernador esta apagado): 0 alta, 1 media, 2 baja, 3 minima, 4 critica
+QUALITY_RESTORE_S = 3.0    # s con margen antes de volver a subir un nivel
+
+# =========================
+# KIOSCO (reposo entre jugadores)
+# =========================
+KIOSK_IDLE_S = 45          # s sin actividad en menu / fin del juego antes del reposo (0 = nunca)
+KIOSK_CAPTURE_FPS = 4      # frames por segundo de la camara durante el reposo
+PRESENCE_THRESHOLD = 18    # cambio de brillo (0-255) que cuenta como movimiento
+PRESENCE_MIN_AREA = 0.02   # fraccion de la imagen que debe moverse para despertar
+
+# =========================
+# GRABAR / REPETIR SESION
+# =========================
+RECORD_SESSION = ""        # ruta base: graba ruta.frames + ruta.npz ("" = no grabar)
+RECORD_MODE = "frames"     # "frames" = camara cruda, "landmarks" = solo las manos (archivo chico)
+REPLAY_SESSION = ""        # ruta base de una sesion grabada: reemplaza camara, teclas, mouse y reloj
+REPLAY_REALTIME = True     # False = repetir a maxima velocidad (perfilado y benchmarks)
+
+# =========================
+# SALIDA PARA PUBLICO (segunda pantalla / grabacion)
+# =========================
+OUTPUT_FILE = ""           # video del juego compuesto, p. ej. "feria.avi" ("" = no grabar)
+OUTPUT_FOURCC = "MJPG"     # codec de OpenCV por software ("MJPG" con .avi, "mp4v" con .mp4)
+OUTPUT_STREAM_PORT = 0     # >0: stream MJPEG en http://127.0.0.1:<puerto>/ (navegador, OBS, VLC)
+OUTPUT_JPEG_QUALITY = 80
+OUTPUT_WIDTH = 640         # resolucion de salida (independiente de la pantalla)
+OUTPUT_HEIGHT = 360
+OUTPUT_FPS = 30            # ritmo de salida (independiente del FPS del juego)
+OUTPUT_QUEUE = 3           # buffers en cola; si el codificador se atrasa se descarta el mas viejo
+
+# =========================
+# TORNEO (cola de jugadores y ranking)
+# =========================
+TOURNAMENT_DB = "torneo.sqlite"  # partidos y ranking por temporada ("" = no guardar)
+TOURNAMENT_SEASON = ""     # nombre de la temporada ("" = ano actual)
+TOURNAMENT_CONSOLE = True  # anotarse escribiendo el nombre en la terminal donde corre el juego
+LEADERBOARD_SIZE = 5       # puestos del ranking en "Fin del juego"
+
 # =========================
 # APRENDIZAJE IA
 # =========================
 AI_LEARN_BINS = 6
+AI_LEARN_ANGLE_BINS = 1     # bandas por angulo de llegada (1 = solo Y, como antes)
 AI_LEARN_RATE = 0.15
 AI_HISTORY = 12
+AI_TARGET_CANDIDATES = 0    # >0: la IA puntua tantos objetivos a la vez y elige el mejor (0 = mezcla fija)
+AI_STORE_PATH = "ai_learning.npz"  # aprendizaje guardado entre sesiones ("" = empezar siempre de cero)
+AI_STORE_PLAYER = ""        # jugador actual ("" = publico general); cada perfil/jugador aprende aparte
 
 # HABILIDAD INICIAL IA (0=tonta, 1=experta)
 AI_SKILL_START = 0.35
\ No newline at end of file
@@ -0,0 +1,177 @@
+# simulation.py - Nucleo de simulacion determinista a paso fijo (sin camara ni ventana) (ASCII)
+
+import math
+import random
+
+import settings
+from game_objects import PlayerPaddle, AIPaddle, Ball
+from ai_strategy import OpponentAI
+from weak_zones import incoming_angle
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+
+class MatchSim:
+    """
+    Estado y fisica de un partido, avanzado siempre con el mismo dt (PHYSICS_HZ):
+      - step(player_y) integra un paso fijo: jugador, IA, pelota, colisiones y goles.
+      - Con la misma semilla y la misma secuencia de entradas el resultado es identico.
+      - render_state(alpha) interpola entre el paso anterior y el actual para dibujar.
+      - two_players=True: la paleta izquierda la mueve un segundo jugador (left_y) y la
+        IA no decide ni aprende.
+    """
+    def __init__(self, seed=None, hz=None, two_players=False):
+        self.hz = float(hz if hz is not None else getattr(settings, "PHYSICS_HZ", 120))
+        self.dt = 1.0 / self.hz
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.two_players = bool(two_players)
+
+        self.w = settings.SCREEN_WIDTH
+        self.h = settings.SCREEN_HEIGHT
+
+        margin = 40
+        self.player = PlayerPaddle(self.w - settings.PADDLE_WIDTH - margin, settings.PADDLE_R_COLOR)
+        self.ai = AIPaddle(margin, settings.PADDLE_L_COLOR)
+        self.ball = Ball(rng=self.rng)
+        self.ai_brain = OpponentAI(self.ai.x, rng=self.rng)
+
+        self.score_p = 0
+        self.score_ai = 0
+        self.tick = 0
+
+        # telemetria (rallies = golpes de paleta de cada punto del partido)
+        self.last_speed = 0.0
+        self.last_angle_deg = 0.0
+        self.rally_hits = 0
+        self.rallies = []
+        self.max_speed = 0.0
+        self._skill_seen = float("nan")  # nunca igual: fuerza el primer calculo de ai.max_speed
+
+        self._save_prev()
+
+    # -------- partido --------
+    def reset_match(self):
+        self.score_p = 0
+        self.score_ai = 0
+        self.rally_hits = 0
+        self.rallies = []
+        self.max_speed = 0.0
+        self.ball.reset(direction=1)
+        self._save_prev()
+
+    def is_over(self):
+        return max(self.score_p, self.score_ai) >= settings.WINNING_SCORE
+
+    # -------- paso fijo --------
+    def _save_prev(self):
+        self._prev = (float(self.ball.x), float(self.ball.y), float(self.ai.y), float(self.player.y))
+
+    def step(self, player_y, left_y=None):
+        """
+        Avanza un paso de self.dt. player_y es la Y objetivo del jugador en px (o None);
+        left_y la del jugador izquierdo en modo dos jugadores.
+        Devuelve "player" / "ai" si alguien anoto en este paso, si no None.
+        """
+        dt = self.dt
+        self._save_prev()
+        self.tick += 1
+
+        self.player.update(player_y, dt)
+
+        # IA mas lenta/rapida segun skill (anti-tiriteo se maneja en ai_strategy); la
+        # velocidad solo se recalcula cuando skill o el modo cambian
+        skill = None if self.two_players else self.ai_brain.skill
+        if skill != self._skill_seen:
+            self._skill_seen = skill
+            self.ai.max_speed = settings.PADDLE_MAX_SPEED if skill is None else \
+                int(settings.PADDLE_MAX_SPEED * (0.6 + 0.4 * skill))
+        if self.two_players:
+            self.ai.update(left_y, dt)
+        else:
+            ai_target = self.ai_brain.decide(self.ball, self.ai.center_y(), dt)
+            self.ai.update(int(ai_target), dt)
+
+        # pelota con colision continua contra paredes y ambas paletas (en orden temporal)
+        vx_before = self.ball.vx
+        self.ball.update(dt, (self.ai, self.player))
+
+        vx = float(self.ball.vx)
+        vy = float(self.ball.vy)
+        self.last_speed = math.hypot(vx, vy)
+        self.last_angle_deg = math.degrees(math.atan2(vy, vx if abs(vx) > 1e-6 else 1e-6))
+
+        # goles: la pelota vuelve al centro sin interpolar el salto
+        if self.ball.x < 0 or self.ball.x > self.w:
+            self.rallies.append(self.rally_hits)
+            self.rally_hits = 0
+        else:
+            if (vx_before > 0) != (vx > 0):
+                self.rally_hits += 1
+            if self.last_speed > self.max_speed:
+                self.max_speed = self.last_speed
+        if self.ball.x < 0:
+            self.score_p += 1
+            if not self.two_players:
+                self.ai_brain.learn_on_point_end(player_scored=True, ball_final_y=float(self.ball.y),
+                                                  ball_angle=incoming_angle(vx, vy))
+            self.ball.reset(direction=-1)
+            self._save_prev()
+            return "player"
+        if self.ball.x > self.w:
+            self.score_ai += 1
+            if not self.two_players:
+                self.ai_brain.learn_on_point_end(player_scored=False, ball_final_y=float(self.ball.y),
+                                                  ball_angle=incoming_angle(vx, vy))
+            self.ball.reset(direction=1)
+            self._save_prev()
+            return "ai"
+        return None
+
+    # -------- dibujo --------
+    def render_state(self, alpha):
+        """(ball_x, ball_y, ai_y, player_y) interpolados; alpha en [0, 1] dentro del paso actual."""
+        bx0, by0, ay0, py0 = self._prev
+        a = max(0.0, min(1.0, alpha))
+        return (lerp(bx0, float(self.ball.x), a), lerp(by0, float(self.ball.y), a),
+                lerp(ay0, float(self.ai.y), a), lerp(py0, float(self.player.y), a))
+
+
+# ---------- partidas sin ventana ----------
+def follow_ball(err_px=0.0, rng=None):
+    """Jugador sintetico: sigue la Y de la pelota con un error fijo por punto (px)."""
+    rng = rng if rng is not None else random.Random(0)
+    state = {"err": 0.0, "points": -1}
+
+    def policy(sim):
+        points = sim.score_p + sim.score_ai
+        if points != state["points"]:
+            state["points"] = points
+            state["err"] = rng.gauss(0.0, err_px) if err_px > 0 else 0.0
+        return float(sim.ball.y) + state["err"]
+    return policy
+
+
+def play_match(seed=None, player=None, max_seconds=600.0, hz=None):
+    """
+    Juega un partido completo sin camara, ventana ni dibujo.
+    player(sim) devuelve la Y objetivo del jugador en cada paso (por defecto follow_ball()).
+    Los saques no esperan SERVE_DELAY: solo cuenta el tiempo de juego.
+    """
+    sim = MatchSim(seed=seed, hz=hz)
+    player = player if player is not None else follow_ball(rng=random.Random(seed))
+    max_steps = int(max_seconds * sim.hz)
+    while sim.tick < max_steps and not sim.is_over():
+        sim.step(player(sim))
+    return {
+        "seed": seed,
+        "score_player": sim.score_p,
+        "score_ai": sim.score_ai,
+        "winner": "player" if sim.score_p > sim.score_ai else "ai",
+        "seconds": sim.tick / sim.hz,
+        "rallies": list(sim.rallies),
+        "max_speed": sim.max_speed,
+        "ai_skill": sim.ai_brain.skill,
+    }
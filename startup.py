@@ -0,0 +1,94 @@
+# startup.py - Arranque por etapas: el menu aparece ya, camara y MediaPipe cargan detras (ASCII)
+#
+# Lo lento al iniciar es importar MediaPipe (~1 s), abrir la camara (backend + formato)
+# y la primera inferencia (armado del grafo). BackgroundStartup hace las tres cosas en
+# un hilo mientras el menu ya se dibuja; GameApp conecta la camara cuando termina y no
+# deja empezar a jugar antes de la inferencia de calentamiento.
+
+import threading
+import time
+from contextlib import contextmanager
+
+import settings
+from frame_source import open_source
+
+
+class StartupTimer:
+    """Duracion de cada etapa (ms) e instantes clave desde t0 (ms)."""
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.phases = {}
+        self.marks = {}
+
+    @contextmanager
+    def phase(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - t) * 1000.0
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.t0) * 1000.0
+
+    def summary(self):
+        out = {f"{k}_ms": round(v, 1) for k, v in self.phases.items()}
+        out.update({f"t_{k}_ms": round(v, 1) for k, v in self.marks.items()})
+        return out
+
+
+class BackgroundStartup:
+    """
+    Abre la fuente de frames y deja HandDetector listo (import, grafo y calentamiento con
+    un frame vacio de frame_size). start() lo hace en un hilo; run() en el hilo actual
+    (repeticion/grabacion/headless, donde el arranque debe ser determinista).
+    Con remote (ProcessHandDetector) el modelo vive en otro proceso: aqui solo se importa
+    MediaPipe para dibujar y se espera a que el proceso de deteccion este listo.
+    """
+    def __init__(self, detector, frame_size, timer, open_camera=True, remote=None):
+        self.detector = detector
+        self.frame_size = frame_size
+        self.timer = timer
+        self.open_camera = bool(open_camera)
+        self.remote = remote
+        self.cap = None
+        self.error = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="startup", daemon=True)
+        self._thread.start()
+        return self
+
+    def run(self):
+        try:
+            if self.open_camera:
+                with self.timer.phase("camera_open"):
+                    self.cap = open_source()
+            if self.detector.enabled:
+                with self.timer.phase("mediapipe_import"):
+                    self.detector.import_backend()
+                if self.remote is not None:
+                    with self.timer.phase("detector_process"):
+                        self.remote.wait_ready()
+                    return self
+                with self.timer.phase("model_build"):
+                    self.detector.load()
+                if getattr(settings, "STARTUP_WARMUP", True):
+                    with self.timer.phase("warmup"):
+                        self.detector.warmup(*self.frame_size)
+        except Exception as e:  # la app sigue con mouse/teclas
+            self.error = e
+        finally:
+            self.timer.mark("ready")
+            self._done.set()
+        return self
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def join(self, timeout=None):
+        return self._done.wait(timeout)
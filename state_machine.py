@@ -0,0 +1,66 @@
+# state_machine.py - Maquina de estados con hooks de entrada/salida y teclas por estado (ASCII)
+#
+# GameApp registra cada estado (MENU, SERVE, PLAYING, PAUSED, GAME_OVER) con su funcion
+# de actualizacion por frame, sus hooks y su tabla de teclas. El bucle solo llama a
+# update() y key(): no hay cadenas de if sobre el nombre del estado.
+
+
+class State:
+    __slots__ = ("name", "update", "draw", "enter", "exit", "keys", "idle")
+
+    def __init__(self, name, update=None, draw=None, enter=None, exit=None, keys=None, idle=False):
+        self.name = name
+        self.update = update      # update(*args) una vez por frame
+        self.draw = draw          # draw(frame) despues del dibujo comun del juego
+        self.enter = enter        # al entrar (tambien al re-entrar al mismo estado)
+        self.exit = exit          # al salir
+        self.keys = dict(keys or {})  # tecla -> accion() solo en este estado
+        self.idle = bool(idle)    # nada se mueve: el bucle puede dibujar a menos FPS
+
+
+class StateMachine:
+    """
+    go(nombre) corre exit del estado actual y enter del nuevo; transitions cuenta los
+    cambios y on_change(anterior, nuevo) permite registrarlos.
+    """
+    def __init__(self, on_change=None):
+        self.states = {}
+        self.current = None
+        self.transitions = 0
+        self.on_change = on_change
+
+    def add(self, name, **kwargs):
+        self.states[name] = State(name, **kwargs)
+        return self.states[name]
+
+    @property
+    def name(self):
+        return None if self.current is None else self.current.name
+
+    @property
+    def idle(self):
+        return self.current is not None and self.current.idle
+
+    def go(self, name):
+        new = self.states[name]
+        old = self.current
+        if old is not None and old.exit is not None:
+            old.exit()
+        self.current = new
+        self.transitions += 1
+        if new.enter is not None:
+            new.enter()
+        if self.on_change is not None:
+            self.on_change(None if old is None else old.name, name)
+
+    def update(self, *args):
+        if self.current.update is not None:
+            self.current.update(*args)
+
+    def key(self, key):
+        """Accion de la tecla en el estado actual; True si habia una."""
+        action = self.current.keys.get(key)
+        if action is None:
+            return False
+        action()
+        return True
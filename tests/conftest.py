@@ -0,0 +1,6 @@
+# conftest.py - Los modulos del juego viven en la raiz del repo (sin paquete): se agregan al path
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
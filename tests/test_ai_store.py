@@ -0,0 +1,102 @@
+# test_ai_store.py - AIStore: ida y vuelta a disco, escritura atomica y archivo danado
+
+import os
+
+import numpy as np
+import pytest
+
+from ai_store import AIStore, store_key
+from ai_strategy import OpponentAI
+
+
+def _trained_ai():
+    ai = OpponentAI(40)
+    for i in range(12):
+        ai.learn_on_point_end(player_scored=i % 3 != 0, ball_final_y=60.0 * i, ball_angle=0.1 * (i - 6))
+    return ai
+
+
+def test_round_trip_restores_the_learned_state(tmp_path):
+    path = str(tmp_path / "ai.npz")
+    ai = _trained_ai()
+    state = ai.get_state()
+    store = AIStore(path)
+    store.put(store_key(1, "Ana"), state)
+    store.put(store_key(2), {"skill": np.array(0.8), "weak": np.zeros((3, 2), np.int32)})  # otras formas
+    store.close()
+    assert store.writes >= 1 and store.errors == 0
+    assert not os.path.exists(path + ".tmp")
+
+    again = AIStore(path)
+    try:
+        assert again.keys() == ["p1-Ana", "p2-publico"]
+        loaded = again.load("p1-Ana")
+        assert set(loaded) == set(state)
+        for k, v in state.items():
+            assert loaded[k].shape == v.shape and np.array_equal(loaded[k], v), k
+        assert float(again.load("p2-publico")["skill"]) == 0.8
+        assert again.load("p2-publico")["weak"].shape == (3, 2)
+        assert again.load("p9-nadie") is None
+        fresh = OpponentAI(40)
+        fresh.set_state(loaded)
+        for k, v in fresh.get_state().items():
+            assert np.array_equal(v, state[k]), k
+    finally:
+        again.close()
+
+
+def test_load_returns_a_copy_and_put_copies_the_state(tmp_path):
+    store = AIStore(str(tmp_path / "ai.npz"))
+    try:
+        weak = np.arange(6)
+        store.put("k", {"weak": weak})
+        weak[:] = 0  # el llamador sigue usando su arreglo
+        got = store.load("k")
+        assert list(got["weak"]) == list(range(6))
+        got["otro"] = 1
+        assert "otro" not in store.load("k")
+    finally:
+        store.close()
+
+
+def test_unreadable_file_is_moved_aside(tmp_path, capsys):
+    path = tmp_path / "ai.npz"
+    path.write_bytes(b"no es un npz")
+    store = AIStore(str(path))
+    try:
+        assert store.keys() == []
+        assert (tmp_path / "ai.npz.bad").read_bytes() == b"no es un npz"
+        assert "ilegible" in capsys.readouterr().out
+    finally:
+        store.close()
+
+
+def test_write_error_is_counted_not_raised(tmp_path):
+    store = AIStore(str(tmp_path / "no-existe" / "ai.npz"))
+    store.put("k", {"skill": np.array(0.5)})
+    store.close()
+    assert store.errors == 1 and store.writes == 0
+
+
+def test_store_key_is_filename_safe():
+    assert store_key(0) == "p0-publico"
+    assert store_key(2, "  Jose / Maria ") == "p2-Jose-Maria"
+    assert store_key(1, "***") == "p1-publico"
+
+
+def test_latest_put_wins_across_sessions(tmp_path):
+    path = str(tmp_path / "ai.npz")
+    for skill in (0.3, 0.5, 0.7):
+        store = AIStore(path)
+        prev = store.load("k")
+        assert prev is None or float(prev["skill"]) < skill
+        for step in range(5):  # varios puntos seguidos: el escritor puede juntarlos
+            store.put("k", {"skill": np.array(skill - 0.01 * (4 - step))})
+        store.close()
+        assert store.errors == 0
+    last = AIStore(path)
+    try:
+        assert float(last.load("k")["skill"]) == pytest.approx(0.7)
+        assert last.load_ms >= 0.0 and last.stats()["keys"] == 1
+    finally:
+        last.close()
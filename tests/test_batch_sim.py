@@ -0,0 +1,58 @@
+# test_batch_sim.py - Motor vectorizado: determinismo, limites del estado y coherencia con MatchSim
+
+import random
+
+import numpy as np
+import pytest
+
+import settings
+from batch_sim import BatchSim, NoisyTracker
+from simulation import follow_ball, play_match
+
+
+def _run(seed, err_px, n=32, seconds=15.0):
+    sim = BatchSim(n, seed=seed)
+    return sim, sim.run(seconds, NoisyTracker(n, err_px, seed=0))
+
+
+def test_same_seed_gives_identical_batches():
+    a, ra = _run(1, 80.0)
+    b, rb = _run(1, 80.0)
+    assert ra == rb
+    for name in ("bx", "by", "bvx", "bvy", "ai_y", "pl_y", "skill", "weak"):
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+    _, rc = _run(2, 80.0)
+    assert rc != ra
+
+
+def test_state_stays_inside_the_court_every_step():
+    n = 64
+    sim = BatchSim(n, seed=3)
+    player = NoisyTracker(n, 120.0, seed=1)
+    for _ in range(int(10 * sim.hz)):
+        sim.step(player(sim))
+        live = ~sim.ev_point
+        assert (sim.by[live] >= sim.R - 1e-6).all() and (sim.by[live] <= sim.H - sim.R + 1e-6).all()
+        assert (sim.pl_y >= 0).all() and (sim.pl_y <= sim.H - sim.PH).all()
+        assert (np.maximum(sim.score_p, sim.score_ai) < settings.WINNING_SCORE).all()
+    assert sim.tick == int(10 * sim.hz)
+    assert sim.points > 0 and sim.matches > 0
+
+
+def test_batch_agrees_with_the_scalar_simulation():
+    # un jugador que sigue la pelota sin error gana siempre, en MatchSim y en BatchSim
+    scalar = [play_match(seed=s, player=follow_ball(0.0, random.Random(s))) for s in range(4)]
+    assert all(r["winner"] == "player" for r in scalar)
+    _, summary = _run(4, 0.0)
+    assert summary["games_finished"] > 0 and summary["player_win_rate"] == 1.0
+    # con error grande la IA gana puntos y sube su skill, igual que OpponentAI
+    _, noisy = _run(4, 200.0)
+    assert noisy["player_win_rate"] < 1.0
+    assert noisy["ai_skill_mean"] > summary["ai_skill_mean"]
+
+
+@pytest.mark.parametrize("hz", [60, 240])
+def test_physics_hz_is_honoured(hz):
+    sim = BatchSim(8, seed=0, hz=hz)
+    sim.run(1.0)
+    assert sim.dt == 1.0 / hz and sim.tick == hz
@@ -0,0 +1,90 @@
+# test_collision.py - Colision continua circulo barrido vs paleta: caras, esquinas y sin tunel a pocos Hz
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+import collision_stress
+import settings
+from collision import (separate_circle_rect, separate_circle_rect_array, sweep_circle_rect,
+                       sweep_circle_rect_array)
+from game_objects import Ball, PlayerPaddle
+
+RECT = (100.0, 200.0, 120.0, 300.0)  # x0, y0, x1, y1
+R = 10.0
+
+
+def test_face_hit_time_and_normal():
+    # de x=50 a x=150: el borde del circulo toca x0=100 cuando el centro llega a 90
+    s, nx, ny = sweep_circle_rect(50.0, 250.0, 100.0, 0.0, R, *RECT)
+    assert s == pytest.approx(0.4) and (nx, ny) == (-1.0, 0.0)
+    s, nx, ny = sweep_circle_rect(110.0, 100.0, 0.0, 200.0, R, *RECT)  # extremo superior
+    assert s == pytest.approx(0.45) and (nx, ny) == (0.0, -1.0)
+
+
+def test_corner_hit_touches_the_corner_at_radius():
+    px, py, dx, dy = 60.0, 160.0, 80.0, 80.0  # en diagonal, derecho a la esquina (100, 200)
+    s, nx, ny = sweep_circle_rect(px, py, dx, dy, R, *RECT)
+    cx, cy = px + dx * s, py + dy * s
+    assert math.hypot(cx - RECT[0], cy - RECT[1]) == pytest.approx(R)
+    assert math.hypot(nx, ny) == pytest.approx(1.0) and nx < 0 and ny < 0
+    assert nx == pytest.approx(ny)
+    # pasa a 10.6 px de la esquina, por fuera del rectangulo inflado redondeado
+    assert sweep_circle_rect(60.0, 225.0, 80.0, -80.0, R, *RECT) is None
+
+
+def test_start_in_contact_counts_only_when_moving_inward():
+    assert sweep_circle_rect(95.0, 250.0, 10.0, 0.0, R, *RECT) == (0.0, -1.0, 0.0)
+    assert sweep_circle_rect(95.0, 250.0, -10.0, 0.0, R, *RECT) is None
+    assert sweep_circle_rect(0.0, 250.0, 50.0, 0.0, R, *RECT) is None  # no llega
+
+
+def test_array_version_matches_scalar():
+    rng = np.random.default_rng(0)
+    n = 2000
+    px = rng.uniform(0.0, 220.0, n)
+    py = rng.uniform(100.0, 400.0, n)
+    dx = rng.uniform(-150.0, 150.0, n)
+    dy = rng.uniform(-150.0, 150.0, n)
+    hit, s, nx, ny = sweep_circle_rect_array(px, py, dx, dy, R, *RECT)
+    for i in range(n):
+        ref = sweep_circle_rect(px[i], py[i], dx[i], dy[i], R, *RECT)
+        assert bool(hit[i]) == (ref is not None), i
+        if ref is not None:
+            assert (s[i], nx[i], ny[i]) == pytest.approx(ref, abs=1e-9), i
+    assert 0 < hit.sum() < n
+
+
+def test_separate_pushes_overlapping_circle_out_to_radius():
+    x, y = separate_circle_rect(104.0, 250.0, R, *RECT, -1.0, 0.0)  # centro dentro
+    assert (x, y) == (90.0, 250.0)
+    x, y = separate_circle_rect(95.0, 195.0, R, *RECT, -0.6, -0.8)
+    assert math.hypot(x - RECT[0], y - RECT[1]) == pytest.approx(R)
+    assert separate_circle_rect(50.0, 250.0, R, *RECT, -1.0, 0.0) == (50.0, 250.0)
+    xs, ys = separate_circle_rect_array(np.array([104.0, 50.0]), np.array([250.0, 250.0]), R, *RECT,
+                                        np.array([-1.0, -1.0]), np.array([0.0, 0.0]))
+    assert list(xs) == [90.0, 50.0] and list(ys) == [250.0, 250.0]
+
+
+def test_fast_ball_at_low_hz_is_returned_not_tunnelled():
+    # 3000 px/s a 30 Hz: 100 px por paso, mas que el ancho de la paleta mas el diametro
+    paddle = PlayerPaddle(settings.SCREEN_WIDTH - 60, (255, 255, 255))
+    paddle.y, paddle.vy = 300, 0.0
+    ball = Ball(rng=random.Random(0))
+    ball.spd_max, ball.spd_step = 3000.0, 0.0
+    ball.x, ball.y = paddle.x - settings.BALL_RADIUS - 40.0, paddle.y + paddle.height * 0.5
+    ball.vx, ball.vy = 3000.0, 0.0
+    ball.update(1.0 / 30.0, (paddle,))
+    assert ball.vx < 0
+    assert ball.x <= paddle.x - settings.BALL_RADIUS + 1e-6
+
+
+@pytest.mark.parametrize("hz,speed", [(30.0, 3000.0), (60.0, 1500.0), (120.0, 3000.0)])
+def test_stress_has_no_tunnelling(hz, speed):
+    m = collision_stress.run(hz, speed, cases=300, seed=1)
+    assert m["contacts"] > 100
+    assert m["tunnel_pct"] == 0.0
+    assert m["phantom_pct"] <= 1.0  # la verdad muestreada puede no ver un roce
+    assert m["legacy_tunnel_pct"] > 5.0  # el chequeo anterior si atravesaba
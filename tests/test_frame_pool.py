@@ -0,0 +1,79 @@
+# test_frame_pool.py - El camino con pool no asigna bloques por frame; el medidor ve hasta los chicos
+
+import numpy as np
+import pytest
+
+from frame_pool import AllocationMeter, FramePool
+
+cv2 = pytest.importorskip("cv2")
+
+
+@pytest.fixture
+def meter():
+    m = AllocationMeter(threshold=0, warmup=3)
+    yield m
+    m.stop()
+
+
+def _run(meter, frame_fn, frames=20):
+    for i in range(frames):
+        meter.begin()
+        frame_fn(i)
+        meter.end()
+    return meter.summary()
+
+
+def test_pool_reuses_buffer():
+    pool = FramePool()
+    a = pool.get("display", (48, 64, 3))
+    assert pool.get("display", (48, 64, 3)) is a
+    assert pool.allocations == 1
+    pool.get("display", (24, 32, 3))
+    assert pool.allocations == 2
+
+
+def test_pooled_path_allocates_nothing(meter):
+    from main import to_display
+
+    pool = FramePool()
+    raw = np.full((120, 160, 3), 90, np.uint8)
+    out = {}
+
+    def frame_fn(i):
+        dst = pool.get("display", (96, 128, 3))
+        out["frame"] = to_display(raw, 128, 96, dst)
+        small = pool.get("small", (48, 64, 3))
+        cv2.resize(out["frame"], (64, 48), dst=small, interpolation=cv2.INTER_AREA)
+        rgb = pool.get("rgb", small.shape)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+
+    s = _run(meter, frame_fn)
+    assert s["frames"] == 17
+    assert s["frames_with_alloc"] == 0
+    assert s["blocks"] == 0
+    assert pool.allocations == 3
+
+
+def test_meter_counts_small_replaced_buffers(meter):
+    # un arreglo de 21x3 (~0.5 KB) que reemplaza al del frame anterior: antes no se veia
+    out = {}
+
+    def frame_fn(i):
+        out["landmarks"] = np.zeros((21, 3), np.float64) + i
+
+    s = _run(meter, frame_fn)
+    assert s["frames_with_alloc"] == s["frames"] == 17
+    assert s["max_blocks"] >= 1
+    assert s["max_kb"] < 64
+    assert any("test_frame_pool.py" in site for site, _ in s["sites"])
+
+
+def test_meter_counts_opencv_outputs_without_dst(meter):
+    raw = np.full((96, 128, 3), 90, np.uint8)
+    out = {}
+
+    def frame_fn(i):
+        out["frame"] = cv2.flip(raw, 1)  # sin dst=: OpenCV crea un arreglo nuevo
+
+    s = _run(meter, frame_fn)
+    assert s["frames_with_alloc"] == s["frames"]
@@ -0,0 +1,91 @@
+# test_frame_source.py - Fuentes de frames con la interfaz de cv2.VideoCapture: sintetica, video y seleccion
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+import settings
+
+cv2 = pytest.importorskip("cv2")
+
+from frame_source import (SharedMemorySource, SyntheticSource, VideoFileSource, camera_backend,  # noqa: E402
+                          open_source)
+
+
+def test_synthetic_source_writes_into_the_given_buffer():
+    src = SyntheticSource(w=64, h=48, seed=1, realtime=False)
+    assert src.isOpened()
+    assert (src.get(cv2.CAP_PROP_FRAME_WIDTH), src.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (64.0, 48.0)
+    ok, buf = src.read()
+    assert ok and buf.shape == (48, 64, 3) and buf.dtype == np.uint8
+    first = buf.copy()
+    ok, again = src.read(buf)
+    assert ok and again is buf  # mismo buffer: sin asignar por frame
+    ok, other = src.read(np.empty((10, 10, 3), np.uint8))
+    assert other.shape == (48, 64, 3)  # buffer de otra forma: se crea uno nuevo
+    # misma semilla, misma escena; la mancha se mueve entre frames
+    ok, twin = SyntheticSource(w=64, h=48, seed=1, realtime=False).read()
+    assert np.array_equal(twin, first)
+    moving = SyntheticSource(w=320, h=240, seed=1, realtime=False)
+    seq = [moving.read()[1].copy() for _ in range(20)]
+    assert not np.array_equal(seq[0], seq[19])
+
+
+def test_synthetic_source_keeps_the_requested_rate():
+    src = SyntheticSource(w=32, h=24, fps=100, realtime=True)
+    buf = None
+    t0 = time.perf_counter()
+    for _ in range(11):
+        ok, buf = src.read(buf)
+    assert time.perf_counter() - t0 >= 0.09  # 10 periodos de 10 ms
+
+
+def _write_video(path, n=5, w=64, h=48):
+    out = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (w, h))
+    if not out.isOpened():
+        pytest.skip("OpenCV sin codificador MJPG")
+    for i in range(n):
+        out.write(np.full((h, w, 3), 40 * i, np.uint8))
+    out.release()
+
+
+def test_video_file_source_loops_at_the_end(tmp_path):
+    path = tmp_path / "clip.avi"
+    _write_video(path)
+    src = VideoFileSource(str(path), loop=True, realtime=False)
+    assert src.isOpened() and src.get(cv2.CAP_PROP_FRAME_WIDTH) == 64.0
+    levels = []
+    buf = None
+    for _ in range(7):
+        ok, buf = src.read(buf)
+        assert ok and buf.shape == (48, 64, 3)
+        levels.append(int(buf.mean()))
+    src.release()
+    assert levels[5] == pytest.approx(levels[0], abs=3)  # vuelve al primer frame
+    once = VideoFileSource(str(path), loop=False, realtime=False)
+    assert sum(once.read()[0] for _ in range(7)) == 5
+    once.release()
+
+
+def test_open_source_follows_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "FRAME_SOURCE", "synthetic")
+    assert isinstance(open_source(), SyntheticSource)
+    path = tmp_path / "clip.avi"
+    _write_video(path)
+    monkeypatch.setattr(settings, "FRAME_SOURCE_PATH", str(path))
+    src = open_source("video")
+    assert isinstance(src, VideoFileSource) and src.isOpened()
+    src.release()
+    monkeypatch.setattr(settings, "FRAME_SOURCE_SHM", f"handpong-test-{os.getpid()}-none")
+    shm = open_source("shm")
+    assert isinstance(shm, SharedMemorySource) and not shm.isOpened()
+    assert shm.read() == (False, None)
+
+
+def test_camera_backend_names():
+    assert camera_backend("dshow") == cv2.CAP_DSHOW
+    assert camera_backend("V4L2") == cv2.CAP_V4L2
+    assert camera_backend("no-existe") == cv2.CAP_ANY
+    assert camera_backend("auto") in (cv2.CAP_DSHOW, cv2.CAP_V4L2, cv2.CAP_ANY)
@@ -0,0 +1,82 @@
+# test_gestures.py - Clasificacion de gestos y confirmacion sostenida de GestureRecognizer
+
+import numpy as np
+import pytest
+
+from gestures import GestureRecognizer, classify
+
+
+def _hand(ext, pinch=False, rot=0.0):
+    """Mano sintetica (21, 3): ext = dedos extendidos (indice..menique), rot en radianes."""
+    p = np.zeros((21, 3), np.float32)
+    wrist = np.array([0.5, 0.8])
+    p[0, :2] = wrist
+    for j, i in enumerate((1, 2, 3, 4)):
+        p[i, :2] = wrist + (-0.03 - 0.02 * j, -0.03 - 0.02 * j)
+    for f, (mcp, e) in enumerate(zip((5, 9, 13, 17), ext)):
+        m = wrist + (-0.03 + 0.03 * f, -0.1)
+        p[mcp, :2] = m
+        if e:
+            pts = [m + (0.0, -0.045 * k) for k in (1, 2, 3)]
+        else:
+            pts = [m + (0.0, -0.03), m + (0.01, 0.0), m + (0.0, 0.03)]
+        p[mcp + 1:mcp + 4, :2] = pts
+    if pinch:
+        p[4, :2] = p[8, :2] + 0.005
+    c, s = np.cos(rot), np.sin(rot)
+    p[:, :2] = (p[:, :2] - wrist) @ np.array([[c, -s], [s, c]]).T + wrist
+    return p
+
+
+CASES = {
+    "palma": _hand([1, 1, 1, 1]),
+    "puno": _hand([0, 0, 0, 0]),
+    "1": _hand([1, 0, 0, 0]),
+    "2": _hand([1, 1, 0, 0]),
+    "3": _hand([1, 1, 1, 0]),
+    "pinza": _hand([0, 1, 1, 1], pinch=True),
+}
+
+
+def test_classify_each_gesture_in_one_batch():
+    labels = classify(np.stack(list(CASES.values())))
+    assert labels == list(CASES)
+
+
+@pytest.mark.parametrize("rot", [-0.8, 0.6, 1.2])
+def test_classify_ignores_hand_rotation(rot):
+    assert classify(np.stack([_hand([1, 1, 1, 1], rot=rot), _hand([1, 1, 0, 0], rot=rot)])) == ["palma", "2"]
+
+
+def test_classify_unknown_and_missing_hands():
+    missing = np.full((21, 3), np.nan, np.float32)
+    assert classify(np.stack([_hand([0, 1, 0, 1]), missing])) == [None, None]
+
+
+def test_recognizer_holds_fires_once_and_respects_cooldown():
+    g = GestureRecognizer(hold_s=0.5, cooldown_s=1.0)
+    events = []
+    for i in range(60):
+        t = i / 15.0
+        hand = CASES["palma"] if i < 30 else CASES["2"]
+        e = g.update([hand], t)
+        if e is not None:
+            events.append((round(t, 2), e))
+    # palma confirmada tras 0.5 s y una sola vez; "2" tambien tras sostenerse
+    assert events == [(0.53, "palma"), (2.53, "2")]
+    assert g.stats()["events"] == {"palma": 1, "2": 1}
+
+
+def test_recognizer_needs_release_and_cooldown_to_repeat():
+    g = GestureRecognizer(hold_s=0.2, cooldown_s=1.0)
+    fired = [t for t in np.arange(0.0, 3.0, 0.05)
+             if g.update([CASES["puno"] if 1.0 <= t < 1.1 else CASES["palma"]], t) == "palma"]
+    # la primera al sostener; la segunda solo despues de soltar (puno) y volver a sostener
+    assert len(fired) == 2
+    assert fired[1] - fired[0] >= 1.0
+
+
+def test_recognizer_first_recognized_hand_wins():
+    g = GestureRecognizer(hold_s=0.0, cooldown_s=0.0)
+    g.update([None, _hand([0, 1, 0, 1]), CASES["3"]], 0.0)
+    assert g.label == "3"
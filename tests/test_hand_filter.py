@@ -0,0 +1,44 @@
+# test_hand_filter.py - Kalman de la mano: la prediccion baja el error que ve el jugador
+
+import pytest
+
+from filter_harness import measure, replay, synthetic_trace
+from hand_filter import HandKalman
+
+
+@pytest.fixture(scope="module")
+def trace():
+    return synthetic_trace()
+
+
+def _run(filt, trace, latency):
+    ts, ys, truth = trace
+    out_t, out_y = replay(filt, ts, ys, latency, 60.0)
+    return measure(out_t, out_y, ts, truth)
+
+
+@pytest.mark.parametrize("latency", [0.03, 0.06])
+def test_default_prediction_beats_no_prediction_in_real_time(trace, latency):
+    off = _run(HandKalman(max_horizon=0.0), trace, latency)
+    on = _run(HandKalman(), trace, latency)
+    assert on["rmse_rt_px"] < 0.8 * off["rmse_rt_px"]
+    assert on["lag_ms"] < off["lag_ms"]
+
+
+def test_horizon_is_capped_at_measured_latency(trace):
+    filt = HandKalman(max_horizon=1.0)
+    ts, ys, _ = trace
+    replay(filt, ts, ys, 0.06, 60.0)
+    # la edad al primer uso es la latencia mas a lo sumo un frame de dibujo
+    assert 0.06 <= filt.latency <= 0.06 + 1.0 / 60.0
+    v = filt.v
+    t_last = filt.t
+    assert filt.predict(t_last + 0.5) == pytest.approx(filt.x + v * filt.latency)
+
+
+def test_update_tracks_a_constant_velocity(trace):
+    filt = HandKalman(max_horizon=0.0)
+    for i in range(60):
+        filt.update(100.0 + 300.0 * i / 30.0, i / 30.0)
+    assert filt.v == pytest.approx(300.0, rel=0.02)
+    assert filt.predict(filt.t) == pytest.approx(100.0 + 300.0 * 59 / 30.0, abs=1.0)
@@ -0,0 +1,44 @@
+# test_opponent_model.py - OpponentModelAdvanced sobre la trayectoria y el mapa de zonas compartidos
+
+import types
+
+import numpy as np
+import pytest
+
+import settings
+from opponent_model import OpponentModelAdvanced
+from trajectory import Trajectory
+
+
+def _ball(x, y, vx, vy):
+    return types.SimpleNamespace(x=x, y=y, vx=vx, vy=vy)
+
+
+PADDLE = types.SimpleNamespace(x=20.0, width=settings.PADDLE_WIDTH)
+
+
+def test_predict_y_uses_the_shared_closed_form_trajectory():
+    model = OpponentModelAdvanced()
+    ball = _ball(900.0, 200.0, -700.0, 1300.0)
+    ref = Trajectory()
+    ref.sync(ball)
+    assert model.predict_y(ball, PADDLE, weak_mix=False) == pytest.approx(ref.y_at_x(PADDLE.x + PADDLE.width))
+    assert model.predict_y(_ball(900.0, 200.0, 700.0, 0.0), PADDLE) == 200.0  # se aleja
+
+
+def test_weak_zone_biases_prediction_and_state_round_trips():
+    model = OpponentModelAdvanced(bins_y=6)
+    for _ in range(3):
+        model.update_on_point_end(True, settings.SCREEN_HEIGHT - 5.0)
+    model.update_on_point_end(False, 10.0)  # la IA devolvio: no cuenta
+    assert model.fail_heatmap.tolist() == [0, 0, 0, 0, 0, 3]
+
+    ball = _ball(900.0, 360.0, -700.0, 0.0)
+    raw = model.predict_y(ball, PADDLE, weak_mix=False)
+    weak_y = 5.5 * settings.SCREEN_HEIGHT / 6.0
+    assert model.predict_y(ball, PADDLE) == pytest.approx(0.75 * raw + 0.25 * weak_y)
+
+    other = OpponentModelAdvanced(bins_y=6)
+    other.set_state(model.get_state())
+    np.testing.assert_array_equal(other.fail_heatmap, model.fail_heatmap)
+    assert other.weak.weak_y() == model.weak.weak_y()
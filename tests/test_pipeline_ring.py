@@ -0,0 +1,141 @@
+# test_pipeline_ring.py - Anillo en memoria compartida (seqlock), publicador/fuente "shm" y RingFrameSource
+
+import os
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from frame_source import SharedFramePublisher, SharedMemorySource, ShmRing, frame_fields
+from pipeline import RingFrameSource
+
+FIELDS = [("t", (), np.float64), ("data", (64, 64), np.int64)]
+
+
+@pytest.fixture
+def ring(request):
+    r = ShmRing(f"handpong-test-{os.getpid()}-{request.node.name[:20]}", FIELDS, slots=3, create=True)
+    yield r
+    r.close()
+
+
+def test_read_latest_returns_newest_and_only_once(ring):
+    assert ring.read_latest(0) == (0, None)
+    for i in range(1, 6):  # mas escrituras que ranuras: gana la ultima
+        ring.write(t=float(i), data=i)
+    n, rec = ring.read_latest(0)
+    assert n == 5 and float(rec["t"]) == 5.0 and (rec["data"] == 5).all()
+    assert ring.read_latest(n, rec) == (n, None)
+    ring.write(t=6.0, data=6)
+    n2, rec2 = ring.read_latest(n, rec)
+    assert n2 == 6 and rec2 is rec and (rec["data"] == 6).all()  # out se reutiliza
+
+
+def test_reader_skips_slot_being_written(ring):
+    ring.write(t=1.0, data=1)
+    rec = ring.slot_for_write()  # escritor a mitad (seq impar), head aun no avanzo
+    rec["data"][...] = 2
+    assert ring.read_latest(0)[0] == 1
+    ring.commit(rec)
+    n, out = ring.read_latest(1)
+    assert n == 2 and (out["data"] == 2).all()
+
+
+def test_attach_sees_the_same_records(ring):
+    other = ShmRing.attach(ring.spec())
+    try:
+        ring.write(t=3.5, data=7)
+        n, rec = other.read_latest(0)
+        assert n == 1 and float(rec["t"]) == 3.5 and (rec["data"] == 7).all()
+    finally:
+        other.close()
+
+
+def test_concurrent_writer_never_yields_torn_records(ring):
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            ring.write(t=float(i), data=i)
+            time.sleep(0)  # cede el GIL al lector
+
+    th = threading.Thread(target=writer)
+    th.start()
+    try:
+        last, out, seen = 0, None, 0
+        while seen < 200:
+            n, rec = ring.read_latest(last, out)
+            if rec is None:
+                continue
+            out, last = rec, n
+            seen += 1
+            # todo el registro es de la misma escritura
+            assert (rec["data"] == int(rec["t"])).all()
+    finally:
+        stop.set()
+        th.join()
+
+
+class _Child:
+    def __init__(self, dead=False):
+        self.dead = dead
+        self.polls = 0
+
+    def poll(self):
+        self.polls += 1
+        return not self.dead
+
+
+def _capture(ring, dead=False):
+    return types.SimpleNamespace(ring=ring, child=_Child(dead))
+
+
+@pytest.fixture
+def frames(request):
+    r = ShmRing(f"handpong-test-{os.getpid()}-{request.node.name[:20]}", frame_fields(8, 6), slots=2, create=True)
+    yield r
+    r.close()
+
+
+def test_ring_frame_source_reads_frames_and_times_out(frames):
+    cap = _capture(frames)
+    src = RingFrameSource(cap, timeout=0.2, poll_s=0.05)
+    frames.write(t=1.25, hw=(6, 8), img=9)
+    ok, img = src.read()
+    assert ok and img.shape == (6, 8, 3) and (img == 9).all() and src.t_frame == 1.25
+    # sin frames nuevos: falla al vencer el plazo (el juego sigue sin camara) y sondeo el hijo
+    ok, img = src.read()
+    assert (ok, img) == (False, None)
+    assert cap.child.polls >= 2
+
+
+def test_ring_frame_source_gives_up_on_dead_child(frames):
+    src = RingFrameSource(_capture(frames, dead=True), timeout=5.0)
+    assert not src.isOpened()
+    assert src.read() == (False, None)
+
+
+def test_shm_source_opens_a_frame_ring_by_name():
+    # la fuente "shm" y la captura en proceso aparte hablan el mismo anillo
+    name = f"handpong-test-{os.getpid()}-pub"
+    pub = SharedFramePublisher(name, 8, 6, slots=2)
+    src = SharedMemorySource(name, timeout=0.2)
+    try:
+        assert src.isOpened() and src.ring.slots == 2
+        assert (src.get(3), src.get(4)) == (8.0, 6.0)  # CAP_PROP_FRAME_WIDTH / HEIGHT
+        pub.publish(np.full((6, 8, 3), 5, np.uint8), t=2.5)
+        ok, img = src.read()
+        assert ok and img.shape == (6, 8, 3) and (img == 5).all() and src.t_frame == 2.5
+        # frame mas grande que el anillo: se reduce al escribir y el lector ve el tamano real
+        pub.publish(np.full((12, 16, 3), 7, np.uint8), t=3.0)
+        ok, img = src.read(img)
+        assert ok and img.shape == (6, 8, 3) and (img == 7).all()
+        assert src.read() == (False, None)  # nada nuevo hasta el plazo
+    finally:
+        src.release()
+        pub.close()
+    assert not SharedMemorySource(name).isOpened()
@@ -0,0 +1,94 @@
+# test_session_record.py - Grabar una sesion y repetirla reproduce el mismo partido
+
+import numpy as np
+import pytest
+
+import settings
+from session_record import SessionRecorder, SessionReplay, _array_to_landmarks
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+
+def _hand(y):
+    arr = np.zeros((21, 3), np.float32)
+    arr[:, 1] = y
+    return arr
+
+
+def test_recorder_round_trip_keeps_both_hands(tmp_path):
+    path = str(tmp_path / "s")
+    rec = SessionRecorder(path, mode="landmarks", meta={"seed": 3})
+    right, left = _array_to_landmarks(_hand(0.3)), _array_to_landmarks(_hand(0.7))
+    hands = [(0.8, 0.3, right), (0.2, 0.7, left)]
+    rec.add_loop(1.0, 255, 100, (0.3, right, True), hands, (0.7, left, True), 0.98)
+    rec.add_loop(2.0, 32, 120, (None, None, False))
+    assert rec.close() == 2
+
+    rep = SessionReplay(path, realtime=False)
+    assert rep.meta == {"seed": 3} and not rep.has_frames
+    assert rep.next()
+    (y_r, lm_r, ok_r), (y_l, lm_l, ok_l), t_meas = rep.hands()
+    assert (ok_r, ok_l, t_meas, rep.key(), rep.mouse()) == (True, True, 0.98, 255, 100)
+    assert y_r == pytest.approx(0.3) and y_l == pytest.approx(0.7)
+    assert lm_l.landmark[0].y == pytest.approx(0.7)
+    assert rep.next()
+    assert rep.hands() == ((None, None, False), (None, None, False), None)
+    assert rep.key() == 32 and rep.now() == 2.0
+    assert not rep.next()
+
+
+def _play(monkeypatch, tmp_path, **values):
+    """GameApp sin camara con teclas/mouse guionados y un reloj que avanza en cada lectura."""
+    for k, v in dict(AI_STORE_PATH="", TOURNAMENT_DB="", GESTURES=False, KIOSK_IDLE_S=0,
+                     PHYSICS_SEED=7, **values).items():
+        monkeypatch.setattr(settings, k, v)
+    for name in ("namedWindow", "resizeWindow", "setWindowProperty", "setMouseCallback",
+                 "destroyAllWindows", "imshow"):
+        monkeypatch.setattr(cv2, name, lambda *a, **k: None)
+    import main
+    app = main.GameApp(headless=True)
+    live = app.replay is None
+    clock = [0.0]
+    if live:
+        def fake_clock():
+            # cada lectura avanza: si la logica leyera el reloj mas de una vez por vuelta,
+            # la repeticion (un instante por vuelta) se desviaria
+            clock[0] += 0.004
+            return clock[0]
+        app._clock = fake_clock
+
+        def fake_hands(frame):
+            # mano sintetica la mitad del tiempo; el resto juega el respaldo de mouse
+            if loops[0] % 60 >= 30:
+                return []
+            y = 0.5 + 0.3 * np.cos(loops[0] / 11.0)
+            return [(0.8, y, _array_to_landmarks(_hand(y)))]
+        app.detector.process_hands = fake_hands
+    loops = [0]
+    keys = {3: ord(" "), 40: ord(" "), 300: ord("p"), 320: ord("p")}
+
+    def wait_key(ms=1):
+        loops[0] += 1
+        if live:
+            app.y_from_mouse = 360 + 250 * np.sin(loops[0] / 17.0)
+        return 27 if loops[0] >= 600 else keys.get(loops[0], 255)
+
+    monkeypatch.setattr(cv2, "waitKey", wait_key)
+    changes = []
+    on_change = app.fsm.on_change
+    app.fsm.on_change = lambda a, b: (changes.append((a, b, loops[0])), on_change(a, b))
+    app.run()
+    sim = app.sim
+    return changes, (sim.tick, sim.score_p, sim.score_ai, float(app.ball.x), float(app.ball.y),
+                     float(sim.player.y), float(sim.ai.y), app.ai_brain.skill)
+
+
+def test_record_then_replay_reproduces_the_match(monkeypatch, tmp_path):
+    path = str(tmp_path / "sesion")
+    live = _play(monkeypatch, tmp_path, RECORD_SESSION=path, RECORD_MODE="landmarks")
+    with np.load(path + ".npz") as idx:
+        assert (idx["hands_side"] == 0).any() and np.isnan(idx["hand_y"]).any()  # mano y respaldo
+    replay = _play(monkeypatch, tmp_path, RECORD_SESSION="", REPLAY_SESSION=path, REPLAY_REALTIME=False)
+    assert ("SERVE", "PLAYING") in [c[:2] for c in live[0]]
+    assert replay == live
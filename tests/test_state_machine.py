@@ -0,0 +1,99 @@
+# test_state_machine.py - Transiciones de StateMachine y de los estados de GameApp
+
+import pytest
+
+import settings
+from state_machine import StateMachine
+
+
+def _machine(log):
+    fsm = StateMachine(on_change=lambda old, new: log.append(("cambio", old, new)))
+    for name in ("A", "B"):
+        fsm.add(name, enter=lambda n=name: log.append(("enter", n)),
+                exit=lambda n=name: log.append(("exit", n)),
+                update=lambda *args, n=name: log.append(("update", n) + args))
+    return fsm
+
+
+def test_go_runs_exit_enter_and_on_change_in_order():
+    log = []
+    fsm = _machine(log)
+    fsm.go("A")
+    fsm.go("B")
+    fsm.go("B")  # re-entrar tambien corre exit/enter
+    assert log == [("enter", "A"), ("cambio", None, "A"),
+                   ("exit", "A"), ("enter", "B"), ("cambio", "A", "B"),
+                   ("exit", "B"), ("enter", "B"), ("cambio", "B", "B")]
+    assert fsm.transitions == 3
+    assert fsm.name == "B"
+
+
+def test_update_and_keys_go_to_the_current_state_only():
+    log = []
+    fsm = _machine(log)
+    fsm.states["A"].keys[ord(" ")] = lambda: fsm.go("B")
+    fsm.go("A")
+    fsm.update(1, 2)
+    assert log[-1] == ("update", "A", 1, 2)
+    assert not fsm.key(ord("x"))
+    assert fsm.key(ord(" "))
+    assert fsm.name == "B"
+    assert not fsm.key(ord(" "))  # B no tiene ESPACIO
+
+
+def test_idle_follows_current_state():
+    fsm = StateMachine()
+    fsm.add("MENU", idle=True)
+    fsm.add("PLAYING")
+    assert not fsm.idle  # sin estado
+    fsm.go("MENU")
+    assert fsm.idle
+    fsm.go("PLAYING")
+    assert not fsm.idle
+
+
+@pytest.fixture
+def app(monkeypatch):
+    pytest.importorskip("cv2")
+    pytest.importorskip("mediapipe")
+    monkeypatch.setattr(settings, "AI_STORE_PATH", "")
+    monkeypatch.setattr(settings, "TOURNAMENT_DB", "")
+    import main
+    return main.GameApp(headless=True)
+
+
+def test_game_app_space_and_r_transitions(app):
+    space = ord(" ")
+    assert app.state == "MENU"
+    for expected in ("SERVE", "PLAYING", "PAUSED", "PLAYING"):
+        app._handle_keys(space)
+        assert app.state == expected
+    app._handle_keys(ord("r"))
+    assert app.state == "SERVE"
+    app.fsm.go("GAME_OVER")
+    app._handle_keys(space)
+    assert app.state == "SERVE"
+
+
+def test_game_app_defers_start_while_loading(app):
+    app.loader = object()  # arranque en segundo plano todavia corriendo
+    for key in (ord(" "), ord("r")):
+        app._handle_keys(key)
+        assert app.state == "MENU"
+        assert app._start_pending
+
+
+def test_benchmark_drives_playing_through_the_state_machine(tmp_path):
+    # benchmark.py fuerza PLAYING en un GameApp sin ventana: debe usar fsm.go (state es solo lectura)
+    pytest.importorskip("cv2")
+    pytest.importorskip("mediapipe")
+    import json
+    import os
+    import subprocess
+    import sys
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, os.path.join(root, "benchmark.py"), "--iters", "3",
+                          "--only", "end_to_end", "--json", "-"],
+                         cwd=tmp_path, capture_output=True, text=True, timeout=300)
+    assert out.returncode == 0, out.stderr[-2000:]
+    assert "end_to_end" in json.loads(out.stdout[out.stdout.index("{"):])["stages"]
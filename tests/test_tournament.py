@@ -0,0 +1,71 @@
+# test_tournament.py - Cola de jugadores, puntaje y ranking SQLite de ida y vuelta
+
+import types
+
+from tournament import ANONYMOUS, Leaderboard, PlayerQueue, clean_name, match_rows, match_score
+
+
+def _sim(score_p, score_ai, rallies, two_players=False, skill=0.5, max_speed=900.0):
+    return types.SimpleNamespace(score_p=score_p, score_ai=score_ai, rallies=list(rallies),
+                                 two_players=two_players, max_speed=max_speed,
+                                 ai_brain=types.SimpleNamespace(skill=skill))
+
+
+def test_clean_name_strips_accents_and_spaces():
+    assert clean_name("  Jos\u00e9   N\u00fa\u00f1ez ") == "Jose Nunez"
+    assert clean_name("x" * 40) == "x" * 20
+    assert clean_name("\u263a") == ""
+
+
+def test_match_score():
+    assert match_score(3, 7) == 370
+    assert match_score(3, 7, ai_skill=0.5) == 395
+
+
+def test_match_rows_one_and_two_players():
+    one = match_rows(("Ana", ANONYMOUS), _sim(5, 2, [3, 9, 1]), 2, 61.0, "s1", t_end=10.0)
+    assert len(one) == 1
+    row = one[0]
+    assert (row["player"], row["side"], row["won"], row["max_rally"], row["points"]) == ("Ana", "der", 1, 9, 3)
+    assert row["score"] == match_score(5, 9, 0.5)
+
+    two = match_rows(("Ana", "Beto"), _sim(1, 5, [], two_players=True), 1, 30.0, "s1", t_end=10.0)
+    assert [(r["player"], r["side"], r["goals_for"], r["won"]) for r in two] == [("Ana", "der", 1, 0),
+                                                                                ("Beto", "izq", 5, 1)]
+    assert two[0]["ai_skill"] is None and two[0]["max_rally"] == 0
+
+
+def test_player_queue_fifo_without_duplicates():
+    q = PlayerQueue()
+    assert q.add("Ana") and q.add("Beto")
+    assert not q.add(" Ana ")  # repetido tras limpiar
+    assert not q.add("   ")
+    v = q.version
+    assert q.remove("Beto") and not q.remove("Beto")
+    assert q.version == v + 1
+    q.add("Carla")
+    assert q.peek() == ("Ana", "Carla")
+    assert (q.pop(), q.pop(), q.pop()) == ("Ana", "Carla", ANONYMOUS)
+    assert len(q) == 0
+
+
+def test_leaderboard_round_trip(tmp_path):
+    path = str(tmp_path / "torneo.sqlite")
+    board = Leaderboard(path, season="s1", size=3)
+    assert board.wait_ready()
+    board.record(match_rows(("Ana", ANONYMOUS), _sim(5, 2, [4]), 1, 60.0, "s1", t_end=1.0))
+    board.record(match_rows(("Ana", ANONYMOUS), _sim(1, 5, [2]), 1, 60.0, "s1", t_end=2.0))
+    board.record(match_rows(("Beto", ANONYMOUS), _sim(3, 5, [12]), 1, 60.0, "s1", t_end=3.0))
+    board.record(match_rows((ANONYMOUS, ANONYMOUS), _sim(5, 0, [30]), 1, 60.0, "s1", t_end=4.0))
+    board.record(match_rows(("Otro", ANONYMOUS), _sim(5, 0, [1]), 1, 60.0, "s2", t_end=5.0))
+    board.close()
+    assert board.stats()["errors"] == 0 and board.written == 5
+
+    ana, beto = match_score(5, 4, 0.5), match_score(3, 12, 0.5)
+    assert board.top == [("Ana", ana, 1, 2), ("Beto", beto, 0, 1)]
+
+    # al reabrir la misma base el ranking sigue ahi (y sin el partido anonimo ni la otra temporada)
+    again = Leaderboard(path, season="s1", size=3)
+    assert again.wait_ready()
+    again.close()
+    assert again.top == board.top
@@ -0,0 +1,121 @@
+# test_trajectory.py - Trayectoria en forma cerrada contra una simulacion paso a paso
+
+import math
+
+import numpy as np
+import pytest
+
+from trajectory import BatchTrajectory, Trajectory, fold_y, fold_y_array
+
+
+class Ball:
+    def __init__(self, x, y, vx, vy):
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+
+
+def _step_until_x(x, y, vx, vy, x_target, low, high, dt=1e-4):
+    """Referencia lenta: integra con rebotes en techo y suelo hasta cruzar x_target."""
+    while (x_target - x) * vx > 0:
+        x += vx * dt
+        y += vy * dt
+        if y < low:
+            y, vy = 2 * low - y, -vy
+        elif y > high:
+            y, vy = 2 * high - y, -vy
+    return y, vy
+
+
+def test_fold_y_stays_in_range_and_matches_array():
+    ys = np.linspace(-2000.0, 3000.0, 101)
+    folded = np.array([fold_y(y, 10.0, 710.0) for y in ys])
+    assert folded.min() >= 10.0 and folded.max() <= 710.0
+    np.testing.assert_allclose(fold_y_array(ys.copy(), 10.0, 710.0), folded)
+
+
+@pytest.mark.parametrize("vy", [0.0, 350.0, -900.0, 2500.0])
+def test_y_and_angle_at_x_match_stepping(vy):
+    traj = Trajectory(h=720, r=10)
+    ball = Ball(1000.0, 300.0, -600.0, vy)
+    traj.sync(ball)
+    y_ref, vy_ref = _step_until_x(ball.x, ball.y, ball.vx, vy, 50.0, traj.low, traj.high)
+    assert traj.y_at_x(50.0) == pytest.approx(y_ref, abs=0.5)
+    assert traj.angle_at_x(50.0) == pytest.approx(math.degrees(math.atan2(vy_ref, 600.0)), abs=1e-6)
+
+
+def test_time_to_x_and_sync_only_rebuilds_on_events():
+    traj = Trajectory(h=720, r=10)
+    ball = Ball(1000.0, 300.0, -500.0, 200.0)
+    traj.sync(ball)
+    assert traj.time_to_x(500.0, 1000.0) == pytest.approx(1.0)
+    assert traj.time_to_x(1500.0, 1000.0) is None  # se aleja
+    ball.x, ball.y = 900.0, 340.0                   # mismo tramo: no se rehace
+    traj.sync(ball)
+    assert traj.builds == 1
+    ball.vy = -200.0                                # rebote: tramo nuevo
+    traj.sync(ball)
+    assert traj.builds == 2
+
+
+def test_batch_matches_scalar():
+    rng = np.random.default_rng(3)
+    n = 64
+    bx = rng.uniform(200.0, 1200.0, n)
+    by = rng.uniform(20.0, 700.0, n)
+    bvx = -rng.uniform(200.0, 900.0, n)
+    bvy = rng.uniform(-1500.0, 1500.0, n)
+    batch = BatchTrajectory(n, 50.0, h=720, r=10, angles=True).sync(bx, by, bvx, bvy)
+    for i in range(n):
+        traj = Trajectory(h=720, r=10)
+        traj.sync(Ball(bx[i], by[i], bvx[i], bvy[i]))
+        assert batch.y_plane[i] == int(traj.y_at_x(50.0))
+        assert batch.angle_plane[i] == pytest.approx(traj.angle_at_x(50.0))
+
+
+@pytest.mark.parametrize("vy", [0.0, 700.0, -2500.0, 6000.0])
+def test_wall_bounces_counts_stepped_bounces(vy):
+    traj = Trajectory(h=720, r=10)
+    traj.build(1000.0, 300.0, -600.0, vy)
+    x, y, v, n = 1000.0, 300.0, vy, 0
+    dt = 1e-4
+    while x > 50.0:
+        x -= 600.0 * dt
+        y += v * dt
+        if y < traj.low or y > traj.high:
+            y, v, n = (2 * traj.low - y if y < traj.low else 2 * traj.high - y), -v, n + 1
+    assert traj.wall_bounces(50.0) == n
+
+
+def test_return_time_includes_the_spd_step_speed_up():
+    traj = Trajectory(h=720, r=10)
+    traj.build(1000.0, 360.0, -600.0, 0.0)
+    # 950 px hasta la paleta rival a 600 px/s, vuelta de 1200 px a min(600 + 150, 700) px/s
+    assert traj.return_time(50.0, 1250.0, 1000.0, 150.0, 700.0) == pytest.approx(950 / 600 + 1200 / 700)
+    # con angulo de salida la componente X es menor: tarda mas
+    angled = traj.return_time(50.0, 1250.0, 1000.0, 50.0, 1000.0, angle=math.radians(40))
+    assert angled == pytest.approx(950 / 600 + 1200 / (650 * math.cos(math.radians(40))))
+    assert traj.return_time(1200.0, 50.0, 1000.0, 50.0, 1000.0) is None  # no va hacia alli
+
+
+def test_return_time_matches_the_game_paddle_bounce():
+    game_objects = pytest.importorskip("game_objects")
+    import settings
+    ball = game_objects.Ball()
+    ball.x, ball.y, ball.vx, ball.vy = 400.0, 300.0, -500.0, 120.0
+    traj = Trajectory()
+    traj.sync(ball)
+    x_hit = 100.0
+    t_hit = traj.time_to_x(x_hit, ball.x)
+    y_hit = traj.y_at_x(x_hit)
+
+    class Paddle:  # cara de la paleta izquierda en x_hit, centrada 20 px por encima del impacto
+        x, width, vy = x_hit - settings.PADDLE_WIDTH, settings.PADDLE_WIDTH, 0.0
+
+        @staticmethod
+        def center_y():
+            return y_hit - 20.0
+    ball.x, ball.y = x_hit, y_hit
+    ball._paddle_contact(Paddle, 1.0, 0.0, 0.0)
+    angle = math.atan2(ball.vy, ball.vx)
+    expected = t_hit + (settings.SCREEN_WIDTH * 0.5 - x_hit) / ball.vx
+    assert traj.return_time(x_hit, settings.SCREEN_WIDTH * 0.5, 400.0, ball.spd_step, ball.spd_max,
+                            angle) == pytest.approx(expected)
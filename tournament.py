@@ -0,0 +1,272 @@
+# tournament.py - Cola de jugadores, estadisticas por partido y ranking en SQLite (ASCII)
+#
+# Para la feria: quien quiere jugar se anota en la cola (escribiendo su nombre en la
+# consola donde corre el juego), el juego toma al siguiente al empezar cada partido y al
+# terminar guarda sus estadisticas (rallies, velocidad maxima, habilidad de la IA).
+# Leaderboard escribe en SQLite desde un hilo propio: el bucle solo encola. El ranking
+# vive en la tabla players (mejor puntaje por jugador y temporada, con indice), asi el
+# top-N es una lectura de N filas del indice aunque haya decenas de miles de partidos.
+
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS matches (
+        id INTEGER PRIMARY KEY,
+        season TEXT NOT NULL,
+        player TEXT NOT NULL,
+        side TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        profile INTEGER NOT NULL,
+        goals_for INTEGER NOT NULL,
+        goals_against INTEGER NOT NULL,
+        won INTEGER NOT NULL,
+        points INTEGER NOT NULL,
+        max_rally INTEGER NOT NULL,
+        mean_rally REAL NOT NULL,
+        max_speed REAL NOT NULL,
+        ai_skill REAL,
+        seconds REAL NOT NULL,
+        score INTEGER NOT NULL,
+        t_end REAL NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS matches_player ON matches (season, player, t_end)",
+    "CREATE INDEX IF NOT EXISTS matches_score ON matches (season, score DESC)",
+    """CREATE TABLE IF NOT EXISTS players (
+        season TEXT NOT NULL,
+        name TEXT NOT NULL,
+        matches INTEGER NOT NULL,
+        wins INTEGER NOT NULL,
+        best INTEGER NOT NULL,
+        best_rally INTEGER NOT NULL,
+        best_speed REAL NOT NULL,
+        last_t REAL NOT NULL,
+        PRIMARY KEY (season, name))""",
+    "CREATE INDEX IF NOT EXISTS players_rank ON players (season, best DESC, wins DESC)",
+)
+
+_INSERT_MATCH = """INSERT INTO matches (season, player, side, mode, profile, goals_for, goals_against, won,
+    points, max_rally, mean_rally, max_speed, ai_skill, seconds, score, t_end)
+    VALUES (:season, :player, :side, :mode, :profile, :goals_for, :goals_against, :won,
+    :points, :max_rally, :mean_rally, :max_speed, :ai_skill, :seconds, :score, :t_end)"""
+
+_UPSERT_PLAYER = """INSERT INTO players (season, name, matches, wins, best, best_rally, best_speed, last_t)
+    VALUES (:season, :player, 1, :won, :score, :max_rally, :max_speed, :t_end)
+    ON CONFLICT (season, name) DO UPDATE SET
+        matches = matches + 1,
+        wins = wins + excluded.wins,
+        best = MAX(best, excluded.best),
+        best_rally = MAX(best_rally, excluded.best_rally),
+        best_speed = MAX(best_speed, excluded.best_speed),
+        last_t = excluded.last_t"""
+
+_TOP = """SELECT name, best, wins, matches FROM players WHERE season = ?
+    ORDER BY best DESC, wins DESC LIMIT ?"""
+
+ANONYMOUS = ""  # partidos sin nadie en la cola: se guardan, pero no entran al ranking
+
+
+def clean_name(text, max_len=20):
+    """Nombre apto para cv2.putText: sin tildes ni caracteres fuera de ASCII, recortado."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.split())[:max_len]
+
+
+def match_score(goals_for, max_rally, ai_skill=None):
+    """Puntaje del ranking: 100 por gol, 10 por golpe del rally mas largo y hasta 50 por la habilidad de la IA."""
+    return int(100 * goals_for + 10 * max_rally + round(50 * (ai_skill or 0.0)))
+
+
+def match_rows(players, sim, profile, seconds, season, t_end=None):
+    """
+    Filas de matches para un partido terminado en sim (MatchSim). players = (derecho,
+    izquierdo); en modo un jugador el izquierdo es la IA y solo hay una fila.
+    """
+    t_end = time.time() if t_end is None else t_end
+    rallies = sim.rallies or [0]
+    two = sim.two_players
+    ai_skill = None if two else float(sim.ai_brain.skill)
+    common = {"season": season, "mode": "2p" if two else "1p", "profile": int(profile),
+              "points": len(sim.rallies), "max_rally": int(max(rallies)),
+              "mean_rally": float(sum(rallies)) / len(rallies), "max_speed": float(sim.max_speed),
+              "ai_skill": ai_skill, "seconds": float(seconds), "t_end": t_end}
+    sides = [("der", players[0], sim.score_p, sim.score_ai)]
+    if two:
+        sides.append(("izq", players[1], sim.score_ai, sim.score_p))
+    rows = []
+    for side, name, goals_for, goals_against in sides:
+        row = dict(common, player=name or ANONYMOUS, side=side, goals_for=int(goals_for),
+                   goals_against=int(goals_against), won=int(goals_for > goals_against))
+        row["score"] = match_score(goals_for, row["max_rally"], ai_skill)
+        rows.append(row)
+    return rows
+
+
+class PlayerQueue:
+    """Cola de espera (FIFO, sin nombres repetidos) compartida entre la consola y el juego."""
+    def __init__(self):
+        self._names = deque()
+        self._lock = threading.Lock()
+        self.version = 0  # cambia con cada alta/baja (clave de la capa del menu)
+
+    def add(self, name):
+        name = clean_name(name)
+        with self._lock:
+            if not name or name in self._names:
+                return False
+            self._names.append(name)
+            self.version += 1
+            return True
+
+    def remove(self, name):
+        name = clean_name(name)
+        with self._lock:
+            if name not in self._names:
+                return False
+            self._names.remove(name)
+            self.version += 1
+            return True
+
+    def pop(self):
+        with self._lock:
+            if not self._names:
+                return ANONYMOUS
+            self.version += 1
+            return self._names.popleft()
+
+    def peek(self, n=3):
+        with self._lock:
+            return tuple(self._names)[:n]
+
+    def __len__(self):
+        return len(self._names)
+
+
+class Leaderboard:
+    """
+    Partidos y ranking en SQLite (path), con un hilo escritor:
+      - record(rows) encola filas de match_rows(); el hilo las inserta y actualiza players
+        en una sola transaccion por tanda. Nunca bloquea el bucle del juego.
+      - top es el ultimo ranking leido [(nombre, puntaje, ganados, partidos)], refrescado
+        por el hilo despues de cada tanda; top_version cambia con cada refresco.
+      - close() escribe lo pendiente y cierra la base.
+    season separa temporadas en la misma base (ranking propio por temporada).
+    """
+    def __init__(self, path, season="", size=5):
+        self.path = path
+        self.season = str(season)
+        self.size = int(size)
+        self.top = []
+        self.top_version = 0
+        self.written = 0
+        self.errors = 0
+        self.write_ms = 0.0
+        self.top_ms = 0.0
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="leaderboard", daemon=True)
+        self._thread.start()
+
+    def record(self, rows):
+        self._queue.put(list(rows))
+
+    def _open(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        with db:
+            for sql in _SCHEMA:
+                db.execute(sql)
+        return db
+
+    def _refresh_top(self, db):
+        t0 = time.perf_counter()
+        self.top = [tuple(r) for r in db.execute(_TOP, (self.season, self.size))]
+        self.top_version += 1
+        self.top_ms = (time.perf_counter() - t0) * 1000.0
+
+    def _loop(self):
+        try:
+            db = self._open()
+            self._refresh_top(db)
+        except sqlite3.Error as e:
+            print("Ranking: no se pudo abrir", self.path, e)
+            self.errors += 1
+            self._ready.set()
+            return
+        self._ready.set()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            running = None not in batch
+            rows = [r for item in batch if item is not None for r in item]
+            if not rows:
+                continue
+            t0 = time.perf_counter()
+            try:
+                with db:
+                    db.executemany(_INSERT_MATCH, rows)
+                    db.executemany(_UPSERT_PLAYER, [r for r in rows if r["player"] != ANONYMOUS])
+                self.written += len(rows)
+                self.write_ms = (time.perf_counter() - t0) * 1000.0
+                self._refresh_top(db)
+            except sqlite3.Error as e:
+                print("Ranking: error al guardar:", e)
+                self.errors += 1
+        db.close()
+
+    def wait_ready(self, timeout=5.0):
+        return self._ready.wait(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+
+    def stats(self):
+        return {"written": self.written, "pending": self._queue.qsize(), "errors": self.errors,
+                "write_ms": round(self.write_ms, 2), "top_ms": round(self.top_ms, 3)}
+
+
+class ConsoleQueue:
+    """
+    Anotarse desde la terminal donde corre el juego (hilo que lee stdin):
+      nombre   -> a la cola          -nombre -> sale de la cola
+      ?        -> imprime cola y ranking
+    Si stdin no es una terminal (acceso directo, servicio) no hace nada.
+    """
+    def __init__(self, players, board=None):
+        self.players = players
+        self.board = board
+        self._thread = None
+
+    def start(self):
+        if sys.stdin is None or not sys.stdin.isatty():
+            return self
+        print("Torneo: escribe un nombre y Enter para anotarlo (-nombre lo quita, ? muestra cola y ranking)")
+        self._thread = threading.Thread(target=self._loop, name="console-queue", daemon=True)
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            if line == "?":
+                print("Cola:", ", ".join(self.players.peek(50)) or "(vacia)")
+                if self.board is not None:
+                    for i, (name, best, wins, matches) in enumerate(self.board.top, 1):
+                        print(f"  {i}. {name}  {best} pts  ({wins}/{matches} ganados)")
+            elif line.startswith("-"):
+                print("Torneo:", line[1:].strip(), "sale de la cola" if self.players.remove(line[1:]) else "no estaba en la cola")
+            elif self.players.add(line):
+                print("Torneo:", clean_name(line), "anotado, puesto", len(self.players))
@@ -0,0 +1,159 @@
+# trajectory.py - Trayectoria de la pelota en forma cerrada, cacheada por evento (escalar y vectorizada) (ASCII)
+#
+# Entre dos eventos (saque, rebote en pared o en paleta) la pelota sigue una recta que se
+# "pliega" entre techo y suelo. Se guarda el origen del tramo y cada consulta (y en una X,
+# tiempo hasta una X, rebotes en pared, regreso tras la paleta rival) es O(1).
+
+import math
+
+import numpy as np
+
+import settings
+
+
+def fold_y(y, low, high):
+    """Plegado de y entre low y high (rebotes en techo/suelo sin simular paso a paso)."""
+    span = high - low
+    if span <= 0:
+        return max(low, min(high, y))
+    u = (y - low) % (2.0 * span)
+    if u > span:
+        u = 2.0 * span - u
+    return low + u
+
+
+def fold_y_array(y, low, high, out=None):
+    """fold_y sobre arreglos (BatchSim); escribe en out si se pasa."""
+    span = high - low
+    u = np.mod(y - low, 2.0 * span, out=out)
+    np.subtract(2.0 * span, u, out=u, where=u > span)
+    u += low
+    return u
+
+
+class Trajectory:
+    """
+    Tramo actual de la pelota para la IA:
+      - sync(ball) solo recalcula cuando cambia la velocidad (= hubo un evento); el resto
+        de los frames es una comparacion.
+      - y_at_x(x) y time_to_x(x, x_ahora) son O(1); y_at_x memoriza la ultima X pedida
+        (el plano de la paleta casi siempre es el mismo).
+      - wall_bounces(x) cuenta rebotes en pared hasta llegar a x; angle_at_x(x) da el
+        angulo de llegada (para el mapa de zonas debiles por angulo).
+      - return_time() estima cuanto tarda en volver tras rebotar en la paleta rival,
+        con la aceleracion spd_step del perfil.
+    """
+    def __init__(self, h=None, r=None):
+        h = float(settings.SCREEN_HEIGHT if h is None else h)
+        r = float(settings.BALL_RADIUS if r is None else r)
+        self.low = r
+        self.high = h - r
+        self.x0 = 0.0
+        self.y0 = 0.0
+        self.vx = 0.0
+        self.vy = 0.0
+        self.builds = 0
+        self._memo_x = None
+        self._memo_y = None
+
+    def build(self, x, y, vx, vy):
+        self.x0, self.y0 = float(x), float(y)
+        self.vx, self.vy = float(vx), float(vy)
+        self._memo_x = None
+        self.builds += 1
+
+    def sync(self, ball):
+        vx, vy = float(ball.vx), float(ball.vy)
+        if vx != self.vx or vy != self.vy:
+            self.build(ball.x, ball.y, vx, vy)
+        return self
+
+    def _y_linear(self, x):
+        return self.y0 + self.vy * (x - self.x0) / self.vx
+
+    def y_at_x(self, x):
+        """Y (plegada) cuando la pelota pase por x; None si no se mueve en X."""
+        if self.vx == 0.0:
+            return None
+        if x != self._memo_x:
+            self._memo_x = x
+            self._memo_y = fold_y(self._y_linear(x), self.low, self.high)
+        return self._memo_y
+
+    def time_to_x(self, x, x_now):
+        """Segundos hasta que la pelota (hoy en x_now) llegue a x; None si no va hacia alli."""
+        if self.vx == 0.0:
+            return None
+        t = (x - x_now) / self.vx
+        return t if t > 0.0 else None
+
+    def wall_bounces(self, x):
+        if self.vx == 0.0:
+            return 0
+        span = self.high - self.low
+        if span <= 0:
+            return 0
+        return int(abs(math.floor((self._y_linear(x) - self.low) / span)))
+
+    def angle_at_x(self, x):
+        """Angulo de llegada (grados) al pasar por x: el signo de vy cambia con cada rebote en pared."""
+        if self.vx == 0.0:
+            return None
+        vy = -self.vy if self.wall_bounces(x) % 2 else self.vy
+        return math.degrees(math.atan2(vy, abs(self.vx)))
+
+    def return_time(self, x_hit, x_back, x_now, spd_step, spd_max, angle=0.0):
+        """
+        Tiempo hasta que la pelota, tras rebotar en el plano x_hit (paleta rival) con el
+        angulo dado, vuelva a x_back. None si no va hacia x_hit.
+        """
+        t_hit = self.time_to_x(x_hit, x_now)
+        if t_hit is None:
+            return None
+        spd = min(math.hypot(self.vx, self.vy) + spd_step, spd_max)
+        vx_back = spd * math.cos(angle)
+        if vx_back <= 0.0:
+            return None
+        return t_hit + abs(x_back - x_hit) / vx_back
+
+
+class BatchTrajectory:
+    """
+    Version vectorizada para BatchSim: una fila por partida y un plano fijo (la paleta IA).
+    sync() rehace solo las filas cuya velocidad cambio; y_plane queda cacheada (truncada
+    a px enteros, como la prediccion de OpponentAI) y, con angles=True, tambien el angulo
+    de llegada al plano.
+    """
+    def __init__(self, n, x_plane, h=None, r=None, angles=False):
+        h = float(settings.SCREEN_HEIGHT if h is None else h)
+        r = float(settings.BALL_RADIUS if r is None else r)
+        self.low = r
+        self.high = h - r
+        self.x_plane = float(x_plane)
+        self.vx = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.y_plane = np.full(n, h * 0.5)
+        self.angle_plane = np.zeros(n) if angles else None
+        self.rebuilt = 0
+
+    def sync(self, bx, by, bvx, bvy):
+        changed = (bvx != self.vx) | (bvy != self.vy)
+        idx = np.nonzero(changed)[0]
+        if idx.size:
+            vx = bvx[idx]
+            safe = np.where(vx == 0.0, 1.0, vx)
+            y_lin = by[idx] + bvy[idx] * (self.x_plane - bx[idx]) / safe
+            if self.angle_plane is not None:
+                flips = np.floor((y_lin - self.low) / (self.high - self.low)) % 2 == 1
+                vy = np.where(flips, -bvy[idx], bvy[idx])
+                self.angle_plane[idx] = np.degrees(np.arctan2(vy, np.abs(safe)))
+            y = fold_y_array(y_lin, self.low, self.high)
+            self.y_plane[idx] = np.trunc(y)
+            self.vx[idx] = vx
+            self.vy[idx] = bvy[idx]
+            self.rebuilt += idx.size
+        return self
+
+    def time_to_plane(self, bx):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self.x_plane - bx) / self.vx
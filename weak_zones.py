@@ -0,0 +1,145 @@
+# weak_zones.py - Memoria de aprendizaje de la IA con costo O(1) por consulta (ASCII)
+#
+# WeakZoneMap: mapa de fallos por banda de Y y (opcional) por angulo de llegada. Los
+# conteos solo crecen, asi que el maximo se mantiene al sumar: la zona mas debil se lee
+# sin recorrer el mapa, aunque tenga muchas bandas.
+# RecentRing: ventana fija de aciertos/fallos con suma corriente (exactitud reciente).
+
+import math
+
+import numpy as np
+
+import settings
+
+
+class WeakZoneMap:
+    """
+    Conteos [banda Y, banda de angulo] con totales y argmax mantenidos al sumar:
+      - weak_y(angulo) da el centro de la banda mas fallada para ese angulo de llegada
+        (o la de todos los angulos si ese angulo no tiene datos); None sin datos.
+      - weakness(ys) evalua muchas Y a la vez (0..1 respecto de la banda maxima).
+    Empates: gana la banda mas baja, igual que max()/np.argmax.
+    """
+    def __init__(self, bins_y=None, bins_angle=None, h=None, max_angle_deg=None):
+        self.bins_y = int(max(1, getattr(settings, "AI_LEARN_BINS", 6) if bins_y is None else bins_y))
+        self.bins_angle = int(max(1, getattr(settings, "AI_LEARN_ANGLE_BINS", 1) if bins_angle is None else bins_angle))
+        self.h = float(settings.SCREEN_HEIGHT if h is None else h)
+        self.max_angle = float(settings.BALL_MAX_BOUNCE_DEG if max_angle_deg is None else max_angle_deg)
+        self.band_h = self.h / float(self.bins_y)
+        self.counts = np.zeros((self.bins_y, self.bins_angle), dtype=np.int32)
+        self.total = 0
+        # marginal en Y (todos los angulos) y maximo por columna de angulo
+        self.y_counts = np.zeros(self.bins_y, dtype=np.int64)
+        self.y_max = 0
+        self.y_arg = 0
+        self.col_total = np.zeros(self.bins_angle, dtype=np.int64)
+        self.col_max = np.zeros(self.bins_angle, dtype=np.int64)
+        self.col_arg = np.zeros(self.bins_angle, dtype=np.int64)
+
+    def y_bin(self, y):
+        y = min(max(int(y), 0), int(self.h) - 1)
+        return min(max(int(y // self.band_h), 0), self.bins_y - 1)
+
+    def angle_bin(self, angle_deg):
+        if self.bins_angle == 1 or angle_deg is None:
+            return 0
+        return int(angle_bins(angle_deg, self.bins_angle, self.max_angle))
+
+    def add(self, y, angle_deg=None):
+        i, j = self.y_bin(y), self.angle_bin(angle_deg)
+        self.counts[i, j] += 1
+        self.total += 1
+        c = self.y_counts[i] = self.y_counts[i] + 1
+        if c > self.y_max or (c == self.y_max and i < self.y_arg):
+            self.y_max, self.y_arg = int(c), i
+        self.col_total[j] += 1
+        c = self.counts[i, j]
+        if c > self.col_max[j] or (c == self.col_max[j] and i < self.col_arg[j]):
+            self.col_max[j], self.col_arg[j] = c, i
+
+    def load_counts(self, counts):
+        """Reemplaza los conteos (p.ej. leidos de AIStore) y rehace totales y maximos; False si no coincide la forma."""
+        counts = np.asarray(counts)
+        if counts.shape != self.counts.shape:
+            return False
+        self.counts[:] = counts
+        self.total = int(self.counts.sum())
+        self.y_counts[:] = self.counts.sum(axis=1)
+        self.y_arg = int(np.argmax(self.y_counts))
+        self.y_max = int(self.y_counts[self.y_arg])
+        self.col_total[:] = self.counts.sum(axis=0)
+        self.col_arg[:] = np.argmax(self.counts, axis=0)
+        self.col_max[:] = self.counts.max(axis=0)
+        return True
+
+    def weak_y(self, angle_deg=None):
+        if self.total == 0:
+            return None
+        i = self.y_arg
+        if self.bins_angle > 1 and angle_deg is not None:
+            j = self.angle_bin(angle_deg)
+            if self.col_total[j] > 0:
+                i = int(self.col_arg[j])
+        return (i + 0.5) * self.band_h
+
+    def weakness(self, ys, angle_deg=None):
+        """Peso 0..1 de cada Y en ys (arreglo) segun los fallos registrados."""
+        ys = np.asarray(ys, dtype=np.float64)
+        if self.total == 0:
+            return np.zeros(ys.shape)
+        idx = np.clip((np.clip(ys, 0, self.h - 1) // self.band_h).astype(np.int64), 0, self.bins_y - 1)
+        if self.bins_angle > 1 and angle_deg is not None:
+            j = self.angle_bin(angle_deg)
+            if self.col_total[j] > 0:
+                return self.counts[idx, j] / float(self.col_max[j])
+        return self.y_counts[idx] / float(self.y_max)
+
+
+class RecentRing:
+    """Ultimos n valores 0/1 en un buffer circular con suma corriente."""
+    def __init__(self, size):
+        self.size = int(max(1, size))
+        self.buf = [0] * self.size
+        self.pos = 0
+        self.count = 0
+        self.sum = 0
+
+    def push(self, v):
+        v = int(v)
+        if self.count == self.size:
+            self.sum -= self.buf[self.pos]
+        else:
+            self.count += 1
+        self.buf[self.pos] = v
+        self.sum += v
+        self.pos = (self.pos + 1) % self.size
+
+    def mean(self):
+        return self.sum / float(self.count) if self.count else 0.0
+
+    def values(self):
+        """Valores en orden, del mas viejo al mas nuevo."""
+        if self.count < self.size:
+            return self.buf[:self.count]
+        return self.buf[self.pos:] + self.buf[:self.pos]
+
+    def load(self, values):
+        """Rellena con values (mas viejo primero); si sobran, quedan los ultimos."""
+        self.buf = [0] * self.size
+        self.pos = self.count = self.sum = 0
+        for v in list(values)[-self.size:]:
+            self.push(v)
+
+    def __len__(self):
+        return self.count
+
+
+def incoming_angle(vx, vy):
+    """Angulo de llegada en grados (positivo = bajando en pantalla), sin importar el lado."""
+    return math.degrees(math.atan2(vy, abs(vx) if abs(vx) > 1e-6 else 1e-6))
+
+
+def angle_bins(angle_deg, bins, max_angle):
+    """Banda de angulo (escalar o arreglo) repartiendo [-max_angle, max_angle] en bins."""
+    u = (np.asarray(angle_deg, dtype=np.float64) + max_angle) / (2.0 * max_angle)
+    return np.clip((u * bins).astype(np.int64), 0, bins - 1)